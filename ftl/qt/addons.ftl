@@ -33,6 +33,11 @@ addons-configuration = Configuration
 addons-corrupt-addon-file = Corrupt add-on file.
 addons-disabled = (disabled)
 addons-disabled2 = (disabled)
+# Tooltip in the add-on list, showing how long the add-on took to load and how many
+# Python modules it imported.
+addons-load-time = Loaded in { $milliseconds }ms ({ $modules } modules)
+# Tooltip in the add-on list, for an add-on that is only loaded when first needed.
+addons-not-loaded-yet = Not loaded yet
 addons-download-complete-please-restart-anki-to = Download complete. Please restart Anki to apply changes.
 addons-downloaded-fnames = Downloaded { $fname }
 addons-downloading-adbd-kb02fkb = Downloading { $part }/{ $total } ({ $kilobytes }KB)...
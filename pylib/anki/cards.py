@@ -38,6 +38,8 @@ FSRSMemoryState = cards_pb2.FsrsMemoryState
 
 class Card(DeprecatedNamesMixin):
     _note: Note | None
+    # ((deck id, config generation), config)
+    _deck_config: tuple[tuple[int, int], anki.decks.DeckConfigDict] | None
     lastIvl: int
     ord: int
     nid: anki.notes.NoteId
@@ -78,6 +80,7 @@ class Card(DeprecatedNamesMixin):
     def _load_from_backend_card(self, card: cards_pb2.Card) -> None:
         self._render_output = None
         self._note = None
+        self._deck_config = None
         self.id = CardId(card.id)
         self.nid = anki.notes.NoteId(card.note_id)
         self.did = anki.decks.DeckId(card.deck_id)
@@ -194,23 +197,28 @@ class Card(DeprecatedNamesMixin):
     def current_deck_id(self) -> anki.decks.DeckId:
         return anki.decks.DeckId(self.odid or self.did)
 
+    def deck_config(self) -> anki.decks.DeckConfigDict:
+        """The config of the card's current deck. It is fetched the first time
+        it is needed, and again only if the card moves to another deck or any
+        deck or deck config is changed. Don't modify it."""
+        key = (self.current_deck_id(), self.col.decks._config_generation)
+        if self._deck_config is None or self._deck_config[0] != key:
+            conf = self.col.decks.config_dict_for_deck_id(self.current_deck_id())
+            self._deck_config = (key, conf)
+        return self._deck_config[1]
+
     def time_limit(self) -> int:
         "Time limit for answering in milliseconds."
-        conf = self.col.decks.config_dict_for_deck_id(self.current_deck_id())
-        return conf["maxTaken"] * 1000
+        return self.deck_config()["maxTaken"] * 1000
 
     def should_show_timer(self) -> bool:
-        conf = self.col.decks.config_dict_for_deck_id(self.current_deck_id())
-        return conf["timer"]
+        return self.deck_config()["timer"]
 
     def replay_question_audio_on_answer_side(self) -> bool:
-        conf = self.col.decks.config_dict_for_deck_id(self.current_deck_id())
-        return conf.get("replayq", True)
+        return self.deck_config().get("replayq", True)
 
     def autoplay(self) -> bool:
-        return self.col.decks.config_dict_for_deck_id(self.current_deck_id())[
-            "autoplay"
-        ]
+        return self.deck_config()["autoplay"]
 
     def time_taken(self, capped: bool = True) -> int:
         """Time taken since card timer started, in integer MS.
@@ -225,6 +233,7 @@ class Card(DeprecatedNamesMixin):
         # remove non-useful elements
         del dict_copy["_note"]
         del dict_copy["_render_output"]
+        del dict_copy["_deck_config"]
         del dict_copy["col"]
         del dict_copy["timer_started"]
         return f"{super().__repr__()} {pprint.pformat(dict_copy, width=300)}"
@@ -9,6 +9,7 @@ from typing import Any, Literal, Union, cast
 from anki import (
     ankiweb_pb2,
     card_rendering_pb2,
+    cards_pb2,
     collection_pb2,
     config_pb2,
     generic_pb2,
@@ -125,6 +126,16 @@ class ComputedMemoryState:
     decay: float | None = None
 
 
+@dataclass
+class DupeBatch:
+    "Progress of Collection.find_dupes_in_batches()."
+
+    checked: int
+    total: int
+    # groups that gained their second note in this batch
+    groups: list[tuple[str, list[NoteId]]]
+
+
 @dataclass
 class AddNoteRequest:
     note: Note
@@ -248,6 +259,7 @@ class Collection(DeprecatedNamesMixin):
     @crt.setter
     def crt(self, crt: int) -> None:
         self.db.execute("update col set crt = ?", crt)
+        self.sched._clear_cache()
 
     @property
     def mod(self) -> int:
@@ -281,6 +293,8 @@ class Collection(DeprecatedNamesMixin):
 
     def _clear_caches(self) -> None:
         self.models._clear_cache()
+        self.decks._clear_cache()
+        self.sched._clear_cache()
 
     def reopen(self, after_full_sync: bool = False) -> None:
         if self.db:
@@ -736,39 +750,64 @@ class Collection(DeprecatedNamesMixin):
 
     # returns array of ("dupestr", [nids])
     def find_dupes(self, field_name: str, search: str = "") -> list[tuple[str, list]]:
-        nids = self.find_notes(
-            self.build_search_string(search, SearchNode(field_name=field_name))
+        dupes: list[tuple[str, list]] = []
+        for batch in self.find_dupes_in_batches(field_name, search):
+            dupes.extend(batch.groups)
+        return dupes
+
+    def find_dupes_in_batches(
+        self, field_name: str, search: str = "", batch_size: int = 1000
+    ) -> Generator[DupeBatch, None, None]:
+        """Find notes sharing a value in FIELD_NAME, BATCH_SIZE notes at a time.
+
+        A group is included in the batch in which its second note is found;
+        notes found after that are appended to its list in place. Stop
+        iterating to cancel the search."""
+        nids = sorted(
+            self.find_notes(
+                self.build_search_string(search, SearchNode(field_name=field_name))
+            )
         )
-        # go through notes
-        vals: dict[str, list[int]] = {}
-        dupes = []
-        fields: dict[int, int] = {}
+        vals: dict[str, list[NoteId]] = {}
+        fields: dict[NotetypeId, int | None] = {}
+        stripped: dict[str, str] = {}
 
-        def ord_for_mid(mid: NotetypeId) -> int:
+        def ord_for_mid(mid: NotetypeId) -> int | None:
             if mid not in fields:
-                model = self.models.get(mid)
-                for idx, field in enumerate(model["flds"]):
+                fields[mid] = None
+                for idx, field in enumerate(self.models.get(mid)["flds"]):
                     if field["name"].lower() == field_name.lower():
                         fields[mid] = idx
                         break
             return fields[mid]
 
-        for nid, mid, flds in self.db.all(
-            f"select id, mid, flds from notes where id in {ids2str(nids)}"
-        ):
-            flds = split_fields(flds)
-            ord = ord_for_mid(mid)
-            if ord is None:
-                continue
-            val = flds[ord]
-            val = strip_html_media(val)
-            # empty does not count as duplicate
-            if not val:
-                continue
-            vals.setdefault(val, []).append(nid)
-            if len(vals[val]) == 2:
-                dupes.append((val, vals[val]))
-        return dupes
+        def normalize(val: str) -> str:
+            # without markup or entities there is nothing to strip, so most
+            # values never reach the backend, and the rest only once each
+            if "<" not in val and "&" not in val:
+                return val
+            if val not in stripped:
+                stripped[val] = strip_html_media(val)
+            return stripped[val]
+
+        for offset in range(0, len(nids), batch_size):
+            chunk = nids[offset : offset + batch_size]
+            groups = []
+            for nid, mid, flds in self.db.all(
+                f"select id, mid, flds from notes where id in {ids2str(chunk)}"
+            ):
+                ord = ord_for_mid(mid)
+                if ord is None:
+                    continue
+                val = normalize(split_fields(flds)[ord])
+                # empty does not count as duplicate
+                if not val:
+                    continue
+                group = vals.setdefault(val, [])
+                group.append(nid)
+                if len(group) == 2:
+                    groups.append((val, group))
+            yield DupeBatch(checked=offset + len(chunk), total=len(nids), groups=groups)
 
     # Search Strings
     ##########################################################################
@@ -921,9 +960,11 @@ class Collection(DeprecatedNamesMixin):
         By default, no undo entry will be created, but the existing undo history
         will be preserved. Set `undoable=True` to allow the change to be undone;
         see undo code for how you can merge multiple undo entries."""
-        return self._backend.set_config_json(
+        out = self._backend.set_config_json(
             key=key, value_json=to_json_bytes(val), undoable=undoable
         )
+        self.sched._clear_cache()
+        return out
 
     def remove_config(self, key: str) -> OpChanges:
         return self.conf.remove(key)
@@ -938,7 +979,9 @@ class Collection(DeprecatedNamesMixin):
     def set_config_bool(
         self, key: Config.Bool.V, value: bool, *, undoable: bool = False
     ) -> OpChanges:
-        return self._backend.set_config_bool(key=key, value=value, undoable=undoable)
+        out = self._backend.set_config_bool(key=key, value=value, undoable=undoable)
+        self.sched._clear_cache()
+        return out
 
     def get_config_string(self, key: Config.String.V) -> str:
         return self._backend.get_config_string(key)
@@ -946,7 +989,9 @@ class Collection(DeprecatedNamesMixin):
     def set_config_string(
         self, key: Config.String.V, value: str, undoable: bool = False
     ) -> OpChanges:
-        return self._backend.set_config_string(key=key, value=value, undoable=undoable)
+        out = self._backend.set_config_string(key=key, value=value, undoable=undoable)
+        self.sched._clear_cache()
+        return out
 
     def get_aux_notetype_config(
         self, id: NotetypeId, key: str, default: Any | None = None
@@ -1019,6 +1064,13 @@ class Collection(DeprecatedNamesMixin):
         """
         return self._backend.card_stats(card_id)
 
+    def card_stats_data_for_cards(
+        self, card_ids: Sequence[CardId]
+    ) -> Sequence[stats_pb2.CardStatsResponse]:
+        """Like card_stats_data(), for several cards in one backend call.
+        Cards that don't exist are skipped."""
+        return self._backend.card_stats_batch(card_ids).cards
+
     def get_review_logs(
         self, card_id: CardId
     ) -> Sequence[stats_pb2.CardStatsResponse.StatsRevlogEntry]:
@@ -1061,6 +1113,10 @@ class Collection(DeprecatedNamesMixin):
         out = self._backend.undo()
         if out.changes.notetype:
             self.models._clear_cache()
+        if out.changes.deck or out.changes.deck_config:
+            self.decks._clear_cache()
+        if out.changes.config:
+            self.sched._clear_cache()
         return out
 
     def redo(self) -> OpChangesAfterUndo:
@@ -1068,6 +1124,10 @@ class Collection(DeprecatedNamesMixin):
         out = self._backend.redo()
         if out.changes.notetype:
             self.models._clear_cache()
+        if out.changes.deck or out.changes.deck_config:
+            self.decks._clear_cache()
+        if out.changes.config:
+            self.sched._clear_cache()
         return out
 
     def op_made_changes(self, changes: OpChanges) -> bool:
@@ -1144,7 +1204,10 @@ class Collection(DeprecatedNamesMixin):
         )
 
     def sync_collection(self, auth: SyncAuth, sync_media: bool) -> SyncOutput:
-        return self._backend.sync_collection(auth=auth, sync_media=sync_media)
+        # the rollover hour may have been changed on another device
+        out = self._backend.sync_collection(auth=auth, sync_media=sync_media)
+        self.sched._clear_cache()
+        return out
 
     def sync_media(self, auth: SyncAuth) -> None:
         self._backend.sync_media(auth)
@@ -1166,7 +1229,9 @@ class Collection(DeprecatedNamesMixin):
         return self._backend.get_preferences()
 
     def set_preferences(self, prefs: Preferences) -> OpChanges:
-        return self._backend.set_preferences(prefs)
+        out = self._backend.set_preferences(prefs)
+        self.sched._clear_cache()
+        return out
 
     def render_markdown(self, text: str, sanitize: bool = True) -> str:
         "Not intended for public consumption at this time."
@@ -1183,19 +1248,24 @@ class Collection(DeprecatedNamesMixin):
         return self._backend.extract_cloze_for_typing(text=text, ordinal=ordinal)
 
     def compute_memory_state(self, card_id: CardId) -> ComputedMemoryState:
-        resp = self._backend.compute_memory_state(card_id)
-        if resp.HasField("state"):
-            return ComputedMemoryState(
-                desired_retention=resp.desired_retention,
-                stability=resp.state.stability,
-                difficulty=resp.state.difficulty,
-                decay=resp.decay,
-            )
+        return _computed_memory_state(self._backend.compute_memory_state(card_id))
+
+    def compute_memory_states(
+        self, cards: str | Sequence[CardId]
+    ) -> dict[CardId, ComputedMemoryState]:
+        """Like compute_memory_state(), for the cards matching a search, or
+        the provided ids. The states are computed in parallel by the backend,
+        which reports progress, and can be aborted like other long operations."""
+        if isinstance(cards, str):
+            request = scheduler_pb2.ComputeMemoryStatesRequest(search=cards)
         else:
-            return ComputedMemoryState(
-                desired_retention=resp.desired_retention,
-                decay=resp.decay,
+            request = scheduler_pb2.ComputeMemoryStatesRequest(
+                card_ids=cards_pb2.CardIds(cids=cards)
             )
+        return {
+            CardId(entry.card_id): _computed_memory_state(entry.state)
+            for entry in self._backend.compute_memory_states(request).cards
+        }
 
     def fuzz_delta(self, card_id: CardId, interval: int) -> int:
         "The delta days of fuzz applied if reviewing the card in v3."
@@ -1308,6 +1378,23 @@ Collection.register_deprecated_aliases(
 _Collection = Collection
 
 
+def _computed_memory_state(
+    resp: scheduler_pb2.ComputeMemoryStateResponse,
+) -> ComputedMemoryState:
+    if resp.HasField("state"):
+        return ComputedMemoryState(
+            desired_retention=resp.desired_retention,
+            stability=resp.state.stability,
+            difficulty=resp.state.difficulty,
+            decay=resp.decay,
+        )
+    else:
+        return ComputedMemoryState(
+            desired_retention=resp.desired_retention,
+            decay=resp.decay,
+        )
+
+
 def pb_export_limit(limit: ExportLimit) -> import_export_pb2.ExportLimit:
     message = import_export_pb2.ExportLimit()
     if isinstance(limit, DeckIdLimit):
@@ -51,9 +51,12 @@ class ConfigManager:
             # this argument is ignored
             undoable=True,
         )
+        self.col.sched._clear_cache()
 
     def remove(self, key: str) -> OpChanges:
-        return self.col._backend.remove_config(key)
+        out = self.col._backend.remove_config(key)
+        self.col.sched._clear_cache()
+        return out
 
     # Legacy dict interface
     #########################
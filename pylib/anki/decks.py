@@ -84,6 +84,12 @@ class DeckManager(DeprecatedNamesMixin):
     def __init__(self, col: anki.collection.Collection) -> None:
         self.col = col.weakref()
         self.decks = DecksDictProxy(col)
+        # bumped whenever decks or their configs may have changed, so that
+        # cards know to fetch their deck's config again
+        self._config_generation = 0
+
+    def _clear_cache(self) -> None:
+        self._config_generation += 1
 
     def save(self, deck_or_config: DeckDict | DeckConfigDict | None = None) -> None:
         "Can be called with either a deck or a deck configuration."
@@ -135,7 +141,9 @@ class DeckManager(DeprecatedNamesMixin):
         return DeckId(out.id)
 
     def remove(self, dids: Sequence[DeckId]) -> OpChangesWithCount:
-        return self.col._backend.remove_decks(dids)
+        out = self.col._backend.remove_decks(dids)
+        self._clear_cache()
+        return out
 
     def all_names_and_ids(
         self, skip_empty_default: bool = False, include_filtered: bool = True
@@ -264,9 +272,12 @@ class DeckManager(DeprecatedNamesMixin):
         deck["id"] = self.col._backend.add_or_update_deck_legacy(
             deck=to_json_bytes(deck), preserve_usn_and_mtime=preserve_usn
         )
+        self._clear_cache()
 
     def update_dict(self, deck: DeckDict) -> OpChanges:
-        return self.col._backend.update_deck_legacy(json=to_json_bytes(deck))
+        out = self.col._backend.update_deck_legacy(json=to_json_bytes(deck))
+        self._clear_cache()
+        return out
 
     def rename(self, deck: DeckDict | DeckId, new_name: str) -> OpChanges:
         "Rename deck prefix to NAME if not exists. Updates children."
@@ -296,6 +307,7 @@ class DeckManager(DeprecatedNamesMixin):
 
     def update_deck_configs(self, input: UpdateDeckConfigs) -> OpChanges:
         op_bytes = self.col._backend.update_deck_configs_raw(input.SerializeToString())
+        self._clear_cache()
         return OpChanges.FromString(op_bytes)
 
     def all_config(self) -> list[DeckConfigDict]:
@@ -327,6 +339,7 @@ class DeckManager(DeprecatedNamesMixin):
         conf["id"] = self.col._backend.add_or_update_deck_config_legacy(
             json=to_json_bytes(conf)
         )
+        self._clear_cache()
 
     def add_config(
         self, name: str, clone_from: DeckConfigDict | None = None
@@ -356,6 +369,7 @@ class DeckManager(DeprecatedNamesMixin):
                 deck["conf"] = 1
                 self.save(deck)
         self.col._backend.remove_deck_config(id)
+        self._clear_cache()
 
     def set_config_id_for_deck_dict(self, deck: DeckDict, id: DeckConfigId) -> None:
         deck["conf"] = id
@@ -7,7 +7,9 @@ import copy
 import pprint
 import sys
 import time
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any, NewType, Union
 
 import anki
@@ -39,6 +41,19 @@ NotetypeId = NewType("NotetypeId", int)
 sys.modules["anki.models"].NoteType = NotetypeDict  # type: ignore
 
 
+@dataclass(frozen=True)
+class FieldLookup:
+    """Field names and ordinals for one revision of a note type. A single
+    instance is shared by all notes of that revision, so it is read-only."""
+
+    # (id, mtime, usn) of the note type it was built from
+    revision: tuple[int, int, int]
+    # field name -> (ord, field), as returned by field_map()
+    field_map: Mapping[str, tuple[int, FieldDict]]
+    # in ordinal order
+    names: tuple[str, ...]
+
+
 class ModelsDictProxy:
     def __init__(self, col: anki.collection.Collection):
         self._col = col.weakref()
@@ -86,6 +101,7 @@ class ModelManager(DeprecatedNamesMixin):
         self.models = ModelsDictProxy(col)
         # do not access this directly!
         self._cache = {}
+        self._field_lookups: dict[NotetypeId, FieldLookup] = {}
 
     def __repr__(self) -> str:
         attrs = dict(self.__dict__)
@@ -107,12 +123,28 @@ class ModelManager(DeprecatedNamesMixin):
     def _remove_from_cache(self, ntid: NotetypeId) -> None:
         if ntid in self._cache:
             del self._cache[ntid]
+        self._field_lookups.pop(ntid, None)
 
     def _get_cached(self, ntid: NotetypeId) -> NotetypeDict | None:
         return self._cache.get(ntid)
 
     def _clear_cache(self) -> None:
         self._cache = {}
+        self._field_lookups = {}
+
+    def _field_lookup(self, notetype: NotetypeDict) -> FieldLookup:
+        "Shared field lookups for the current revision of NOTETYPE."
+        revision = (notetype["id"], notetype["mod"], notetype["usn"])
+        lookup = self._field_lookups.get(notetype["id"])
+        if lookup is None or lookup.revision != revision:
+            field_map = self.field_map(notetype)
+            lookup = FieldLookup(
+                revision=revision,
+                field_map=MappingProxyType(field_map),
+                names=tuple(sorted(field_map, key=lambda name: field_map[name][0])),
+            )
+            self._field_lookups[notetype["id"]] = lookup
+        return lookup
 
     # Listing note types
     #############################################################
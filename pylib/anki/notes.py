@@ -65,7 +65,10 @@ class Note(DeprecatedNamesMixin):
         self.usn = note.usn
         self.tags = list(note.tags)
         self.fields = list(note.fields)
-        self._fmap = self.col.models.field_map(self.note_type())
+        # shared with other notes of the same note type, so read-only
+        lookup = self.col.models._field_lookup(self.note_type())
+        self._fmap = lookup.field_map
+        self._field_names = lookup.names
 
     def _to_backend_note(self) -> notes_pb2.Note:
         hooks.note_will_flush(self)
@@ -149,13 +152,13 @@ class Note(DeprecatedNamesMixin):
     ##################################################
 
     def keys(self) -> list[str]:
-        return list(self._fmap.keys())
+        return list(self._field_names)
 
     def values(self) -> list[str]:
         return self.fields
 
     def items(self) -> list[tuple[str, str]]:
-        return [(f["name"], self.fields[ord]) for ord, f in sorted(self._fmap.values())]
+        return list(zip(self._field_names, self.fields))
 
     def _field_index(self, key: str) -> int:
         try:
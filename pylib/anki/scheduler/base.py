@@ -3,6 +3,8 @@
 
 from __future__ import annotations
 
+import time
+
 import anki
 import anki.collection
 from anki import decks_pb2, scheduler_pb2
@@ -47,9 +49,27 @@ class SchedulerBase(DeprecatedNamesMixin):
 
     def __init__(self, col: anki.collection.Collection) -> None:
         self.col = col.weakref()
+        self._timing: SchedTimingToday | None = None
+        self._timing_utc_offset = 0
 
     def _timing_today(self) -> SchedTimingToday:
-        return self.col._backend.sched_timing_today()
+        # the answer only changes at the next rollover, or if the system
+        # timezone or the collection's settings change; for the latter, the
+        # collection calls _clear_cache()
+        timing = self._timing
+        utc_offset = time.localtime().tm_gmtoff
+        if (
+            timing is None
+            or time.time() >= timing.next_day_at
+            or utc_offset != self._timing_utc_offset
+        ):
+            timing = self.col._backend.sched_timing_today()
+            self._timing = timing
+            self._timing_utc_offset = utc_offset
+        return timing
+
+    def _clear_cache(self) -> None:
+        self._timing = None
 
     @property
     def today(self) -> int:
@@ -27,6 +27,7 @@ from anki.utils import ids2str
 
 # public exports
 TagTreeNode = tags_pb2.TagTreeNode
+TagTreeChildren = tags_pb2.TagTreeChildrenResponse
 CompleteTagRequest = tags_pb2.CompleteTagRequest
 MARKED_TAG = "marked"
 
@@ -45,8 +46,26 @@ class TagManager(DeprecatedNamesMixin):
         return f"{super().__repr__()} {pprint.pformat(dict_, width=300)}"
 
     def tree(self) -> TagTreeNode:
+        "The entire tag tree. With many tags, prefer children()."
         return self.col._backend.tag_tree()
 
+    def children(
+        self, parent: str = "", offset: int = 0, limit: int = 0
+    ) -> TagTreeChildren:
+        """The tags directly below PARENT, or the top-level tags if it is empty,
+        with how many children each has. Up to LIMIT are returned, or all of
+        them if it is 0; .total is the number there are."""
+        return self.col._backend.tag_tree_children(
+            parent=parent, offset=offset, limit=limit
+        )
+
+    def search(self, text: str, limit: int, substring: bool = False) -> list[str]:
+        """Up to LIMIT tags starting with TEXT, or containing it if SUBSTRING
+        is set, ignoring case. Parents of tags are included."""
+        return list(
+            self.col._backend.search_tags(text=text, substring=substring, limit=limit)
+        )
+
     # Registering and fetching tags
     #############################################################
 
@@ -160,6 +160,8 @@ class TemplateRenderContext:
         self._fields: dict | None = None
         self._latex_svg = False
         self._question_side: bool = True
+        # output of custom filters, see CustomFilterPipeline
+        self._filter_cache: dict[tuple[bool, str, str, tuple[str, ...]], str] = {}
         if not notetype:
             self._note_type = note.note_type()
         else:
@@ -315,29 +317,74 @@ def apply_custom_filters(
     if len(rendered) == 1 and isinstance(rendered[0], str):
         return rendered[0]
 
-    res = ""
+    pipeline = CustomFilterPipeline(ctx)
+    res: list[str] = []
     for node in rendered:
         if isinstance(node, str):
-            res += node
+            res.append(node)
         else:
             # do we need to inject in FrontSide?
             if node.field_name == "FrontSide" and front_side is not None:
                 node.current_text = front_side
 
-            field_text = node.current_text
-            for filter_name in node.filters:
+            res.append(pipeline.apply(node))
+    return "".join(res)
+
+
+class CustomFilterPipeline:
+    """Applies the custom filters of replacement nodes for one side of a render.
+
+    If no add-on has registered a field filter or a legacy fmod_* filter,
+    nodes are passed through unchanged. Otherwise the output for each
+    combination of field, text and filter chain is cached on the render
+    context, so repeated references like {{filter:Field}} only run the
+    filters once per side.
+    """
+
+    def __init__(self, ctx: TemplateRenderContext) -> None:
+        self._ctx = ctx
+        self._has_field_filters = hooks.field_filter.count() > 0
+        self._has_legacy_filters = any(
+            name.startswith("fmod_") and funcs
+            for name, funcs in hooks._hooks.items()
+        )
+        self._legacy_items: list[tuple[str, str]] | None = None
+
+    def apply(self, node: TemplateReplacement) -> str:
+        if not (self._has_field_filters or self._has_legacy_filters):
+            return node.current_text
+
+        key = (
+            self._ctx.question_side,
+            node.field_name,
+            node.current_text,
+            tuple(node.filters),
+        )
+        cache = self._ctx._filter_cache
+        if (cached := cache.get(key)) is not None:
+            return cached
+
+        field_text = node.current_text
+        for filter_name in node.filters:
+            if self._has_field_filters:
                 field_text = hooks.field_filter(
-                    field_text, node.field_name, filter_name, ctx
+                    field_text, node.field_name, filter_name, self._ctx
                 )
+            if hooks._hooks.get(f"fmod_{filter_name}"):
                 # legacy hook - the second and fifth argument are no longer used.
                 field_text = hooks.runFilter(
                     f"fmod_{filter_name}",
                     field_text,
                     "",
-                    ctx.note().items(),
+                    self._legacy_note_items(),
                     node.field_name,
                     "",
                 )
 
-            res += field_text
-    return res
+        cache[key] = field_text
+        return field_text
+
+    def _legacy_note_items(self) -> list[tuple[str, str]]:
+        if self._legacy_items is None:
+            self._legacy_items = self._ctx.note().items()
+        return self._legacy_items
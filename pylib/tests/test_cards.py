@@ -93,3 +93,52 @@ def test_gendeck():
     note["Text"] += "{{c4::four}}"
     note.flush()
     assert note.cards()[3].did == newId
+
+
+def test_deck_config_is_fetched_once_per_card():
+    col = getEmptyCol()
+    note = col.newNote()
+    note["Front"] = "1"
+    col.addNote(note)
+    calls = []
+    for name in ("get_deck_legacy", "get_deck_config_legacy"):
+
+        def counted(*args, _name=name, _func=getattr(col._backend, name), **kwargs):
+            calls.append(_name)
+            return _func(*args, **kwargs)
+
+        setattr(col._backend, name, counted)
+
+    def review(card):
+        calls.clear()
+        # what the reviewer looks up when showing a card
+        card.start_timer()
+        card.autoplay()
+        card.should_show_timer()
+        card.time_limit()
+        card.autoplay()
+        card.replay_question_audio_on_answer_side()
+        card.time_taken()
+        return len(calls)
+
+    card = col.sched.getCard()
+    assert review(card) == 2
+    assert review(card) == 0
+
+    # changing the config is noticed
+    conf = col.decks.config_dict_for_deck_id(card.did)
+    conf["autoplay"] = False
+    col.decks.save(conf)
+    assert review(card) == 2
+    assert not card.autoplay()
+
+    # as is moving the card to a deck with another config
+    did = col.decks.id("other")
+    conf = col.decks.add_config("other")
+    conf["maxTaken"] = 30
+    col.decks.update_config(conf)
+    col.decks.set_config_id_for_deck_dict(col.decks.get(did), conf["id"])
+    review(card)
+    card.did = did
+    assert review(card) == 2
+    assert card.time_limit() == 30_000
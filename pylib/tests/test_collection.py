@@ -120,6 +120,24 @@ def test_addDelTags():
     assert len(note.tags) == 2
 
 
+def test_tag_tree_children():
+    col = getEmptyCol()
+    note = col.newNote()
+    note["Front"] = "1"
+    note.tags = ["a::b::c", "a::d", "e"]
+    col.addNote(note)
+
+    top = col.tags.children()
+    assert [(c.full_name, c.child_count) for c in top.children] == [("a", 2), ("e", 0)]
+    page = col.tags.children("a", offset=1, limit=1)
+    assert page.total == 2
+    assert [c.name for c in page.children] == ["d"]
+
+    assert col.tags.search("A::", limit=10) == ["a::b", "a::b::c", "a::d"]
+    assert col.tags.search("b::", limit=10, substring=True) == ["a::b::c"]
+    assert col.tags.search("a", limit=1) == ["a"]
+
+
 def test_timestamps():
     col = getEmptyCol()
     assert len(col.models.all_names_and_ids()) == len(get_stock_notetypes(col))
@@ -312,3 +312,10 @@ def test_findDupes():
     assert not r
     # front isn't dupe
     assert col.find_dupes("Front") == []
+    # results arrive a batch at a time, with formatting ignored
+    note4["Back"] = "<b>bar</b>"
+    col.update_note(note4)
+    batches = list(col.find_dupes_in_batches("Back", batch_size=3))
+    assert [(b.checked, b.total) for b in batches] == [(3, 4), (4, 4)]
+    assert [len(b.groups) for b in batches] == [1, 0]
+    assert batches[0].groups[0] == ("bar", [note.id, note2.id, note3.id, note4.id])
@@ -3,9 +3,12 @@
 
 # coding: utf-8
 import html
+import os
 import re
 import time
 
+import pytest
+
 from anki.consts import MODEL_CLOZE
 from anki.errors import NotFoundError
 from anki.utils import is_win, strip_html
@@ -90,6 +93,55 @@ def test_fields():
     assert col.get_note(col.models.nids(m)[0]).fields == ["", "2", "1"]
 
 
+def test_field_lookup_is_shared():
+    col = getEmptyCol()
+    m = col.models.current()
+    note = col.newNote()
+    note["Front"] = "1"
+    note["Back"] = "2"
+    col.addNote(note)
+
+    # notes of the same note type revision share their field lookups
+    other = col.get_note(note.id)
+    assert other._fmap is note._fmap
+    # and can't change them for each other
+    with pytest.raises(TypeError):
+        other._fmap["Front"] = other._fmap["Back"]  # type: ignore
+    assert other.keys() == ["Front", "Back"]
+    assert other.items() == [("Front", "1"), ("Back", "2")]
+
+    # changing the note type gives later notes a new lookup
+    col.models.renameField(m, m["flds"][0], "NewFront")
+    renamed = col.get_note(note.id)
+    assert renamed._fmap is not note._fmap
+    assert renamed.keys() == ["NewFront", "Back"]
+    assert note.keys() == ["Front", "Back"]
+
+
+@pytest.mark.skipif(
+    not os.getenv("ANKI_FIELD_LOOKUP_BENCH"),
+    reason="set ANKI_FIELD_LOOKUP_BENCH to run",
+)
+def test_field_lookup_timings():
+    col = getEmptyCol()
+    note = col.newNote()
+    note["Front"] = "1"
+    col.addNote(note)
+    backend_note = col._backend.get_note(note.id)
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        note._load_from_backend_note(backend_note)
+        note.items()
+    shared = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(10_000):
+        fmap = col.models.field_map(note.note_type())
+        [(f["name"], note.fields[ord]) for ord, f in sorted(fmap.values())]
+    rebuilt = time.perf_counter() - start
+    print(f"10k notes: {shared * 1000:.0f}ms shared, {rebuilt * 1000:.0f}ms rebuilt")
+
+
 def test_templates():
     col = getEmptyCol()
     m = col.models.current()
@@ -1183,3 +1183,59 @@ def test_initial_repeat():
 
     ivl = col.db.scalar("select ivl from revlog")
     assert ivl == -5.5 * 60
+
+
+def test_timing_is_cached_until_rollover(monkeypatch):
+    col = getEmptyCol()
+    calls = 0
+    sched_timing_today = col._backend.sched_timing_today
+
+    def counting_sched_timing_today():
+        nonlocal calls
+        calls += 1
+        return sched_timing_today()
+
+    monkeypatch.setattr(col._backend, "sched_timing_today", counting_sched_timing_today)
+
+    today = col.sched.today
+    cutoff = col.sched.day_cutoff
+    for _ in range(1000):
+        assert col.sched.today == today
+        assert col.sched.day_cutoff == cutoff
+    assert calls == 1
+
+    # changing the collection's start date or rollover hour invalidates it
+    col.crt -= 86400
+    assert col.sched.today == today + 1
+    assert calls == 2
+    prefs = col.get_preferences()
+    prefs.scheduling.rollover = (prefs.scheduling.rollover + 1) % 24
+    col.set_preferences(prefs)
+    assert col.sched.day_cutoff != cutoff
+    assert calls == 3
+
+    # as does reaching the cutoff
+    cutoff = col.sched.day_cutoff
+    monkeypatch.setattr(time, "time", lambda: cutoff)
+    col.sched.today
+    assert calls == 4
+
+
+def test_compute_memory_states():
+    col = getEmptyCol()
+    for i in range(3):
+        note = col.newNote()
+        note["Front"] = str(i)
+        col.addNote(note)
+    # graduate two of the cards
+    for _ in range(2):
+        col.sched.answerCard(col.sched.getCard(), 4)
+    cids = sorted(col.find_cards(""))
+
+    states = col.compute_memory_states(cids)
+    assert list(states) == cids
+    for cid, state in states.items():
+        assert state == col.compute_memory_state(cid)
+    assert len([s for s in states.values() if s.stability is not None]) == 2
+    (new_cid,) = col.find_cards("is:new")
+    assert col.compute_memory_states("is:new") == {new_cid: states[new_cid]}
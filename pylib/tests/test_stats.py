@@ -4,6 +4,7 @@
 import os
 import tempfile
 
+from anki.cards import CardId
 from anki.collection import CardStats
 from tests.shared import getEmptyCol
 
@@ -24,6 +25,24 @@ def test_stats():
     assert len(card_stats.revlog) == 2
 
 
+def test_stats_for_several_cards():
+    col = getEmptyCol()
+    cids = []
+    for i in range(3):
+        note = col.newNote()
+        note["Front"] = str(i)
+        col.addNote(note)
+        cids.append(note.cards()[0].id)
+    card = col.get_card(cids[1])
+    card.start_timer()
+    col.sched.answerCard(card, 3)
+
+    stats = col.card_stats_data_for_cards([*cids, CardId(1)])
+    assert [s.card_id for s in stats] == cids
+    assert [len(s.revlog) for s in stats] == [0, 1, 0]
+    assert stats[1] == col.card_stats_data(cids[1])
+
+
 def test_graphs_empty():
     col = getEmptyCol()
     assert col.stats().report()
@@ -16,3 +16,53 @@ def test_deferred_frontside():
     col.addNote(note)
 
     assert "xxtest" in note.cards()[0].answer()
+
+
+def test_custom_filter_output_is_reused():
+    from anki import hooks
+
+    col = getEmptyCol()
+    m = col.models.current()
+    m["tmpls"][0]["qfmt"] = "{{upper:Front}} {{upper:Front}}"
+    col.models.save(m)
+
+    note = col.newNote()
+    note["Front"] = "abc"
+    col.addNote(note)
+
+    calls = []
+
+    def upper(text: str, field_name: str, filter_name: str, ctx) -> str:
+        if filter_name != "upper":
+            return text
+        calls.append(text)
+        return text.upper()
+
+    hooks.field_filter.append(upper)
+    try:
+        assert note.cards()[0].question(reload=True).endswith("ABC ABC")
+        assert calls == ["abc"]
+    finally:
+        hooks.field_filter.remove(upper)
+
+
+def test_legacy_field_filter():
+    from anki import hooks
+
+    col = getEmptyCol()
+    m = col.models.current()
+    m["tmpls"][0]["qfmt"] = "{{legacy:Front}}"
+    col.models.save(m)
+
+    note = col.newNote()
+    note["Front"] = "abc"
+    col.addNote(note)
+
+    def legacy(txt, _, fields, field_name, __):
+        return f"{txt}-{dict(fields)[field_name]}"
+
+    hooks.addHook("fmod_legacy", legacy)
+    try:
+        assert note.cards()[0].question(reload=True).endswith("abc-abc")
+    finally:
+        hooks.remHook("fmod_legacy", legacy)
@@ -53,6 +53,7 @@ import cProfile
 import getpass
 import locale
 import tempfile
+import time
 import traceback
 from pathlib import Path
 
@@ -313,8 +314,19 @@ class AnkiApp(QApplication):
     KEY = f"anki{checksum(getpass.getuser())}"
     TMOUT = 30000
 
+    # events that show the user is at the keyboard; see last_input
+    _input_events = {
+        QEvent.Type.KeyPress,
+        QEvent.Type.MouseButtonPress,
+        QEvent.Type.Wheel,
+        QEvent.Type.TouchBegin,
+    }
+
     def __init__(self, argv: list[str]) -> None:
         QApplication.__init__(self, argv)
+        # monotonic time of the last input event, used to tell when the user
+        # is idle
+        self.last_input = time.monotonic()
         self.installEventFilter(self)
         self._argv = argv
         self._native_event_filter = NativeEventFilter()
@@ -407,6 +419,10 @@ class AnkiApp(QApplication):
     def eventFilter(self, src: Any, evt: QEvent | None) -> bool:
         assert evt is not None
 
+        if evt.type() in self._input_events:
+            self.last_input = time.monotonic()
+            return False
+
         pointer_classes = (
             QPushButton,
             QCheckBox,
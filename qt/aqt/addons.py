@@ -10,12 +10,13 @@ import logging
 import os
 import re
 import sys
+import time
 import traceback
 import zipfile
 from collections import defaultdict
 from collections.abc import Callable, Iterable, Sequence
-from concurrent.futures import Future
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import IO, Any, Union
@@ -26,6 +27,7 @@ import jsonschema
 import markdown
 from jsonschema.exceptions import ValidationError
 from markdown.extensions import md_in_html
+from requests.adapters import HTTPAdapter
 
 import anki
 import anki.utils
@@ -118,6 +120,10 @@ class AddonMeta:
     human_version: str | None
     update_enabled: bool
     homepage: str | None
+    # if set, the add-on is imported after startup instead of before the main
+    # window is shown, or earlier if one of the load_on_hooks hooks fires
+    lazy_load: bool = False
+    load_on_hooks: list[str] = field(default_factory=list)
 
     def human_name(self) -> str:
         return self.provided_name or self.dir_name
@@ -160,9 +166,21 @@ class AddonMeta:
             human_version=json_meta.get("human_version"),
             update_enabled=json_meta.get("update_enabled", True),
             homepage=json_meta.get("homepage"),
+            lazy_load=json_meta.get("lazy_load", False),
+            load_on_hooks=json_meta.get("load_on_hooks", []),
         )
 
 
+@dataclass
+class AddonLoadTiming:
+    # wall-clock seconds spent importing the add-on
+    secs: float
+    # modules added to sys.modules by the import
+    modules: int
+    # true if the import happened after startup
+    deferred: bool
+
+
 def package_name_valid(name: str) -> bool:
     # embedded /?
     base = os.path.basename(name)
@@ -202,6 +220,16 @@ class AddonManager:
             "human_version": {"type": "string", "meta": True},
             # add-on page on AnkiWeb or some other webpage
             "homepage": {"type": "string", "meta": True},
+            # import the add-on after the main window is shown, instead of
+            # during startup
+            "lazy_load": {"type": "boolean", "meta": True},
+            # names of gui_hooks that should import a lazily loaded add-on
+            # if they fire before it has been imported
+            "load_on_hooks": {
+                "type": "array",
+                "items": {"type": "string"},
+                "meta": True,
+            },
         },
         "required": ["package", "name"],
     }
@@ -209,6 +237,10 @@ class AddonManager:
     def __init__(self, mw: aqt.main.AnkiQt) -> None:
         self.mw = mw
         self.dirty = False
+        # keyed by add-on folder name
+        self.load_timings: dict[str, AddonLoadTiming] = {}
+        # lazily loaded add-ons that have not been imported yet
+        self._deferred: dict[str, AddonMeta] = {}
         f = self.mw.form
         qconnect(f.actionAdd_ons.triggered, self.onAddonsDialog)
         sys.path.insert(0, self.addonsFolder())
@@ -236,8 +268,6 @@ class AddonManager:
         return os.path.join(root, module)
 
     def loadAddons(self) -> None:
-        from aqt import mw
-
         broken: list[str] = []
         error_text = ""
         for addon in self.all_addon_meta():
@@ -246,61 +276,132 @@ class AddonManager:
             if not addon.compatible():
                 continue
             self.dirty = True
-            try:
-                __import__(addon.dir_name)
-            except AbortAddonImport:
-                pass
-            except Exception:
-                name = html.escape(addon.human_name())
-                page = addon.page()
-                if page:
-                    broken.append(f"<a href={page}>{name}</a>")
-                else:
-                    broken.append(name)
-                tb = traceback.format_exc()
-                print(tb)
-                error_text += f"When loading {name}:\n{tb}\n"
+            if addon.lazy_load:
+                self._defer_import(addon)
+                continue
+            if error := self._import_addon(addon, deferred=False):
+                broken.append(self._broken_addon_link(addon))
+                error_text += error
+
+        if self._deferred:
+            gui_hooks.main_window_did_init.append(self._on_main_window_did_init)
 
         if broken:
-            addons = "\n\n- " + "\n- ".join(broken)
-            error = tr.addons_failed_to_load2(
-                addons=addons,
-            )
-            txt = f"# {tr.addons_startup_failed()}\n{error}"
-            html2 = markdown.markdown(txt)
-            box: QDialogButtonBox
-            (diag, box) = showText(
-                html2,
-                type="html",
-                run=False,
+            self._show_broken_addons(broken, error_text)
+
+    def _import_addon(self, addon: AddonMeta, deferred: bool) -> str | None:
+        "Import the add-on and record how long it took. Returns any error text."
+        modules = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            __import__(addon.dir_name)
+        except AbortAddonImport:
+            pass
+        except Exception:
+            tb = traceback.format_exc()
+            print(tb)
+            return f"When loading {html.escape(addon.human_name())}:\n{tb}\n"
+        finally:
+            self.load_timings[addon.dir_name] = AddonLoadTiming(
+                secs=time.perf_counter() - start,
+                modules=len(sys.modules) - modules,
+                deferred=deferred,
             )
+        return None
 
-            def on_check() -> None:
-                tooltip(tr.addons_checking())
+    def _broken_addon_link(self, addon: AddonMeta) -> str:
+        name = html.escape(addon.human_name())
+        page = addon.page()
+        if page:
+            return f"<a href={page}>{name}</a>"
+        else:
+            return name
+
+    def _show_broken_addons(self, broken: list[str], error_text: str) -> None:
+        from aqt import mw
+
+        addons = "\n\n- " + "\n- ".join(broken)
+        error = tr.addons_failed_to_load2(
+            addons=addons,
+        )
+        txt = f"# {tr.addons_startup_failed()}\n{error}"
+        html2 = markdown.markdown(txt)
+        box: QDialogButtonBox
+        (diag, box) = showText(
+            html2,
+            type="html",
+            run=False,
+        )
 
-                def on_done(log: list[DownloadLogEntry]) -> None:
-                    if not log:
-                        tooltip(tr.addons_no_updates_available())
+        def on_check() -> None:
+            tooltip(tr.addons_checking())
 
-                mw.check_for_addon_updates(by_user=True, on_done=on_done)
+            def on_done(log: list[DownloadLogEntry]) -> None:
+                if not log:
+                    tooltip(tr.addons_no_updates_available())
 
-            def on_copy() -> None:
-                txt = supportText() + "\n" + error_text
-                QApplication.clipboard().setText(txt)
-                tooltip(tr.about_copied_to_clipboard(), parent=diag)
+            mw.check_for_addon_updates(by_user=True, on_done=on_done)
 
-            check = box.addButton(
-                tr.addons_check_for_updates(), QDialogButtonBox.ButtonRole.ActionRole
-            )
-            check.clicked.connect(on_check)
+        def on_copy() -> None:
+            txt = supportText() + "\n" + error_text
+            QApplication.clipboard().setText(txt)
+            tooltip(tr.about_copied_to_clipboard(), parent=diag)
 
-            copy = box.addButton(
-                tr.about_copy_debug_info(), QDialogButtonBox.ButtonRole.ActionRole
-            )
-            copy.clicked.connect(on_copy)
+        check = box.addButton(
+            tr.addons_check_for_updates(), QDialogButtonBox.ButtonRole.ActionRole
+        )
+        check.clicked.connect(on_check)
+
+        copy = box.addButton(
+            tr.about_copy_debug_info(), QDialogButtonBox.ButtonRole.ActionRole
+        )
+        copy.clicked.connect(on_copy)
+
+        # calling show immediately appears to crash
+        mw.progress.single_shot(1000, diag.show)
 
-            # calling show immediately appears to crash
-            mw.progress.single_shot(1000, diag.show)
+    # Lazy loading
+    ######################################################################
+
+    def _defer_import(self, addon: AddonMeta) -> None:
+        self._deferred[addon.dir_name] = addon
+        for hook_name in addon.load_on_hooks:
+            hook = getattr(gui_hooks, hook_name, None)
+            if hook is None or not hasattr(hook, "append"):
+                print(f"{addon.dir_name}: unknown hook in load_on_hooks: {hook_name}")
+                continue
+            hook.append(self._hook_trigger(addon.dir_name, hook))
+
+    def _hook_trigger(self, dir_name: str, hook: Any) -> Callable[..., Any]:
+        def trigger(*args: Any) -> Any:
+            self.load_deferred_addon(dir_name)
+            # the hook's list of callbacks can't be changed while it is firing
+            self.mw.progress.single_shot(0, lambda: hook.remove(trigger), False)
+            # when used as a filter, pass the value through unchanged
+            return args[0] if args else None
+
+        return trigger
+
+    def load_deferred_addon(self, dir_name: str) -> None:
+        """Import a lazily loaded add-on, if it has not been imported yet.
+        As it is imported after the hook that triggered it started firing,
+        any callbacks it adds to that hook will also be called."""
+        addon = self._deferred.pop(dir_name, None)
+        if addon is None:
+            return
+        if error := self._import_addon(addon, deferred=True):
+            self._show_broken_addons([self._broken_addon_link(addon)], error)
+
+    def _on_main_window_did_init(self) -> None:
+        # give the window a chance to paint first
+        self.mw.progress.single_shot(0, self._load_next_deferred_addon, False)
+
+    def _load_next_deferred_addon(self) -> None:
+        if not self._deferred:
+            return
+        self.load_deferred_addon(next(iter(self._deferred)))
+        # one per event loop iteration, so the UI remains responsive
+        self.mw.progress.single_shot(0, self._load_next_deferred_addon, False)
 
     def onAddonsDialog(self) -> None:
         aqt.dialogs.open("AddonsDialog", self)
@@ -882,6 +983,16 @@ class AddonsDialog(QDialog):
             ver = int_version_to_str(max)
             return f"Anki <= {ver}"
 
+    def load_time_string(self, addon: AddonMeta) -> str:
+        if addon.dir_name in self.mgr._deferred:
+            return tr.addons_not_loaded_yet()
+        timing = self.mgr.load_timings.get(addon.dir_name)
+        if timing is None:
+            return ""
+        return tr.addons_load_time(
+            milliseconds=round(timing.secs * 1000), modules=timing.modules
+        )
+
     def should_grey(self, addon: AddonMeta) -> bool:
         return not addon.enabled or not addon.compatible()
 
@@ -900,6 +1011,7 @@ class AddonsDialog(QDialog):
         for addon in self.addons:
             name = self.name_for_addon_list(addon)
             item = QListWidgetItem(name, addonList)
+            item.setToolTip(self.load_time_string(addon))
             if self.should_grey(addon):
                 item.setForeground(Qt.GlobalColor.gray)
             if addon.dir_name in selected:
@@ -1194,6 +1306,15 @@ def download_and_install_addon(
 ) -> DownloadLogEntry:
     "Download and install a single add-on."
     result = download_addon(client, id)
+    return install_downloaded_addon(mgr, id, result, force_enable=force_enable)
+
+
+def install_downloaded_addon(
+    mgr: AddonManager,
+    id: int,
+    result: DownloadOk | DownloadError,
+    force_enable: bool = False,
+) -> DownloadLogEntry:
     if isinstance(result, DownloadError):
         return (id, result)
 
@@ -1218,6 +1339,46 @@ def download_and_install_addon(
     return (id, result2)
 
 
+# add-ons downloaded at once
+DOWNLOAD_WORKERS = 6
+# connections opened to any one host; other downloads wait for a free one
+CONNECTIONS_PER_HOST = 4
+
+
+def limit_connections_per_host(client: HttpClient) -> None:
+    adapter = HTTPAdapter(pool_maxsize=CONNECTIONS_PER_HOST, pool_block=True)
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+
+
+def download_and_install_addons(
+    mgr: AddonManager,
+    client: HttpClient,
+    ids: list[int],
+    force_enable: bool = False,
+    on_downloaded: Callable[[int], None] | None = None,
+) -> list[DownloadLogEntry]:
+    """Download add-ons in parallel, installing each on the calling thread as
+    soon as it arrives, so that installs never overlap. on_downloaded() is
+    called with the number of finished downloads. The log is returned in the
+    order of ids."""
+    limit_connections_per_host(client)
+    unique_ids = list(dict.fromkeys(ids))
+    log: dict[int, DownloadLogEntry] = {}
+    with ThreadPoolExecutor(
+        max_workers=DOWNLOAD_WORKERS, thread_name_prefix="addon_download"
+    ) as executor:
+        futures = {executor.submit(download_addon, client, id): id for id in unique_ids}
+        for count, future in enumerate(as_completed(futures), start=1):
+            if on_downloaded:
+                on_downloaded(count)
+            id = futures[future]
+            log[id] = install_downloaded_addon(
+                mgr, id, future.result(), force_enable=force_enable
+            )
+    return [log[id] for id in unique_ids]
+
+
 class DownloaderInstaller(QObject):
     progressSignal = pyqtSignal(int, int)
 
@@ -1240,6 +1401,8 @@ class DownloaderInstaller(QObject):
     ) -> None:
         self.ids = ids
         self.log: list[DownloadLogEntry] = []
+        # downloads finished so far; written by the background thread
+        self.downloaded = 0
 
         self.dl_bytes = 0
         self.last_tooltip = 0
@@ -1255,21 +1418,31 @@ class DownloaderInstaller(QObject):
 
     def _progress_callback(self, up: int, down: int) -> None:
         self.dl_bytes += down
+        self._update_progress()
+
+    def _update_progress(self) -> None:
         self.mgr.mw.progress.update(
             label=tr.addons_downloading_adbd_kb02fkb(
-                part=len(self.log) + 1,
+                part=min(self.downloaded + 1, len(self.ids)),
                 total=len(self.ids),
                 kilobytes=self.dl_bytes // 1024,
-            )
+            ),
+            value=self.downloaded,
+            max=len(self.ids),
         )
 
+    def _on_downloaded(self, count: int) -> None:
+        self.downloaded = count
+        self.mgr.mw.taskman.run_on_main(self._update_progress)
+
     def _download_all(self, force_enable: bool = False) -> None:
-        for id in self.ids:
-            self.log.append(
-                download_and_install_addon(
-                    self.mgr, self.client, id, force_enable=force_enable
-                )
-            )
+        self.log = download_and_install_addons(
+            self.mgr,
+            self.client,
+            self.ids,
+            force_enable=force_enable,
+            on_downloaded=self._on_downloaded,
+        )
 
     def _download_done(self, future: Future) -> None:
         self.mgr.mw.progress.finish()
@@ -1480,17 +1653,28 @@ class ChooseAddonsToUpdateDialog(QDialog):
         QDialog.accept(self)
 
 
-def fetch_update_info(ids: list[int]) -> list[AddonInfo]:
-    """Fetch update info from AnkiWeb in one or more batches."""
-    all_info: list[AddonInfo] = []
+# add-ons per update info request, and requests made at once
+UPDATE_INFO_CHUNK_SIZE = 25
+UPDATE_INFO_WORKERS = 4
 
-    while ids:
-        # get another chunk
-        chunk = ids[:25]
-        del ids[:25]
 
-        batch_results = _fetch_update_info_batch(chunk)
-        all_info.extend(batch_results)
+def fetch_update_info(ids: list[int]) -> list[AddonInfo]:
+    """Fetch update info from AnkiWeb in one or more batches, which are
+    requested in parallel."""
+    chunks = [
+        ids[i : i + UPDATE_INFO_CHUNK_SIZE]
+        for i in range(0, len(ids), UPDATE_INFO_CHUNK_SIZE)
+    ]
+    if len(chunks) <= 1:
+        return [info for chunk in chunks for info in _fetch_update_info_batch(chunk)]
+
+    all_info: list[AddonInfo] = []
+    with ThreadPoolExecutor(
+        max_workers=UPDATE_INFO_WORKERS, thread_name_prefix="addon_update_info"
+    ) as executor:
+        # map() preserves the order of the chunks
+        for batch_results in executor.map(_fetch_update_info_batch, chunks):
+            all_info.extend(batch_results)
 
     return all_info
 
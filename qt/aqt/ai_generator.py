@@ -4,14 +4,23 @@
 """
 AI Example Generator Backend
 Uses free Hugging Face API to generate example sentences
+
+Set ANKI_AI_ENDPOINT to send requests to another server, eg a local one for
+testing; the model name is appended to it.
 """
 
 import json
+import os
 import urllib.request
 import urllib.error
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Union
 import re
 
+import aqt
+from anki.utils import checksum
+from aqt.filecache import FileCache
+
 
 class AIExampleGenerator:
     """Generate example sentences using AI models"""
@@ -25,16 +34,35 @@ class AIExampleGenerator:
         "phi-2": "https://api-inference.huggingface.co/models/microsoft/phi-2",
     }
 
-    def __init__(self, api_token: Optional[str] = None):
+    # examples are requested in parallel, up to this many at once
+    MAX_WORKERS = 4
+
+    def __init__(
+        self,
+        api_token: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        timeout: float = 30,
+    ):
         """
         Initialize AI Example Generator
 
         Args:
             api_token: Optional Hugging Face API token for higher rate limits
                       Get free token from: https://huggingface.co/settings/tokens
+            endpoint: Optional server to use instead of Hugging Face
+            cache_dir: Optional folder to keep generated text in, so that
+                      repeated requests don't hit the API
+            timeout: Seconds to wait for each request
         """
         self.api_token = api_token
         self.current_model = "gpt2"
+        self.endpoint = endpoint or os.environ.get("ANKI_AI_ENDPOINT")
+        self.cache = FileCache(cache_dir) if cache_dir else None
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.MAX_WORKERS, thread_name_prefix="ai-examples"
+        )
 
     def set_model(self, model_name: str) -> None:
         """Set the AI model to use"""
@@ -63,26 +91,80 @@ class AIExampleGenerator:
             List of example sentences
         """
         examples = []
+        prompts = [self._create_prompt(word, i, context) for i in range(count)]
 
-        for i in range(count):
-            try:
-                prompt = self._create_prompt(word, i, context)
-                example = self._call_api(prompt, max_length)
-
-                if example and len(example.strip()) > 0:
-                    cleaned = self._clean_text(example, prompt)
-                    if cleaned:
-                        examples.append(cleaned)
-            except Exception as e:
-                print(f"Error generating example {i+1}: {e}")
+        for i, (prompt, example) in enumerate(
+            zip(prompts, self._generate_all(prompts, max_length))
+        ):
+            if isinstance(example, BaseException):
+                print(f"Error generating example {i+1}: {example}")
                 continue
 
+            if example and len(example.strip()) > 0:
+                cleaned = self._clean_text(example, prompt)
+                if cleaned:
+                    examples.append(cleaned)
+
         # If no examples generated, return fallback
         if not examples:
             return self._get_fallback_examples(word)
 
         return examples
 
+    def _generate_all(
+        self, prompts: List[str], max_length: int
+    ) -> List[Union[str, BaseException]]:
+        """Generate text for all prompts at once. Requests that take longer
+        than the timeout are given up on, though their results are still
+        cached if they arrive later. Only MAX_WORKERS requests run at a time,
+        so each round of them is allowed the timeout."""
+        # the same prompt may be asked for more than once, and each should
+        # produce a different example
+        seen: Dict[str, int] = {}
+        futures = []
+        for prompt in prompts:
+            sample = seen[prompt] = seen.get(prompt, -1) + 1
+            futures.append(
+                self._executor.submit(self._generate, prompt, max_length, sample)
+            )
+
+        rounds = -(-len(futures) // self.MAX_WORKERS)
+        done, _ = wait(futures, timeout=self.timeout * rounds)
+
+        results: List[Union[str, BaseException]] = []
+        for future in futures:
+            if future not in done:
+                future.cancel()
+                results.append(TimeoutError("request took too long"))
+            elif error := future.exception():
+                results.append(error)
+            else:
+                results.append(future.result())
+        return results
+
+    def _generate(self, prompt: str, max_length: int, sample: int) -> str:
+        """Return generated text for a prompt, from the cache if possible"""
+        if not self.cache:
+            return self._call_api(prompt, max_length)
+
+        def write(path: str) -> None:
+            text = self._call_api(prompt, max_length)
+            if not text:
+                # don't remember failures
+                raise ValueError("empty response")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(text)
+
+        key = checksum(f"{self._model_url()}-{max_length}-{sample}-{prompt}")
+        path = self.cache.get_or_create(key, ".txt", write)
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+
+    def _model_url(self) -> str:
+        if self.endpoint:
+            return f"{self.endpoint.rstrip('/')}/{self.current_model}"
+        return self.MODELS[self.current_model]
+
     def _create_prompt(self, word: str, variation: int, context: Optional[str]) -> str:
         """Create a prompt for the AI model"""
         prompts = [
@@ -101,7 +183,7 @@ class AIExampleGenerator:
 
     def _call_api(self, prompt: str, max_length: int) -> str:
         """Call Hugging Face Inference API"""
-        url = self.MODELS[self.current_model]
+        url = self._model_url()
 
         headers = {"Content-Type": "application/json"}
 
@@ -126,7 +208,7 @@ class AIExampleGenerator:
         )
 
         try:
-            with urllib.request.urlopen(req, timeout=30) as response:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
                 result = json.loads(response.read().decode("utf-8"))
 
                 if isinstance(result, list) and len(result) > 0:
@@ -186,7 +268,10 @@ def get_generator(api_token: Optional[str] = None) -> AIExampleGenerator:
     """Get or create the AI generator instance"""
     global _generator
     if _generator is None:
-        _generator = AIExampleGenerator(api_token)
+        cache_dir = None
+        if aqt.mw and aqt.mw.pm.name:
+            cache_dir = os.path.join(aqt.mw.pm.profileFolder(), "ai-examples")
+        _generator = AIExampleGenerator(api_token, cache_dir=cache_dir)
     return _generator
 
 
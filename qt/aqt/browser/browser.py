@@ -135,7 +135,9 @@ class Browser(QMainWindow):
         self.lastFilter = ""
         self.focusTo: int | None = None
         self._previewer: Previewer | None = None
-        self._card_info = BrowserCardInfo(self.mw)
+        self._card_info = BrowserCardInfo(
+            self.mw, lambda: self.table.get_card_ids_near_current(rows=5)
+        )
         self._closeEventHasCleanedUp = False
         self.auto_layout = True
         self.aspect_ratio = 0.0
@@ -186,6 +188,7 @@ class Browser(QMainWindow):
         self, changes: OpChanges, handler: object | None
     ) -> None:
         focused = current_window() == self
+        self._card_info.clear_prefetched()
         self.table.op_executed(changes, handler, focused)
         self.sidebar.op_executed(changes, handler, focused)
         if changes.note_text:
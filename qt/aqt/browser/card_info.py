@@ -4,7 +4,8 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Sequence
 
 from google.protobuf.json_format import MessageToDict
 
@@ -30,6 +31,9 @@ class CardInfoDialog(QDialog):
     TITLE = "browser card info"
     GEOMETRY_KEY = "revlog"
     silentlyClose = True
+    # while the card changes in quick succession, as when moving through
+    # the browser's rows, the dialog is updated at most this often
+    UPDATE_INTERVAL_MS = 100
 
     def __init__(
         self,
@@ -39,10 +43,18 @@ class CardInfoDialog(QDialog):
         on_close: Callable | None = None,
         geometry_key: str | None = None,
         window_title: str | None = None,
+        nearby_card_ids: Callable[[], Sequence[CardId]] | None = None,
     ) -> None:
         super().__init__(parent)
         self.mw = mw
         self._on_close = on_close
+        # cards that are likely to be shown next, whose stats are prefetched
+        self._nearby_card_ids = nearby_card_ids
+        self._card_id = card.id if card else None
+        self._last_update = 0.0
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        qconnect(self._update_timer.timeout, self._update_card)
         self.GEOMETRY_KEY = geometry_key or self.GEOMETRY_KEY
         if window_title:
             self.setWindowTitle(window_title)
@@ -125,15 +137,40 @@ class CardInfoDialog(QDialog):
         tooltip(tr.about_copied_to_clipboard())
 
     def update_card(self, card_id: CardId | None) -> None:
+        self._card_id = card_id
+        if self._update_timer.isActive():
+            # the latest card will be shown when it fires
+            return
+        elapsed_ms = int((time.monotonic() - self._last_update) * 1000)
+        if elapsed_ms < self.UPDATE_INTERVAL_MS:
+            self._update_timer.start(self.UPDATE_INTERVAL_MS - elapsed_ms)
+        else:
+            self._update_card()
+
+    def _update_card(self) -> None:
+        if self.web is None:
+            return
+        self._last_update = time.monotonic()
+        card_id = self._card_id
         try:
             self.mw.col.get_card(card_id)
         except NotFoundError:
             card_id = None
 
-        assert self.web is not None
         self.web.eval(f"anki.updateCard('{card_id}');")
+        if card_id is not None and self._nearby_card_ids:
+            card_ids = [int(cid) for cid in self._nearby_card_ids()]
+            self.web.eval(f"anki.prefetchCardStats({json.dumps(card_ids)});")
+
+    def clear_prefetched(self) -> None:
+        "Drop prefetched stats, which the collection may have changed."
+        if self._nearby_card_ids is None:
+            return
+        assert self.web is not None
+        self.web.eval("anki.clearPrefetchedCardStats();")
 
     def reject(self) -> None:
+        self._update_timer.stop()
         if self._on_close:
             self._on_close()
         assert self.web is not None
@@ -146,10 +183,17 @@ class CardInfoDialog(QDialog):
 class CardInfoManager:
     """Wrapper class to conveniently toggle, update and close a card info dialog."""
 
-    def __init__(self, mw: aqt.AnkiQt, geometry_key: str, window_title: str):
+    def __init__(
+        self,
+        mw: aqt.AnkiQt,
+        geometry_key: str,
+        window_title: str,
+        nearby_card_ids: Callable[[], Sequence[CardId]] | None = None,
+    ):
         self.mw = mw
         self.geometry_key = geometry_key
         self.window_title = window_title
+        self.nearby_card_ids = nearby_card_ids
         self._card: Card | None = None
         self._dialog: CardInfoDialog | None = None
 
@@ -165,6 +209,7 @@ class CardInfoManager:
                 self._on_close,
                 self.geometry_key,
                 self.window_title,
+                self.nearby_card_ids,
             )
 
     def set_card(self, card: Card | None) -> None:
@@ -172,6 +217,10 @@ class CardInfoManager:
         if self._dialog:
             self._dialog.update_card(card.id if card else None)
 
+    def clear_prefetched(self) -> None:
+        if self._dialog:
+            self._dialog.clear_prefetched()
+
     def close(self) -> None:
         if self._dialog:
             self._dialog.reject()
@@ -181,13 +230,18 @@ class CardInfoManager:
 
 
 class BrowserCardInfo(CardInfoManager):
-    def __init__(self, mw: aqt.AnkiQt):
+    def __init__(
+        self,
+        mw: aqt.AnkiQt,
+        nearby_card_ids: Callable[[], Sequence[CardId]] | None = None,
+    ):
         super().__init__(
             mw,
             "revlog",
             without_unicode_isolation(
                 tr.card_stats_current_card(context=tr.qt_misc_browse())
             ),
+            nearby_card_ids,
         )
 
 
@@ -4,13 +4,15 @@
 from __future__ import annotations
 
 import html
+import time
+from functools import partial
 from typing import Any
 
 import anki
 import anki.find
 import aqt
 import aqt.forms
-from anki.collection import SearchNode
+from anki.collection import Collection, SearchNode
 from anki.notes import NoteId
 from aqt.qt import *
 from aqt.qt import sip
@@ -67,9 +69,9 @@ class FindDuplicatesDialog(QDialog):
             field = fields[form.fields.currentIndex()]
             QueryOp(
                 parent=self.browser,
-                op=lambda col: col.find_dupes(field, search_text),
+                op=lambda col: self._find_duplicates(col, field, search_text),
                 success=self.show_duplicates_report,
-            ).run_in_background()
+            ).with_progress().run_in_background()
 
         search = form.buttonBox.addButton(
             tr.actions_search(), QDialogButtonBox.ButtonRole.ActionRole
@@ -80,6 +82,35 @@ class FindDuplicatesDialog(QDialog):
         qconnect(search.clicked, on_click)
         self.show()
 
+    # seconds between updates of the partial report
+    REPORT_INTERVAL = 0.5
+
+    def _find_duplicates(
+        self, col: Collection, field: str, search: str
+    ) -> list[tuple[str, list[NoteId]]]:
+        "Runs on a background thread. Cancelling keeps the groups found so far."
+        dupes: list[tuple[str, list[NoteId]]] = []
+        last_report = time.monotonic()
+        for batch in col.find_dupes_in_batches(field, search):
+            dupes.extend(batch.groups)
+            if self.mw.progress.want_cancel():
+                break
+            if time.monotonic() - last_report < self.REPORT_INTERVAL:
+                continue
+            last_report = time.monotonic()
+            # later batches append to the groups, so the main thread gets a copy
+            found = [(val, list(nids)) for val, nids in dupes]
+            self.mw.taskman.run_on_main(
+                partial(self._on_search_progress, batch.checked, batch.total, found)
+            )
+        return dupes
+
+    def _on_search_progress(
+        self, checked: int, total: int, dupes: list[tuple[str, list[NoteId]]]
+    ) -> None:
+        self.mw.progress.update(value=checked, max=total)
+        self.show_duplicates_report(dupes)
+
     def show_duplicates_report(self, dupes: list[tuple[str, list[NoteId]]]) -> None:
         if sip.isdeleted(self):
             return
@@ -79,7 +79,9 @@ class SidebarItem:
         self.id = id
         self.search_node = search_node
         self.on_expanded = on_expanded
-        self.children: list[SidebarItem] = []
+        self._children: list[SidebarItem] = []
+        # if set, called to add the children the first time they are needed
+        self._load_children: Callable[[], None] | None = None
         self.tooltip: str = name
         self._parent_item: SidebarItem | None = None
         self._expanded = expanded
@@ -87,10 +89,41 @@ class SidebarItem:
         self._search_matches_self = False
         self._search_matches_child = False
 
+    @property
+    def children(self) -> list[SidebarItem]:
+        self.load_children()
+        return self._children
+
+    @children.setter
+    def children(self, children: list[SidebarItem]) -> None:
+        self._children = children
+        self._load_children = None
+
     def add_child(self, cb: SidebarItem) -> None:
-        self.children.append(cb)
+        cb._row_in_parent = len(self._children)
+        self._children.append(cb)
         cb._parent_item = self
 
+    def set_lazy_children(self, load: Callable[[], None]) -> None:
+        """Defer adding children until they are first accessed, eg when the
+        item is expanded or searched. `load` should add them with add_child()."""
+        self._load_children = load
+
+    def load_children(self) -> None:
+        if load := self._load_children:
+            self._load_children = None
+            load()
+
+    def children_loaded(self) -> bool:
+        return self._load_children is None
+
+    def loaded_children(self) -> list[SidebarItem]:
+        "Children that have been created so far, without loading any more."
+        return self._children
+
+    def has_children(self) -> bool:
+        return bool(self._children) or not self.children_loaded()
+
     def add_simple(
         self,
         name: str,
@@ -19,8 +19,8 @@ class SidebarModel(QAbstractItemModel):
         self._cache_rows(root)
 
     def _cache_rows(self, node: SidebarItem) -> None:
-        "Cache index of children in parent."
-        for row, item in enumerate(node.children):
+        "Cache index of children in parent. Children loaded later cache their own."
+        for row, item in enumerate(node.loaded_children()):
             item._row_in_parent = row
             self._cache_rows(item)
 
@@ -34,6 +34,31 @@ class SidebarModel(QAbstractItemModel):
     def search(self, text: str) -> bool:
         return self.root.search(text.lower())
 
+    def replace_top_level_items(
+        self, old: list[SidebarItem], new: list[SidebarItem], row: int
+    ) -> None:
+        """Replace the consecutive top-level items `old`, which start at `row`,
+        with `new`, leaving the rest of the tree and the view's state intact."""
+        children = self.root.loaded_children()
+
+        def renumber() -> None:
+            for idx, item in enumerate(children):
+                item._row_in_parent = idx
+
+        if old:
+            self.beginRemoveRows(QModelIndex(), row, row + len(old) - 1)
+            del children[row : row + len(old)]
+            renumber()
+            self.endRemoveRows()
+        if new:
+            self.beginInsertRows(QModelIndex(), row, row + len(new) - 1)
+            children[row:row] = new
+            for item in new:
+                item._parent_item = self.root
+                self._cache_rows(item)
+            renumber()
+            self.endInsertRows()
+
     # Qt API
     ######################################################################
 
@@ -44,6 +69,14 @@ class SidebarModel(QAbstractItemModel):
             item: SidebarItem = parent.internalPointer()
             return len(item.children)
 
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return True
+        # answered without loading lazy children, which only happens when
+        # the view asks for the row count of an expanded item
+        item: SidebarItem = parent.internalPointer()
+        return item.has_children()
+
     def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
         return 1
 
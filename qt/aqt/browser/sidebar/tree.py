@@ -4,12 +4,14 @@ from __future__ import annotations
 
 from collections.abc import Callable, Iterable
 from enum import Enum, auto
+from functools import partial
 from typing import cast
 
 import aqt
 import aqt.browser
 import aqt.operations
 from anki.collection import (
+    Collection,
     Config,
     OpChanges,
     OpChangesWithCount,
@@ -81,6 +83,14 @@ class SidebarTreeView(QTreeView):
         self.current_search: str | None = None
         self.valid_drop_types: tuple[SidebarItemType, ...] = ()
         self._refresh_needed = False
+        # sections to rebuild on the next refresh_if_needed(); None for all
+        self._stale_stages: set[SidebarStage] | None = set()
+        # the top-level items each stage added to the current model
+        self._stage_items: dict[SidebarStage, list[SidebarItem]] = {}
+        # true while expansion state is being restored
+        self._restoring_expansion = False
+        # the full tag tree, fetched at most once per search
+        self._searched_tag_tree: TagTreeNode | None = None
 
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.onContextMenu)  # type: ignore
@@ -151,13 +161,37 @@ class SidebarTreeView(QTreeView):
     ) -> None:
         if changes.browser_sidebar and handler is not self:
             self._refresh_needed = True
+            stages = self._stages_for_changes(changes)
+            if stages is None or self._stale_stages is None:
+                self._stale_stages = None
+            else:
+                self._stale_stages |= stages
         if focused:
             self.refresh_if_needed()
 
+    @staticmethod
+    def _stages_for_changes(changes: OpChanges) -> set[SidebarStage] | None:
+        "The sections affected by changes, or None if it could be any of them."
+        if changes.config:
+            # saved searches, the current deck, collapse state, and so on
+            return None
+        stages = set()
+        if changes.tag:
+            stages.add(SidebarStage.TAGS)
+        if changes.deck:
+            stages.add(SidebarStage.DECKS)
+        if changes.notetype:
+            stages.add(SidebarStage.NOTETYPES)
+        return stages or None
+
     def refresh_if_needed(self) -> None:
         if self._refresh_needed:
-            self.refresh()
+            if self._stale_stages and self.model() and not self.current_search:
+                self.refresh_stages(self._stale_stages)
+            else:
+                self.refresh()
             self._refresh_needed = False
+            self._stale_stages = set()
 
     def refresh(self, new_current: SidebarItem | None = None) -> None:
         "Refresh list. No-op if sidebar is not visible."
@@ -167,10 +201,15 @@ class SidebarTreeView(QTreeView):
         if not new_current and self.model() and (idx := self.currentIndex()):
             new_current = self.model().item_for_index(idx)
 
-        def on_done(root: SidebarItem) -> None:
+        def build(_: Collection) -> tuple[SidebarItem, dict]:
+            root = SidebarItem("", "", item_type=SidebarItemType.ROOT)
+            return root, self._build_stages(root, list(SidebarStage))
+
+        def on_done(out: tuple[SidebarItem, dict]) -> None:
             # user may have closed browser
             if sip.isdeleted(self):
                 return
+            root, self._stage_items = out
 
             # block repainting during refreshing to avoid flickering
             self.setUpdatesEnabled(False)
@@ -194,12 +233,79 @@ class SidebarTreeView(QTreeView):
                 self._selection_model().selectionChanged, self._on_selection_changed
             )
 
-        QueryOp(
-            parent=self.browser, op=lambda _: self._root_tree(), success=on_done
-        ).run_in_background()
+        QueryOp(parent=self.browser, op=build, success=on_done).run_in_background()
+
+    def refresh_stages(self, stages: Iterable[SidebarStage]) -> None:
+        """Rebuild only the given sections of the tree, keeping the rest of it,
+        and what is expanded and selected. No-op if sidebar is not visible."""
+        if not self.isVisible():
+            return
+
+        model = self.model()
+        ordered = [stage for stage in SidebarStage if stage in stages]
+
+        def build(_: Collection) -> dict[SidebarStage, list[SidebarItem]]:
+            root = SidebarItem("", "", item_type=SidebarItemType.ROOT)
+            return self._build_stages(root, ordered)
+
+        def on_done(built: dict[SidebarStage, list[SidebarItem]]) -> None:
+            if sip.isdeleted(self) or self.model() is not model:
+                return
+            current = None
+            if (idx := self.currentIndex()).isValid():
+                current = model.item_for_index(idx)
+            current_replaced = current is not None and any(
+                self._top_level_item(current) in self._stage_items.get(stage, [])
+                for stage in ordered
+            )
+
+            self.setUpdatesEnabled(False)
+            try:
+                for stage in ordered:
+                    if not self._replace_stage(model, stage, built[stage]):
+                        # top level was changed by something else
+                        self.refresh(current)
+                        return
+                if current and current_replaced:
+                    self.restore_current(current)
+            finally:
+                self.setUpdatesEnabled(True)
+
+        QueryOp(parent=self.browser, op=build, success=on_done).run_in_background()
+
+    def _top_level_item(self, item: SidebarItem) -> SidebarItem:
+        while item._parent_item and item._parent_item._parent_item:
+            item = item._parent_item
+        return item
+
+    def _replace_stage(
+        self, model: SidebarModel, stage: SidebarStage, new: list[SidebarItem]
+    ) -> bool:
+        children = model.root.loaded_children()
+        old = self._stage_items.get(stage, [])
+        if old:
+            row = old[0]._row_in_parent
+            if row is None or children[row : row + len(old)] != old:
+                return False
+        else:
+            # after the items of the preceding stages
+            row = 0
+            for earlier in SidebarStage:
+                if earlier is stage:
+                    break
+                if items := self._stage_items.get(earlier):
+                    row = (items[-1]._row_in_parent or 0) + 1
+
+        model.replace_top_level_items(old, new, row)
+        self._stage_items[stage] = new
+        for item in new:
+            if item.expanded:
+                # descendants are expanded by _on_expansion()
+                self.setExpanded(model.index_for_item(item), True)
+        return True
 
     def restore_current(self, current: SidebarItem) -> None:
-        if current_item := self.find_item(current.has_same_id):
+        if current_item := self.find_item(current.has_same_id, loaded_only=True):
             index = self.model().index_for_item(current_item)
 
             self._selection_model().setCurrentIndex(
@@ -211,11 +317,16 @@ class SidebarTreeView(QTreeView):
         self,
         is_target: Callable[[SidebarItem], bool],
         parent: SidebarItem | None = None,
+        loaded_only: bool = False,
     ) -> SidebarItem | None:
+        """Return the first item matching is_target. If loaded_only is set,
+        children that have not been needed yet are not searched or created."""
+
         def find_item_rec(parent: SidebarItem) -> SidebarItem | None:
             if is_target(parent):
                 return parent
-            for child in parent.children:
+            children = parent.loaded_children() if loaded_only else parent.children
+            for child in children:
                 if item := find_item_rec(child):
                     return item
             return None
@@ -230,6 +341,7 @@ class SidebarTreeView(QTreeView):
             return
 
         self.current_search = text
+        self._searched_tag_tree = None
         # start from a collapsed state, as it's faster
         self.collapseAll()
         self.setColumnHidden(0, not self.model().search(text))
@@ -251,23 +363,30 @@ class SidebarTreeView(QTreeView):
                 if not idx.isValid():
                     continue
 
-                # descend into children first
-                expand_node(idx)
-
-                if item := model.item_for_index(idx):
-                    if item.show_expanded(searching):
-                        self.setExpanded(idx, True)
-                    if item.is_highlighted() and scroll_to_first_match:
-                        self._selection_model().setCurrentIndex(
-                            idx,
-                            QItemSelectionModel.SelectionFlag.SelectCurrent,
-                        )
-                        self.scrollTo(
-                            idx, QAbstractItemView.ScrollHint.PositionAtCenter
-                        )
-                        scroll_to_first_match = False
+                item = model.item_for_index(idx)
+                if not item:
+                    continue
 
-        expand_node(parent or QModelIndex())
+                # descend into children first; unless searching, the children
+                # of collapsed items are skipped, so they aren't loaded early
+                if searching or item.expanded:
+                    expand_node(idx)
+
+                if item.show_expanded(searching):
+                    self.setExpanded(idx, True)
+                if item.is_highlighted() and scroll_to_first_match:
+                    self._selection_model().setCurrentIndex(
+                        idx,
+                        QItemSelectionModel.SelectionFlag.SelectCurrent,
+                    )
+                    self.scrollTo(idx, QAbstractItemView.ScrollHint.PositionAtCenter)
+                    scroll_to_first_match = False
+
+        self._restoring_expansion = True
+        try:
+            expand_node(parent or QModelIndex())
+        finally:
+            self._restoring_expansion = False
 
     def update_search(
         self,
@@ -493,6 +612,9 @@ class SidebarTreeView(QTreeView):
             return
         if item := self.model().item_for_index(idx):
             item.expanded = True
+            if not self._restoring_expansion:
+                # children may have just been loaded
+                self._expand_where_necessary(self.model(), idx)
 
     def _on_collapse(self, idx: QModelIndex) -> None:
         if self.current_search:
@@ -503,17 +625,20 @@ class SidebarTreeView(QTreeView):
     # Tree building
     ###########################
 
-    def _root_tree(self) -> SidebarItem:
-        root = SidebarItem("", "", item_type=SidebarItemType.ROOT)
-
-        for stage in SidebarStage:
+    def _build_stages(
+        self, root: SidebarItem, stages: list[SidebarStage]
+    ) -> dict[SidebarStage, list[SidebarItem]]:
+        "Build stages into root, returning the top-level items each one added."
+        built = {}
+        for stage in stages:
+            start = len(root.loaded_children())
             handled = gui_hooks.browser_will_build_tree(
                 False, root, stage, self.browser
             )
             if not handled:
                 self._build_stage(root, stage)
-
-        return root
+            built[stage] = root.loaded_children()[start:]
+        return built
 
     def _build_stage(self, root: SidebarItem, stage: SidebarStage) -> None:
         if stage is SidebarStage.SAVED_SEARCHES:
@@ -747,30 +872,41 @@ class SidebarTreeView(QTreeView):
         icon = "icons:tag-outline.svg"
         icon_off = "icons:tag-off-outline.svg"
 
-        def render(
-            root: SidebarItem, nodes: Iterable[TagTreeNode], head: str = ""
-        ) -> None:
-            def toggle_expand(node: TagTreeNode) -> Callable[[bool], None]:
-                full_name = head + node.name
+        def render(root: SidebarItem, parent: str = "") -> None:
+            def toggle_expand(full_name: str) -> Callable[[bool], None]:
                 return lambda expanded: set_tag_collapsed(
                     parent=self, tag=full_name, collapsed=not expanded
                 ).run_in_background(initiator=self)
 
-            for node in nodes:
+            head = f"{parent}::" if parent else ""
+            # only the children of expanded or searched tags are fetched; a
+            # search visits every tag, so it reads them from the full tree
+            # instead of making a call for each parent
+            if self.current_search:
+                nodes = [
+                    (node.name, node.collapsed, bool(node.children))
+                    for node in self._searched_tag_children(parent)
+                ]
+            else:
+                nodes = [
+                    (node.name, node.collapsed, bool(node.child_count))
+                    for node in self.col.tags.children(parent).children
+                ]
+            for name, collapsed, has_children in nodes:
+                full_name = head + name
                 item = SidebarItem(
-                    name=node.name,
+                    name=name,
                     icon=icon,
-                    search_node=SearchNode(tag=head + node.name),
-                    on_expanded=toggle_expand(node),
-                    expanded=not node.collapsed,
+                    search_node=SearchNode(tag=full_name),
+                    on_expanded=toggle_expand(full_name),
+                    expanded=not collapsed,
                     item_type=SidebarItemType.TAG,
                     name_prefix=head,
                 )
                 root.add_child(item)
-                newhead = f"{head + node.name}::"
-                render(item, node.children, newhead)
+                if has_children:
+                    item.set_lazy_children(partial(render, item, full_name))
 
-        tree = self.col.tags.tree()
         root = self._section_root(
             root=root,
             name=tr.browsing_sidebar_tags(),
@@ -786,7 +922,20 @@ class SidebarTreeView(QTreeView):
             search_node=SearchNode(negated=SearchNode(tag="_*")),
         )
 
-        render(root, tree.children)
+        render(root)
+
+    def _searched_tag_children(self, parent: str) -> list[TagTreeNode]:
+        "Children of PARENT in the full tag tree, which is fetched once per search."
+        if self._searched_tag_tree is None:
+            self._searched_tag_tree = self.col.tags.tree()
+        node = self._searched_tag_tree
+        for name in parent.split("::") if parent else []:
+            name = name.lower()
+            child = next((c for c in node.children if c.name.lower() == name), None)
+            if child is None:
+                return []
+            node = child
+        return list(node.children)
 
     # Tree: Decks
     ###########################
@@ -821,8 +970,11 @@ class SidebarTreeView(QTreeView):
                     name_prefix=head,
                 )
                 root.add_child(item)
-                newhead = f"{head + node.name}::"
-                render(item, node.children, newhead)
+                if node.children:
+                    newhead = f"{head + node.name}::"
+                    item.set_lazy_children(
+                        partial(render, item, node.children, newhead)
+                    )
 
         tree = self.col.decks.deck_tree()
         root = self._section_root(
@@ -1018,21 +1170,26 @@ class SidebarTreeView(QTreeView):
             return
 
         selected_items = self._selected_items()
-        if not any(item.children for item in selected_items):
+        if not any(item.has_children() for item in selected_items):
             return
 
-        if any(not item.expanded for item in selected_items if item.children):
+        if any(not item.expanded for item in selected_items if item.has_children()):
             menu.addAction(tr.browsing_sidebar_expand(), lambda: set_expanded(True))
-        if any(item.expanded for item in selected_items if item.children):
+        if any(item.expanded for item in selected_items if item.has_children()):
             menu.addAction(tr.browsing_sidebar_collapse(), lambda: set_expanded(False))
         if any(
-            not c.expanded for i in selected_items for c in i.children if c.children
+            not c.expanded
+            for i in selected_items
+            for c in i.children
+            if c.has_children()
         ):
             menu.addAction(
                 tr.browsing_sidebar_expand_children(),
                 lambda: set_children_expanded(True),
             )
-        if any(c.expanded for i in selected_items for c in i.children if c.children):
+        if any(
+            c.expanded for i in selected_items for c in i.children if c.has_children()
+        ):
             menu.addAction(
                 tr.browsing_sidebar_collapse_children(),
                 lambda: set_children_expanded(False),
@@ -115,6 +115,19 @@ class Table:
     def get_card_ids_from_selected_note_ids(self) -> Sequence[CardId]:
         return self._state.card_ids_from_note_ids(self.get_selected_note_ids())
 
+    def get_card_ids_near_current(self, rows: int) -> Sequence[CardId]:
+        "The card ids of up to `rows` rows on either side of the current one."
+        if not self.has_current():
+            return []
+        current = self._current().row()
+        first, last = max(current - rows, 0), min(current + rows, self.len() - 1)
+        indices = [
+            self._model.index(row, 0)
+            for row in range(first, last + 1)
+            if row != current
+        ]
+        return self._model.get_card_ids(indices)
+
     # Selecting
 
     def select_all(self) -> None:
@@ -249,6 +249,7 @@ class DebugConsole(QDialog):
         print("\n")
         del note.fields
         del note._fmap
+        del note._field_names
         pprint.pprint(note.__dict__)
 
         print("\nCard:")
@@ -30,7 +30,7 @@ import aqt.operations
 import aqt.sound
 from anki._legacy import deprecated
 from anki.cards import Card
-from anki.collection import Config, SearchNode
+from anki.collection import Collection, Config, SearchNode
 from anki.consts import MODEL_CLOZE
 from anki.hooks import runFilter
 from anki.httpclient import HttpClient
@@ -146,6 +146,10 @@ class Editor:
         self.state: EditorState = EditorState.INITIAL
         # used for the io mask editor's context menu
         self.last_io_image_path: str | None = None
+        # field text as last received from the webview, which sends later
+        # saves relative to it
+        self._field_texts: dict[int, str] = {}
+        self._duplicate_check_id = 0
         self._init_links()
         self.setupOuter()
         self.add_webview()
@@ -416,13 +420,23 @@ require("anki/ui").loaded.then(() => require("anki/NoteEditor").instances[0].too
                 print("ignored late blur")
                 return
 
+            if type.endswith("Delta"):
+                type = type.removesuffix("Delta")
+                delta = self._apply_field_delta(ord, txt)
+                if delta is None:
+                    return
+                txt = delta
+            self._field_texts[ord] = txt
+
+            txt = self.mungeHTML(txt)
             try:
-                self.note.fields[ord] = self.mungeHTML(txt)
+                changed = self.note.fields[ord] != txt
+                self.note.fields[ord] = txt
             except IndexError:
                 print("ignored late blur after notetype change")
                 return
 
-            if not self.addMode:
+            if changed and not self.addMode:
                 self._save_current_note()
             if type == "blur":
                 self.currentField = None
@@ -433,11 +447,12 @@ require("anki/ui").loaded.then(() => require("anki/NoteEditor").instances[0].too
                     self.mw.progress.timer(
                         100, self.loadNoteKeepingFocus, False, parent=self.widget
                     )
-                else:
+                elif changed:
                     self._check_and_update_duplicate_display_async()
             else:
                 gui_hooks.editor_did_fire_typing_timer(self.note)
-                self._check_and_update_duplicate_display_async()
+                if changed:
+                    self._check_and_update_duplicate_display_async()
 
         # focused into field?
         elif cmd.startswith("focus"):
@@ -523,6 +538,21 @@ require("anki/ui").loaded.then(() => require("anki/NoteEditor").instances[0].too
         else:
             print("uncaught cmd", cmd)
 
+    def _apply_field_delta(self, ord: int, delta: str) -> str | None:
+        """Rebuild a field from a delta against the text last received for it.
+        If that text is missing, asks the webview to send the whole field."""
+        base_length, start, deleted, inserted = delta.split(":", 3)
+        base = self._field_texts.get(ord)
+        if base is not None:
+            txt = apply_field_delta(
+                base, int(base_length), int(start), int(deleted), inserted
+            )
+            if txt is not None:
+                return txt
+        print("field out of sync; requesting full text")
+        self.web.eval(f"resendField({ord});")
+        return None
+
     def mungeHTML(self, txt: str) -> str:
         return gui_hooks.editor_will_munge_html(txt, self)
 
@@ -544,6 +574,7 @@ require("anki/ui").loaded.then(() => require("anki/NoteEditor").instances[0].too
         "Make NOTE the current note."
         self.note = note
         self.currentField = None
+        self._field_texts.clear()
         if self.note:
             self.loadNote(focusTo=focusTo)
         elif hide:
@@ -664,14 +695,25 @@ require("anki/ui").loaded.then(() => require("anki/NoteEditor").instances[0].too
         if not note:
             return
 
-        def on_done(result: NoteFieldsCheckResult.V) -> None:
+        self._duplicate_check_id += 1
+        check_id = self._duplicate_check_id
+
+        def check(_: Collection) -> NoteFieldsCheckResult.V | None:
+            if check_id != self._duplicate_check_id:
+                # a later edit has queued another check, so skip the backend call
+                return None
+            return note.fields_check()
+
+        def on_done(result: NoteFieldsCheckResult.V | None) -> None:
+            if result is None or check_id != self._duplicate_check_id:
+                return
             if self.note != note:
                 return
             self._update_duplicate_display(result)
 
         QueryOp(
             parent=self.parentWindow,
-            op=lambda _: note.fields_check(),
+            op=check,
             success=on_done,
         ).run_in_background()
 
@@ -1760,6 +1802,22 @@ def fontMungeHack(font: str) -> str:
     return re.sub(" L$", " Light", font)
 
 
+def apply_field_delta(
+    base: str, base_length: int, start: int, deleted: int, inserted: str
+) -> str | None:
+    """Splice INSERTED into BASE in place of DELETED characters at START.
+    Offsets are in UTF-16 code units, as the webview counts them. Returns
+    None if BASE is not the text the delta was made against."""
+    encoded = base.encode("utf-16-le")
+    if len(encoded) != base_length * 2 or start + deleted > base_length:
+        return None
+    return (
+        encoded[: start * 2]
+        + inserted.encode("utf-16-le")
+        + encoded[(start + deleted) * 2 :]
+    ).decode("utf-16-le")
+
+
 def munge_html(txt: str, editor: Editor) -> str:
     return "" if txt in ("<br>", "<div><br></div>") else txt
 
@@ -0,0 +1,129 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+class FileCache:
+    """Generated files, kept in a folder between sessions.
+
+    Files are named after a key, usually a checksum of whatever they were
+    generated from. Once the folder grows beyond `max_bytes`, the least
+    recently used files are removed.
+    """
+
+    max_bytes = 50 * 1024 * 1024
+    # prepended to each key to form the filename
+    prefix = ""
+
+    def __init__(self, folder: str) -> None:
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self._lock = threading.Lock()
+        # filename -> size, least recently used first; read on first use
+        self._entries: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        # held while a file is generated, so that concurrent requests for
+        # the same file wait for it instead of generating it again; each lock
+        # is kept, with a count of the requests using it, until none are left
+        self._creating: dict[str, tuple[threading.Lock, int]] = {}
+
+    def get(self, key: str, ext: str) -> str | None:
+        "Return the path of a cached file, or None if it has not been created."
+        name = f"{self.prefix}{key}{ext}"
+        with self._lock:
+            entries = self._load()
+            if name not in entries:
+                return None
+            entries.move_to_end(name)
+        path = os.path.join(self.folder, name)
+        try:
+            # so the order of use survives a restart
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(name)
+            return None
+        return path
+
+    def get_or_create(self, key: str, ext: str, write: Callable[[str], None]) -> str:
+        """Return the path of a cached file, first calling write(path) to
+        create it if necessary. May be called from any thread."""
+        with self._lock:
+            lock, users = self._creating.get(key) or (threading.Lock(), 0)
+            self._creating[key] = (lock, users + 1)
+        try:
+            with lock:
+                if path := self.get(key, ext):
+                    return path
+                return self._create(key, ext, write)
+        finally:
+            with self._lock:
+                lock, users = self._creating[key]
+                if users > 1:
+                    self._creating[key] = (lock, users - 1)
+                else:
+                    del self._creating[key]
+
+    def _create(self, key: str, ext: str, write: Callable[[str], None]) -> str:
+        name = f"{self.prefix}{key}{ext}"
+        path = os.path.join(self.folder, name)
+        # write to a temporary name, so an interrupted write is never used
+        fd, tmp = tempfile.mkstemp(prefix=".", suffix=ext, dir=self.folder)
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        size = os.path.getsize(path)
+        with self._lock:
+            entries = self._load()
+            self._forget(name)
+            entries[name] = size
+            self._total_bytes += size
+            self._evict()
+        return path
+
+    def _load(self) -> OrderedDict[str, int]:
+        if self._entries is not None:
+            return self._entries
+        found = []
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                if entry.name.startswith("."):
+                    # left over from an interrupted write
+                    os.unlink(entry.path)
+                    continue
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((name, size) for _, name, size in found)
+        self._total_bytes = sum(self._entries.values())
+        self._evict()
+        return self._entries
+
+    def _forget(self, name: str) -> None:
+        assert self._entries is not None
+        self._total_bytes -= self._entries.pop(name, 0)
+
+    def _evict(self) -> None:
+        assert self._entries is not None
+        # the most recently used file is always kept
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.unlink(os.path.join(self.folder, name))
+            except FileNotFoundError:
+                pass
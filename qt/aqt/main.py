@@ -21,12 +21,15 @@ import anki.cards
 import anki.sound
 import aqt
 import aqt.forms
+import aqt.maintenance
 import aqt.mediasrv
 import aqt.mpv
 import aqt.operations
 import aqt.progress
+import aqt.shutdown
 import aqt.sound
 import aqt.stats
+import aqt.timers
 import aqt.toolbar
 import aqt.webview
 from anki import hooks
@@ -68,6 +71,7 @@ from aqt.operations.deck import set_current_deck
 from aqt.profiles import ProfileManager as ProfileManagerType
 from aqt.qt import *
 from aqt.qt import sip
+from aqt.shutdown import CloseReport, CloseTask
 from aqt.sync import sync_collection, sync_login
 from aqt.taskman import TaskManager
 from aqt.theme import Theme, theme_manager
@@ -474,7 +478,7 @@ class AnkiQt(QMainWindow):
             self.profileDiag if self.state == "profileManager" else self,
             tr.qt_misc_revert_to_backup(),
             cb=do_open,  # type: ignore
-            filter="*.colpkg",
+            filter="*.colpkg *.chunked",
             dir=self.pm.backupFolder(),
         )
 
@@ -557,11 +561,10 @@ class AnkiQt(QMainWindow):
 
             # schedule another check
             secs_until_cutoff = current_cutoff - int_time()
-            self._reviewer_refresh_timer = self.progress.timer(
+            self._reviewer_refresh_job = self.timers.after(
+                "day_rollover",
                 secs_until_cutoff * 1000,
                 refresh_reviewer_on_day_rollover_change,
-                repeat=False,
-                parent=self,
             )
 
         refresh_reviewer_on_day_rollover_change()
@@ -574,12 +577,23 @@ class AnkiQt(QMainWindow):
             onsuccess()
 
         gui_hooks.profile_will_close()
-        self.unloadCollection(callback)
+        self.unloadCollection(callback, close_tasks=self._profile_close_tasks())
+
+    def _profile_close_tasks(self) -> list[CloseTask]:
+        "Closing work that can run alongside the collection's."
+
+        def save_window_state() -> None:
+            saveGeom(self, "mainWindow")
+            saveState(self, "mainWindow")
+
+        return [
+            CloseTask("cleanup_sound", self.cleanup_sound, main_thread=True),
+            CloseTask("save_window_state", save_window_state, main_thread=True),
+            CloseTask("flush_logs", aqt.shutdown.flush_logs),
+        ]
 
     def _unloadProfile(self) -> None:
-        self.cleanup_sound()
-        saveGeom(self, "mainWindow")
-        saveState(self, "mainWindow")
+        # saved last, so it includes the timings of the close tasks
         self.pm.save()
         self.hide()
 
@@ -587,7 +601,7 @@ class AnkiQt(QMainWindow):
 
         # at this point there should be no windows left
         self._checkForUnclosedWidgets()
-        self._reviewer_refresh_timer.deleteLater()
+        self.timers.cancel(self._reviewer_refresh_job)
 
     def _checkForUnclosedWidgets(self) -> None:
         for w in self.app.topLevelWidgets():
@@ -606,6 +620,8 @@ class AnkiQt(QMainWindow):
 
     def cleanupAndExit(self) -> None:
         self.errorHandler.unload()
+        if self._signal_wakeup:
+            self._signal_wakeup.close()
         self.mediaServer.shutdown()
         # Rust background jobs are not awaited implicitly
         self.backend.await_backup_completion()
@@ -690,10 +706,14 @@ class AnkiQt(QMainWindow):
         self.col.reopen(after_full_sync=after_full_sync)
         gui_hooks.collection_did_temporarily_close(self.col)
 
-    def unloadCollection(self, onsuccess: Callable) -> None:
+    def unloadCollection(
+        self, onsuccess: Callable, close_tasks: list[CloseTask] | None = None
+    ) -> None:
+        """Close the collection, then call onsuccess. Any close_tasks are run
+        alongside the collection's own."""
+
         def after_media_sync() -> None:
-            self._unloadCollection()
-            onsuccess()
+            self._unloadCollection(onsuccess, close_tasks or [])
 
         def after_sync(synced: bool) -> None:
             self.media_syncer.show_diag_until_finished(after_media_sync)
@@ -704,45 +724,61 @@ class AnkiQt(QMainWindow):
 
         self.closeAllWindows(before_sync)
 
-    def _unloadCollection(self) -> None:
-        if not self.col:
-            return
-
-        label = (
-            tr.qt_misc_closing() if self.restoring_backup else tr.qt_misc_backing_up()
-        )
-        self.progress.start(label=label)
-
-        corrupt = False
-
-        try:
-            self.maybeOptimize()
-            if not dev_mode:
-                corrupt = self.col.db.scalar("pragma quick_check") != "ok"
-        except Exception:
-            corrupt = True
-
-        try:
-            if not corrupt and not dev_mode and not self.restoring_backup:
-                try:
-                    # default 5 minute throttle
-                    self.col.create_backup(
-                        backup_folder=self.pm.backupFolder(),
-                        force=False,
-                        wait_for_completion=False,
-                    )
-                except Exception:
-                    print("backup on close failed")
-            self.col.close(downgrade=False)
-        except Exception as e:
-            print(e)
-            corrupt = True
-        finally:
+    def _unloadCollection(
+        self, on_done: Callable[[], None], close_tasks: list[CloseTask]
+    ) -> None:
+        tasks = list(close_tasks)
+        closer = None
+        if self.col:
+            label = (
+                tr.qt_misc_closing()
+                if self.restoring_backup
+                else tr.qt_misc_backing_up()
+            )
+            self.progress.start(label=label)
+            # optimizing is left to the idle-time maintenance runner, so that
+            # closing doesn't have to wait for a vacuum. The check and backup
+            # are left to it as well, if they would take longer than the
+            # close budget allows.
+            closer = aqt.shutdown.CollectionCloser(
+                self.col,
+                check=not dev_mode,
+                backup_folder=(
+                    None
+                    if dev_mode or self.restoring_backup
+                    else self.pm.backupFolder()
+                ),
+            )
+            tasks.extend(closer.tasks())
+            # the collection is closed in the background, and must not be
+            # used in the meantime
             self.col = None
-            self.progress.finish()
 
-        if corrupt:
-            showWarning(tr.qt_misc_your_collection_file_appears_to_be())
+        def after_close(report: CloseReport) -> None:
+            self._record_close_report(report)
+            if closer:
+                self.progress.finish()
+                if closer.corrupt:
+                    showWarning(tr.qt_misc_your_collection_file_appears_to_be())
+            on_done()
+
+        aqt.shutdown.CloseTaskRunner(
+            self.taskman,
+            tasks,
+            budget_secs=self.pm.close_budget_secs(),
+            estimates=self.pm.profile.get("closeTimings"),
+        ).run(after_close)
+
+    def _record_close_report(self, report: CloseReport) -> None:
+        timings = self.pm.profile.setdefault("closeTimings", {})
+        timings.update(report.timings)
+        for name in report.deferred:
+            self.maintenance.defer(name)
+            # so that it is tried again at some point, in case it was
+            # only slow the once
+            timings[name] = timings.get(name, 0.0) / 2
+        if dev_mode or report.deferred or report.errors:
+            print(report.summary())
 
     def apply_collection_options(self) -> None:
         "Setup audio after collection loaded."
@@ -750,20 +786,6 @@ class AnkiQt(QMainWindow):
             Config.Bool.INTERRUPT_AUDIO_WHEN_ANSWERING
         )
 
-    # Auto-optimize
-    ##########################################################################
-
-    def maybeOptimize(self) -> None:
-        # have two weeks passed?
-        if (last_optimize := self.pm.profile.get("lastOptimize")) is not None:
-            if (int_time() - last_optimize) < 86400 * 14:
-                return
-        self.progress.start(label=tr.qt_misc_optimizing())
-        self.col.optimize()
-        self.pm.profile["lastOptimize"] = int_time()
-        self.pm.save()
-        self.progress.finish()
-
     # Tracking main window state (deck browser, reviewer, etc)
     ##########################################################################
 
@@ -993,6 +1015,18 @@ title="{}" {}>{}</button>""".format(
     def setupSignals(self) -> None:
         signal.signal(signal.SIGINT, self.onUnixSignal)
         signal.signal(signal.SIGTERM, self.onUnixSignal)
+        try:
+            self._signal_wakeup: aqt.timers.SignalWakeup | None = (
+                aqt.timers.SignalWakeup(self)
+            )
+        except (OSError, ValueError) as exc:
+            print(f"signal wakeup unavailable, polling instead: {exc}")
+            self._signal_wakeup = None
+            # ensure Python interpreter runs at least once per second, so that
+            # SIGINT/SIGTERM is processed without a long delay
+            self.timers.every(
+                "signal_poll", 1000, lambda: None, requires_collection=False
+            )
 
     def onUnixSignal(self, signum: Any, frame: Any) -> None:
         def quit() -> None:
@@ -1002,6 +1036,7 @@ title="{}" {}>{}</button>""".format(
 
     def setupProgress(self) -> None:
         self.progress = aqt.progress.ProgressManager(self)
+        self.timers = aqt.timers.TimerScheduler(self)
 
     def setupErrorHandler(self) -> None:
         import aqt.errors
@@ -1499,26 +1534,20 @@ title="{}" {}>{}</button>""".format(
     ##########################################################################
 
     def setup_timers(self) -> None:
+        # jobs are run from a single timer, so their wakeups are shared
         # refresh decks every 10 minutes
-        self.progress.timer(10 * 60 * 1000, self.onRefreshTimer, True, parent=self)
+        self.timers.every("refresh", 10 * 60 * 1000, self.onRefreshTimer)
         # check media sync every 5 minutes
-        self.progress.timer(
-            5 * 60 * 1000, self.on_periodic_sync_timer, True, parent=self
-        )
+        self.timers.every("media_sync", 5 * 60 * 1000, self.on_periodic_sync_timer)
         # periodic garbage collection
-        self.progress.timer(
-            15 * 60 * 1000, self.garbage_collect_now, True, False, parent=self
-        )
-        # ensure Python interpreter runs at least once per second, so that
-        # SIGINT/SIGTERM is processed without a long delay
-        self.progress.timer(1000, lambda: None, True, False, parent=self)
-        # periodic backups are checked every 5 minutes
-        self.progress.timer(
-            5 * 60 * 1000,
-            self.on_periodic_backup_timer,
-            True,
-            parent=self,
+        self.timers.every(
+            "garbage_collect",
+            15 * 60 * 1000,
+            self.garbage_collect_now,
+            requires_collection=False,
         )
+        # periodic backups and optimizing run when the user is idle
+        self.maintenance = aqt.maintenance.MaintenanceRunner(self)
 
     def onRefreshTimer(self) -> None:
         if self.state == "deckBrowser":
@@ -1540,10 +1569,6 @@ title="{}" {}>{}</button>""".format(
     # Backups
     ##########################################################################
 
-    def on_periodic_backup_timer(self) -> None:
-        """Create a backup if enough time has elapsed and collection changed."""
-        self._create_backup_with_progress(user_initiated=False)
-
     def on_create_backup_now(self) -> None:
         self._create_backup_with_progress(user_initiated=True)
 
@@ -0,0 +1,323 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+Housekeeping that runs in the background while the user is idle.
+
+Optimizing the database and creating periodic backups used to happen on a
+fixed timer, or in the case of optimizing, synchronously while the profile
+was closed. The runner below waits until there has been no user input for a
+while, the reviewer is not showing a card, and no other operation is in
+flight, then runs each due task as a series of small background steps. If
+the user returns, the remaining steps are deferred to the next idle period.
+
+Rather than checking on a fixed tick, the runner works out the earliest time
+a task could start, given when it is due and when the user will have been
+idle for long enough, and schedules a single one-off check for then.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import aqt
+from anki.collection import Collection
+from anki.utils import int_time
+from aqt import gui_hooks
+from aqt.operations import QueryOp
+from aqt.timers import ScheduledJob
+from aqt.utils import showWarning, tr
+
+
+@dataclass
+class MaintenanceStep:
+    name: str
+    op: Callable[[Collection], Any]
+    uses_collection: bool = True
+    # called on the main thread with the step's result
+    on_done: Callable[[Any], None] | None = None
+
+
+@dataclass
+class MaintenanceTask:
+    name: str
+    # seconds that should elapse between runs, or None for a task that only
+    # runs after being deferred when the profile was closed
+    interval: int | None
+    steps: Callable[[], list[MaintenanceStep]]
+    # if set, the task will be run even when the user is busy once it is
+    # this many seconds overdue
+    max_defer: int | None = None
+    # steps not yet completed in the current run
+    pending: list[MaintenanceStep] = field(default_factory=list)
+    started_at: float = 0.0
+
+
+class MaintenanceRunner:
+    """Runs due maintenance tasks when the user is idle.
+
+    Results are recorded in the profile under 'maintenance', keyed by task
+    name, with the time the task last completed, how long it took, and any
+    error message.
+    """
+
+    # seconds without input before the user is considered idle
+    IDLE_SECS = 120
+    # how long to wait before trying again when another operation is running
+    BUSY_RETRY_SECS = 60
+
+    def __init__(self, mw: aqt.AnkiQt) -> None:
+        self.mw = mw
+        self._current: MaintenanceTask | None = None
+        self._job: ScheduledJob | None = None
+        self.tasks = [
+            MaintenanceTask(
+                name="backup",
+                interval=5 * 60,
+                steps=self._backup_steps,
+                max_defer=30 * 60,
+            ),
+            MaintenanceTask(
+                name="optimize",
+                interval=86400 * 14,
+                steps=self._optimize_steps,
+            ),
+            MaintenanceTask(
+                name="check",
+                interval=None,
+                steps=self._check_steps,
+            ),
+        ]
+        gui_hooks.profile_did_open.append(self.schedule)
+        gui_hooks.profile_will_close.append(self._on_profile_will_close)
+        gui_hooks.state_did_change.append(self._on_state_did_change)
+
+    def _on_state_did_change(self, new_state: str, old_state: str) -> None:
+        # leaving the reviewer can make the user idle without any input
+        self.schedule()
+
+    def _on_profile_will_close(self) -> None:
+        # partially completed runs refer to the old profile
+        for task in self.tasks:
+            task.pending.clear()
+        self.mw.timers.cancel(self._job)
+        self._job = None
+
+    # Scheduling
+    ##########################################################################
+
+    def _idle_in(self) -> float:
+        "Seconds until the user has gone without input for long enough."
+        return max(0.0, self.mw.app.last_input + self.IDLE_SECS - time.monotonic())
+
+    def _reviewing(self) -> bool:
+        return self.mw.state == "review" and self.mw.reviewer.card is not None
+
+    def user_is_idle(self) -> bool:
+        return not self._idle_in() and not self._reviewing()
+
+    def _can_start(self) -> bool:
+        return (
+            self.mw.col is not None
+            and not self.mw.restoring_backup
+            and not self.mw._background_op_count
+            and not self.mw.progress.busy()
+        )
+
+    def results(self) -> dict[str, dict[str, Any]]:
+        return self.mw.pm.profile.setdefault("maintenance", {})
+
+    def _last_run(self, task: MaintenanceTask) -> int:
+        if task.name == "optimize":
+            # the key used before optimizing moved here, so existing profiles
+            # keep their schedule
+            return self.mw.pm.profile.get("lastOptimize") or 0
+        return self.results().get(task.name, {}).get("last", 0)
+
+    def _overdue_by(self, task: MaintenanceTask) -> int:
+        if self.results().get(task.name, {}).get("deferred"):
+            # skipped when the profile was last closed, so it's as overdue
+            # as it can be
+            return int_time()
+        if task.interval is None:
+            return -1
+        return int_time() - self._last_run(task) - task.interval
+
+    def defer(self, name: str) -> None:
+        "Run the named task as soon as possible after the profile is next opened."
+        self.results().setdefault(name, {})["deferred"] = True
+
+    def maybe_run(self) -> None:
+        self._job = None
+        if self._current:
+            return
+        if not self._can_start():
+            self.schedule()
+            return
+        idle = self.user_is_idle()
+        for task in self.tasks:
+            overdue = self._overdue_by(task)
+            if overdue < 0 and not task.pending:
+                continue
+            if idle or (task.max_defer is not None and overdue > task.max_defer):
+                self._start(task)
+                return
+        self.schedule()
+
+    def schedule(self) -> None:
+        """Arm a single check for the earliest time a task could start. Does
+        nothing while a task is running, as it schedules the next check when
+        it stops."""
+        self.mw.timers.cancel(self._job)
+        self._job = None
+        if self._current or not self.mw.pm.profile:
+            return
+        if (secs := self._secs_until_runnable()) is None:
+            return
+        if secs <= 0 and not self._can_start():
+            secs = self.BUSY_RETRY_SECS
+        self._job = self.mw.timers.after(
+            "maintenance", int(secs * 1000), self.maybe_run, slack_ms=1000
+        )
+
+    def _secs_until_runnable(self) -> float | None:
+        """Seconds until the first task could start, or None if no task will
+        become due."""
+        # while a card is shown, the user is not idle however long it sits
+        # there, and leaving the reviewer reschedules
+        idle_in = None if self._reviewing() else self._idle_in()
+        earliest = None
+        for task in self.tasks:
+            overdue = self._overdue_by(task)
+            if overdue < 0 and not task.pending:
+                if task.interval is None:
+                    continue
+                due_in = -overdue
+            else:
+                due_in = 0
+            options = []
+            if idle_in is not None:
+                options.append(max(due_in, idle_in))
+            if task.max_defer is not None:
+                # when it will be run even if the user is busy
+                options.append(max(due_in, task.max_defer - overdue + 1))
+            if options and (earliest is None or min(options) < earliest):
+                earliest = min(options)
+        return earliest
+
+    # Running
+    ##########################################################################
+
+    def _start(self, task: MaintenanceTask) -> None:
+        self._current = task
+        if not task.pending:
+            task.pending = task.steps()
+            task.started_at = time.monotonic()
+        self._run_next_step()
+
+    def _run_next_step(self) -> None:
+        task = self._current
+        assert task is not None
+
+        if not task.pending:
+            self._finish(task, error=None)
+            return
+
+        overdue = (
+            task.max_defer is not None and self._overdue_by(task) > task.max_defer
+        )
+        if not self._can_start() or not (self.user_is_idle() or overdue):
+            # user is back; pick up where we left off next time
+            self._current = None
+            self.schedule()
+            return
+
+        step = task.pending[0]
+
+        def on_success(result: Any) -> None:
+            task.pending.pop(0)
+            if step.on_done:
+                step.on_done(result)
+            self._run_next_step()
+
+        def on_failure(exc: Exception) -> None:
+            task.pending.clear()
+            self._finish(task, error=str(exc))
+
+        op = QueryOp(parent=self.mw, op=step.op, success=on_success).failure(
+            on_failure
+        )
+        if not step.uses_collection:
+            op = op.without_collection()
+        op.run_in_background()
+
+    def _finish(self, task: MaintenanceTask, error: str | None) -> None:
+        self._current = None
+        if not self.mw.pm.profile:
+            # profile closed while the task was running
+            return
+        try:
+            self._record(task, error)
+        finally:
+            self.schedule()
+
+    def _record(self, task: MaintenanceTask, error: str | None) -> None:
+        now = int_time()
+        self.results()[task.name] = dict(
+            last=now,
+            secs=round(time.monotonic() - task.started_at, 3),
+            error=error,
+        )
+        if task.name == "optimize" and not error:
+            self.mw.pm.profile["lastOptimize"] = now
+        if error and task.name == "backup":
+            showWarning(
+                tr.profiles_backup_creation_failed(reason=error), parent=self.mw
+            )
+
+    # Tasks
+    ##########################################################################
+
+    def _backup_steps(self) -> list[MaintenanceStep]:
+        backup_folder = self.mw.pm.backupFolder()
+
+        def create(col: Collection) -> bool:
+            return col.create_backup(
+                backup_folder=backup_folder, force=False, wait_for_completion=False
+            )
+
+        return [
+            MaintenanceStep(
+                "create", create, on_done=lambda _: self.mw.update_undo_actions()
+            ),
+            # compression does not block collection access
+            MaintenanceStep(
+                "await",
+                lambda col: col.await_backup_completion(),
+                uses_collection=False,
+            ),
+        ]
+
+    def _check_steps(self) -> list[MaintenanceStep]:
+        def on_done(result: str) -> None:
+            if result != "ok":
+                showWarning(tr.qt_misc_your_collection_file_appears_to_be())
+
+        return [
+            MaintenanceStep(
+                "quick_check",
+                lambda col: col.db.scalar("pragma quick_check"),
+                on_done=on_done,
+            )
+        ]
+
+    def _optimize_steps(self) -> list[MaintenanceStep]:
+        # each statement is a separate step, so that the user only has to
+        # wait for at most one of them if they return mid-way
+        return [
+            MaintenanceStep("analyze", lambda col: col.db.execute("analyze")),
+            MaintenanceStep("vacuum", lambda col: col.db.execute("vacuum")),
+        ]
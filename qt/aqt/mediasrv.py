@@ -15,6 +15,7 @@ import traceback
 from collections.abc import Callable
 from dataclasses import dataclass
 from errno import EPROTOTYPE
+from hashlib import sha1
 from http import HTTPStatus
 
 import flask
@@ -34,6 +35,7 @@ from anki.scheduler.v3 import SchedulingStatesWithContext, SetSchedulingStatesRe
 from anki.utils import dev_mode
 from aqt.changenotetype import ChangeNotetypeDialog
 from aqt.deckoptions import DeckOptionsDialog
+from aqt.filecache import FileCache
 from aqt.operations import on_op_finished
 from aqt.operations.deck import update_deck_configs as update_deck_configs_op
 from aqt.progress import ProgressUpdate
@@ -54,6 +56,8 @@ class LocalFileRequest:
     root: str
     # path to file relative to root folder
     path: str
+    # if set, images larger than this on either side may be served downscaled
+    max_px: int | None = None
 
 
 @dataclass
@@ -247,6 +251,9 @@ def _handle_local_file_request(request: LocalFileRequest) -> Response:
         )
 
     try:
+        if request.max_px and os.path.exists(fullpath):
+            if variant := _image_variant(fullpath, request.max_px):
+                fullpath = variant
         mimetype = _mime_for_path(fullpath)
         if os.path.exists(fullpath):
             if fullpath.endswith(".css"):
@@ -282,6 +289,111 @@ def _handle_local_file_request(request: LocalFileRequest) -> Response:
         return _text_response(HTTPStatus.INTERNAL_SERVER_ERROR, str(error))
 
 
+# added to image urls by the reviewer, with the larger side of its viewport in
+# device pixels
+MAX_PX_PARAM = "anki-max-px"
+# below this, the saving isn't worth a separate file
+MIN_MAX_PX = 256
+
+
+class ImageVariantCache(FileCache):
+    prefix = "img-"
+    max_bytes = 200 * 1024 * 1024
+
+
+class ImageVariants:
+    """Downscaled copies of large media images, so the webview doesn't have to
+    decode a full-size photo on every review.
+
+    Copies are generated on the server thread handling the request, and
+    cached under a checksum of the source image's content, so an edited or
+    replaced image gets a new copy. The media files themselves are never
+    modified.
+    """
+
+    def __init__(self, folder: str) -> None:
+        self.cache = ImageVariantCache(folder)
+        self._lock = threading.Lock()
+        # path -> (size, mtime, checksum, larger side in pixels)
+        self._sources: dict[str, tuple[int, int, str, int]] = {}
+
+    def variant(self, path: str, max_px: int) -> str | None:
+        """Return the path of a copy of the image at PATH that fits within
+        MAX_PX, generating it if necessary. Returns None if the image is
+        already small enough, or can't be read."""
+        digest, longest_side = self._source(path)
+        if longest_side <= max_px:
+            return None
+        is_jpeg = _mime_for_path(path) == "image/jpeg"
+        ext = ".jpg" if is_jpeg else ".png"
+
+        def write(out: str) -> None:
+            reader = QImageReader(path)
+            reader.setAutoTransform(True)
+            size = reader.size()
+            reader.setScaledSize(
+                size.scaled(max_px, max_px, Qt.AspectRatioMode.KeepAspectRatio)
+            )
+            image = reader.read()
+            if image.isNull():
+                raise Exception(reader.errorString())
+            quality = 90 if is_jpeg else -1
+            if not image.save(out, "JPG" if is_jpeg else "PNG", quality):
+                raise Exception(f"unable to write {out}")
+
+        return self.cache.get_or_create(f"{digest}-{max_px}", ext, write)
+
+    def _source(self, path: str) -> tuple[str, int]:
+        stat = os.stat(path)
+        with self._lock:
+            known = self._sources.get(path)
+        if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return known[2], known[3]
+
+        hasher = sha1()
+        with open(path, "rb") as file:
+            while chunk := file.read(1024 * 1024):
+                hasher.update(chunk)
+        size = QImageReader(path).size()
+        longest_side = max(size.width(), size.height())
+        with self._lock:
+            self._sources[path] = (
+                stat.st_size,
+                stat.st_mtime_ns,
+                hasher.hexdigest(),
+                longest_side,
+            )
+        return hasher.hexdigest(), longest_side
+
+
+_variants: ImageVariants | None = None
+_variants_lock = threading.Lock()
+
+
+def _image_variant(path: str, max_px: int) -> str | None:
+    global _variants
+    if _mime_for_path(path) not in ("image/jpeg", "image/png", "image/webp"):
+        return None
+    folder = os.path.join(aqt.mw.pm.profileFolder(), "image-variants")
+    with _variants_lock:
+        if _variants is None or _variants.cache.folder != folder:
+            _variants = ImageVariants(folder)
+        variants = _variants
+    try:
+        return variants.variant(path, max_px)
+    except Exception as error:
+        logger.warning("unable to scale %s: %s", path, error)
+        return None
+
+
+def _requested_max_px() -> int | None:
+    try:
+        max_px = int(request.args.get(MAX_PX_PARAM, ""))
+    except ValueError:
+        return None
+    return max(max_px, MIN_MAX_PX)
+
+
 def _builtin_data(path: str) -> bytes:
     """Return data from file in aqt/data folder.
     Path must use forward slash separators."""
@@ -462,7 +574,9 @@ def _extract_request(
         return NotFound(message=f"collection not open, ignore request for {path}")
 
     path = hooks.media_file_filter(path)
-    return LocalFileRequest(root=aqt.mw.col.media.dir(), path=path)
+    return LocalFileRequest(
+        root=aqt.mw.col.media.dir(), path=path, max_px=_requested_max_px()
+    )
 
 
 def congrats_info() -> bytes:
@@ -675,6 +789,7 @@ exposed_backend_list = [
     "get_change_notetype_info",
     # StatsService
     "card_stats",
+    "card_stats_batch",
     "get_review_logs",
     "graphs",
     "get_graph_preferences",
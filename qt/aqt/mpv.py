@@ -28,6 +28,7 @@
 from __future__ import annotations
 
 import inspect
+import itertools
 import json
 import os
 import platform
@@ -38,7 +39,8 @@ import sys
 import tempfile
 import threading
 import time
-from queue import Empty, Full, Queue
+from collections import deque
+from queue import Empty, Queue
 from shutil import which
 
 import aqt
@@ -114,9 +116,6 @@ class MPVBase:
         self._stop_process()
         self._stop_socket()
 
-    def _thread_id(self):
-        return threading.get_ident()
-
     #
     # Process
     #
@@ -227,12 +226,26 @@ class MPVBase:
             except OSError:
                 pass
 
+    # size of a single read from the socket
+    read_size = 65536
+
     def _prepare_thread(self):
         """Set up the queues for the communication threads."""
-        self._request_queue = Queue(1)
-        self._response_queues = {}
-        self._event_queue = Queue()
+        # requests awaiting a response, keyed by request_id
+        self._pending = {}
+        # the same requests in the order they were sent, for matching
+        # responses from mpv versions that don't echo request_id
+        self._pending_order = deque()
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        if not hasattr(self, "_event_queue"):
+            # kept across restarts, as the event thread waits on it
+            self._event_queue = Queue()
         self._stop_event = threading.Event()
+        if not is_win:
+            # written to when stopping, so the reader needn't poll
+            self._wakeup_r, self._wakeup_w = os.pipe()
 
     def _start_thread(self):
         """Start up the communication threads."""
@@ -244,18 +257,35 @@ class MPVBase:
         """Stop the communication threads."""
         if hasattr(self, "_stop_event"):
             self._stop_event.set()
+        if hasattr(self, "_wakeup_w"):
+            try:
+                os.write(self._wakeup_w, b"\0")
+            except OSError:
+                pass
         if hasattr(self, "_thread"):
             self._thread.join()
+            del self._thread
+        if hasattr(self, "_wakeup_w"):
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
+            del self._wakeup_r, self._wakeup_w
 
     def _reader(self):
         """Read the incoming json messages from the unix socket that is
         connected to the mpv process. Pass them on to the message handler.
+
+        Data is accumulated in a single bytearray. After each read, all the
+        complete lines it contains are split off at once, so a long burst of
+        messages is neither copied repeatedly nor decoded one at a time.
         """
-        buf = b""
+        buf = bytearray()
+        chunk = bytearray(self.read_size)
+        view = memoryview(chunk)
         while not self._stop_event.is_set():
+            scan_from = len(buf)
             if is_win:
                 try:
-                    (n, b) = win32file.ReadFile(self._sock, 4096)
+                    (n, b) = win32file.ReadFile(self._sock, self.read_size)
                     buf += b
                 except pywintypes.error as err:
                     if err.args[0] == winerror.ERROR_NO_DATA:
@@ -266,29 +296,30 @@ class MPVBase:
                     else:
                         raise
             else:
-                r, w, e = select.select([self._sock], [], [], 1)
-                if r:
-                    try:
-                        b = self._sock.recv(1024)
-                        if not b:
-                            break
-                        buf += b
-                    except ConnectionResetError:
-                        return
+                r, w, e = select.select([self._sock, self._wakeup_r], [], [])
+                if self._wakeup_r in r:
+                    return
+                try:
+                    n = self._sock.recv_into(chunk)
+                except ConnectionResetError:
+                    return
+                if not n:
+                    break
+                buf += view[:n]
 
-            newline = buf.find(b"\n")
-            while newline >= 0:
-                data = buf[: newline + 1]
-                buf = buf[newline + 1 :]
+            # only the newly read bytes need to be searched
+            end = buf.rfind(b"\n", scan_from)
+            if end < 0:
+                continue
+            data = bytes(buf[: end + 1])
+            del buf[: end + 1]
 
-                if self.debug:
-                    sys.stdout.write(f"<<< {data.decode('utf8', 'replace')}")
+            if self.debug:
+                sys.stdout.write(f"<<< {data.decode('utf8', 'replace')}")
 
-                message = self._parse_message(data)
+            for message in self._parse_messages(data):
                 self._handle_message(message)
 
-                newline = buf.find(b"\n")
-
     #
     # Message handling
     #
@@ -304,18 +335,30 @@ class MPVBase:
         data = data.decode("utf8", "strict")
         return json.loads(data)
 
+    def _parse_messages(self, data):
+        """Return the message dictionaries from one or more newline-terminated
+        json representations, decoding them in a single pass."""
+        lines = data.rstrip(b"\n").split(b"\n")
+        if len(lines) == 1:
+            return [self._parse_message(lines[0])]
+        try:
+            return json.loads(b"[" + b",".join(lines) + b"]")
+        except ValueError:
+            # locate the bad line, so the error is the same as when parsing
+            # messages individually
+            return [self._parse_message(line) for line in lines]
+
     def _handle_message(self, message):
         """Handle different types of incoming messages, i.e. responses to
         commands or asynchronous events.
         """
         if "error" in message:
             # This message is a reply to a request.
-            try:
-                thread_id = self._request_queue.get(timeout=1)
-            except Empty:
+            response_queue = self._pop_pending(message.get("request_id"))
+            if response_queue is None:
                 raise MPVCommunicationError("got a response without a pending request")
 
-            self._response_queues[thread_id].put(message)
+            response_queue.put(message)
 
         elif "event" in message:
             # This message is an asynchronous event.
@@ -324,52 +367,58 @@ class MPVBase:
         else:
             raise MPVCommunicationError(f"invalid message {message!r}")
 
-    def _send_message(self, message, timeout=None):
-        """Send a message/command to the mpv process, message must be a
-        dictionary of the form {"command": ["arg1", "arg2", ...]}. Responses
-        from the mpv process must be collected using _get_response().
+    def _pop_pending(self, request_id):
+        """Return the response queue for a request that has been answered."""
+        with self._pending_lock:
+            if request_id is None and self._pending_order:
+                # mpv didn't echo the id; responses arrive in request order
+                request_id = self._pending_order[0]
+            if request_id not in self._pending:
+                return None
+            self._pending_order.remove(request_id)
+            return self._pending.pop(request_id)
+
+    def _send_messages(self, messages):
+        """Send one or more messages/commands to the mpv process in a single
+        write, without waiting for the responses. Each message must be a
+        dictionary of the form {"command": ["arg1", "arg2", ...]}. Returns a
+        queue per message, to be passed to _get_response().
         """
-        data = self._compose_message(message)
+        response_queues = []
+        chunks = []
+        with self._pending_lock:
+            for message in messages:
+                # Requests are tagged with an id that mpv includes in its
+                # response, so several requests can be in flight at once,
+                # including from event callbacks running in another thread.
+                request_id = next(self._request_ids)
+                response_queue = Queue(1)
+                self._pending[request_id] = response_queue
+                self._pending_order.append(request_id)
+                response_queues.append(response_queue)
+                chunks.append(
+                    self._compose_message(dict(message, request_id=request_id))
+                )
+        data = b"".join(chunks)
 
         if self.debug:
             sys.stdout.write(f">>> {data.decode('utf8', 'replace')}")
 
-        # Request/response cycles are coordinated across different threads, so
-        # that they don't get mixed up. This makes it possible to use commands
-        # (e.g. fetch properties) from event callbacks that run in a different
-        # thread context.
-        thread_id = self._thread_id()
-        if thread_id not in self._response_queues:
-            # Prepare a response queue for the thread to wait on.
-            self._response_queues[thread_id] = Queue()
-
-        # Put the id of the current thread on the request queue. This id is
-        # later used to associate responses from the mpv process with this
-        # request.
-        try:
-            self._request_queue.put(thread_id, block=True, timeout=timeout)
-        except Full:
-            raise MPVTimeoutError("unable to put request")
-
         # Write the message data to the socket.
-        if is_win:
-            win32file.WriteFile(self._sock, data)
-        else:
-            while data:
-                size = self._sock.send(data)
-                if size == 0:
-                    raise MPVCommunicationError("broken sender socket")
-                data = data[size:]
+        with self._write_lock:
+            if is_win:
+                win32file.WriteFile(self._sock, data)
+            else:
+                self._sock.sendall(data)
+        return response_queues
 
-    def _get_response(self, timeout=None):
+    def _get_response(self, response_queue, timeout=None):
         """Collect the response message to a previous request. If there was an
         error a MPVCommandError exception is raised, otherwise the command
         specific data is returned.
         """
         try:
-            message = self._response_queues[self._thread_id()].get(
-                block=True, timeout=timeout
-            )
+            message = response_queue.get(block=True, timeout=timeout)
         except Empty:
             raise MPVTimeoutError("unable to get response")
 
@@ -390,19 +439,34 @@ class MPVBase:
 
     def _send_request(self, message, timeout=None, _retry=1):
         """Send a command to the mpv process and collect the result."""
+        return self._send_requests([message], timeout, _retry)[0]
+
+    def _send_requests(self, messages, timeout=None, _retry=1):
+        """Send several commands to the mpv process at once, and collect the
+        results. The commands are pipelined, so this costs a single round
+        trip. If any command fails, an error is raised once all the responses
+        have arrived."""
         self.ensure_running()
         try:
-            self._send_message(message, timeout)
-            return self._get_response(timeout)
-        except MPVCommandError as e:
-            raise MPVCommandError(f"{message['command']!r}: {e}")
+            response_queues = self._send_messages(messages)
+            results = []
+            error = None
+            for message, response_queue in zip(messages, response_queues):
+                try:
+                    results.append(self._get_response(response_queue, timeout))
+                except MPVCommandError as e:
+                    results.append(None)
+                    error = error or MPVCommandError(f"{message['command']!r}: {e}")
         except Exception:
             if _retry:
                 print("mpv timed out, restarting")
                 self._stop_process()
-                return self._send_request(message, timeout, _retry - 1)
+                return self._send_requests(messages, timeout, _retry - 1)
             else:
                 raise
+        if error:
+            raise error
+        return results
 
     def _register_callbacks(self):
         """Will be called after mpv restart to reinitialize callbacks
@@ -522,10 +586,7 @@ class MPV(MPVBase):
     def _event_reader(self):
         """Collect incoming event messages and call the event handler."""
         while True:
-            message = self._get_event(timeout=1)
-            if message is None:
-                continue
-
+            message = self._event_queue.get()
             self._handle_event(message)
 
     def _handle_event(self, message):
@@ -616,6 +677,14 @@ class MPV(MPVBase):
         """Execute a single command on the mpv process and return the result."""
         return self._send_request({"command": list(args)}, timeout=timeout)
 
+    def commands(self, *commands, timeout=1):
+        """Execute several commands, each a list of arguments, and return a
+        list of results. The commands are sent together, so this only waits
+        for one round trip."""
+        return self._send_requests(
+            [{"command": list(args)} for args in commands], timeout=timeout
+        )
+
     def get_property(self, name):
         """Return the value of property `name`."""
         return self.command("get_property", name)
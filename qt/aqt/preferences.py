@@ -159,6 +159,7 @@ class Preferences(QDialog):
         form.weekly_backups.setValue(self.prefs.backups.weekly)
         form.monthly_backups.setValue(self.prefs.backups.monthly)
         form.minutes_between_backups.setValue(self.prefs.backups.minimum_interval_mins)
+        form.incremental_backups.setChecked(self.prefs.backups.incremental)
 
         add_ellipsis_to_action_label(self.form.url_schemes)
         qconnect(self.form.url_schemes.clicked, show_url_schemes_dialog)
@@ -191,6 +192,7 @@ class Preferences(QDialog):
         self.prefs.backups.weekly = form.weekly_backups.value()
         self.prefs.backups.monthly = form.monthly_backups.value()
         self.prefs.backups.minimum_interval_mins = form.minutes_between_backups.value()
+        self.prefs.backups.incremental = form.incremental_backups.isChecked()
 
         def after_prefs_update(changes: OpChanges) -> None:
             self.mw.apply_collection_options()
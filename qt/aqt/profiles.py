@@ -550,6 +550,13 @@ create table if not exists profiles
         self.meta["minimalist_mode"] = on
         gui_hooks.body_classes_need_update()
 
+    def close_budget_secs(self) -> float:
+        "Seconds that closing a profile may take before optional work is deferred."
+        return self.meta.get("close_budget_secs", 3.0)
+
+    def set_close_budget_secs(self, secs: float) -> None:
+        self.meta["close_budget_secs"] = secs
+
     def spacebar_rates_card(self) -> bool:
         return self.meta.get("spacebar_rates_card", True)
 
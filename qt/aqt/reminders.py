@@ -0,0 +1,183 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+Time-of-day reminders, shared by the study reminder modules.
+
+Rather than waking up every minute to compare the clock with each configured
+time, the service works out when the next reminder is due, and sleeps until
+then using a single one-off job on the main window's TimerScheduler.
+
+The scheduler measures delays with a monotonic clock, which does not follow
+the wall clock across a suspend, or a change to the clock, time zone or DST.
+Instead of polling for that, the service compares the two clocks whenever the
+app is reactivated, and whenever the scheduler wakes up for another job, and
+sets a new deadline if they have drifted apart.
+"""
+
+from __future__ import annotations
+
+import datetime
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import aqt
+from aqt.qt import *
+from aqt.timers import ScheduledJob
+
+
+@dataclass
+class Reminder:
+    times: list[datetime.time]
+    func: Callable[[], None]
+    # local time at which it next fires
+    next_due: datetime.datetime
+
+
+def parse_times(times: list[str]) -> list[datetime.time]:
+    "Parse HH:MM strings, skipping any that are invalid."
+    parsed = []
+    for text in times:
+        try:
+            parsed.append(datetime.datetime.strptime(text, "%H:%M").time())
+        except ValueError:
+            print(f"ignoring invalid reminder time: {text}")
+    return parsed
+
+
+def next_occurrence(
+    times: list[datetime.time], after: datetime.datetime
+) -> datetime.datetime:
+    "The first of TIMES, on any day, that is later than AFTER."
+    candidates = []
+    for time in times:
+        due = datetime.datetime.combine(after.date(), time)
+        if due <= after:
+            due += datetime.timedelta(days=1)
+        candidates.append(due)
+    return min(candidates)
+
+
+class ReminderService:
+    """Calls registered functions at times of day.
+
+    Reminders that are due in the same wakeup share a single calculation of
+    the due counts; see due_counts().
+    """
+
+    # the timer may fire slightly early; reminders due within this are run
+    EARLY = datetime.timedelta(seconds=30)
+
+    def __init__(self, mw: aqt.AnkiQt) -> None:
+        self.mw = mw
+        self._reminders: dict[str, Reminder] = {}
+        self._job: ScheduledJob | None = None
+        # wall and monotonic time when the job was scheduled
+        self._armed_at: tuple[datetime.datetime, float] | None = None
+        self._firing = False
+        self._counts: tuple[int, int, int] | None = None
+        mw.timers.wakeup_listeners.append(self.check_clock)
+        qconnect(mw.app.applicationStateChanged, self._on_application_state)
+
+    def set(self, name: str, times: list[str], func: Callable[[], None]) -> None:
+        """Call FUNC daily at each of TIMES (HH:MM, local time), replacing any
+        reminder previously registered under NAME."""
+        parsed = parse_times(times)
+        if not parsed:
+            self.remove(name)
+            return
+        self._reminders[name] = Reminder(
+            times=parsed, func=func, next_due=next_occurrence(parsed, self._now())
+        )
+        self._rearm()
+
+    def remove(self, name: str) -> None:
+        if self._reminders.pop(name, None):
+            self._rearm()
+
+    def next_due(self) -> datetime.datetime | None:
+        if not self._reminders:
+            return None
+        return min(reminder.next_due for reminder in self._reminders.values())
+
+    def due_counts(self) -> tuple[int, int, int]:
+        """New, learning and review counts of the current deck. While
+        reminders are firing, they are fetched only once."""
+        if self._firing and self._counts is not None:
+            return self._counts
+        if self.mw.col:
+            new, lrn, rev = self.mw.col.sched.counts()
+            counts = (new, lrn, rev)
+        else:
+            counts = (0, 0, 0)
+        if self._firing:
+            self._counts = counts
+        return counts
+
+    def check_clock(self) -> None:
+        """Reschedule the pending job if the wall clock has moved relative to
+        the monotonic clock since it was scheduled, eg after a suspend."""
+        if self._job is None or self._armed_at is None:
+            return
+        armed_wall, armed_monotonic = self._armed_at
+        elapsed = datetime.timedelta(seconds=self._monotonic() - armed_monotonic)
+        if abs(self._now() - armed_wall - elapsed) > self.EARLY:
+            self._rearm()
+
+    def _on_application_state(self, state: Qt.ApplicationState) -> None:
+        if state == Qt.ApplicationState.ApplicationActive:
+            self.check_clock()
+
+    def _now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def _monotonic(self) -> float:
+        return time.monotonic()
+
+    def _rearm(self) -> None:
+        if self._firing:
+            # rearmed once the current reminders have run
+            return
+        self.mw.timers.cancel(self._job)
+        self._job = None
+        self._armed_at = None
+        if (due := self.next_due()) is None:
+            return
+        now = self._now()
+        delay_ms = int((due - now).total_seconds() * 1000)
+        self._job = self.mw.timers.after(
+            "reminders", max(0, delay_ms), self._on_due, requires_collection=False
+        )
+        self._armed_at = (now, self._monotonic())
+
+    def _on_due(self) -> None:
+        self._job = None
+        self._armed_at = None
+        now = self._now()
+        self._firing = True
+        try:
+            for reminder in list(self._reminders.values()):
+                if reminder.next_due - now > self.EARLY:
+                    continue
+                reminder.next_due = next_occurrence(
+                    reminder.times, max(now, reminder.next_due)
+                )
+                try:
+                    reminder.func()
+                except Exception as e:
+                    print(f"Error running reminder: {e}")
+        finally:
+            self._firing = False
+            self._counts = None
+            self._rearm()
+
+
+_service: ReminderService | None = None
+
+
+def reminder_service() -> ReminderService:
+    global _service
+    if _service is None:
+        _service = ReminderService(aqt.mw)
+    return _service
@@ -4,8 +4,11 @@
 from __future__ import annotations
 
 import json
+import math
 import random
 import re
+import time
+from collections import deque
 from collections.abc import Callable, Generator, Sequence
 from dataclasses import dataclass
 from enum import Enum, auto
@@ -27,9 +30,10 @@ from anki.scheduler.v3 import (
     SetSchedulingStatesRequest,
 )
 from anki.scheduler.v3 import Scheduler as V3Scheduler
+from anki.sound import AVTag
 from anki.tags import MARKED_TAG
 from anki.types import assert_exhaustive
-from anki.utils import is_mac
+from anki.utils import dev_mode, is_mac
 from aqt import AnkiQt, gui_hooks
 from aqt.browser.card_info import PreviousReviewerCardInfo, ReviewerCardInfo
 from aqt.deckoptions import confirm_deck_then_display_options
@@ -54,6 +58,7 @@ from aqt.utils import (
     askUserDialog,
     downArrow,
     qtMenuShortcutWorkaround,
+    show_exception,
     show_warning,
     tooltip,
     tr,
@@ -81,6 +86,12 @@ def replay_audio(card: Card, question_side: bool) -> None:
         av_player.play_tags(tags)
 
 
+def template_uses_tts(card: Card) -> bool:
+    "True if the card's templates contain text to speech."
+    template = card.template()
+    return any("{{tts" in (template[key] or "") for key in ("qfmt", "afmt"))
+
+
 @dataclass
 class V3CardInfo:
     """Stores the top of the card queue for the v3 scheduler.
@@ -105,6 +116,24 @@ class V3CardInfo:
     def top_card(self) -> QueuedCards.QueuedCard:
         return self.queued_cards.cards[0]
 
+    def without_top_card(self) -> V3CardInfo | None:
+        """The queue as it is expected to be once the top card is answered,
+        or None if no other card was fetched. The counts are a guess, as the
+        answer may move the card to another queue."""
+        if len(self.queued_cards.cards) < 2:
+            return None
+        queued_cards = QueuedCards()
+        queued_cards.CopyFrom(self.queued_cards)
+        answered = queued_cards.cards[0]
+        del queued_cards.cards[0]
+        if answered.queue == QueuedCards.NEW:
+            queued_cards.new_count = max(0, queued_cards.new_count - 1)
+        elif answered.queue == QueuedCards.LEARNING:
+            queued_cards.learning_count = max(0, queued_cards.learning_count - 1)
+        else:
+            queued_cards.review_count = max(0, queued_cards.review_count - 1)
+        return V3CardInfo.from_queue(queued_cards)
+
     def counts(self) -> tuple[int, list[int]]:
         "Returns (idx, counts)."
         counts = [
@@ -133,6 +162,34 @@ class V3CardInfo:
             return CardAnswer.EASY
 
 
+class LatencyRecorder:
+    "Keeps the most recent durations of something, for percentiles."
+
+    def __init__(self, size: int = 1000) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, secs: float) -> None:
+        self._samples.append(secs)
+
+    def percentile(self, pct: float) -> float | None:
+        "Nearest-rank percentile in seconds, or None if nothing was recorded."
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = math.ceil(pct / 100 * len(ordered))
+        return ordered[max(0, rank - 1)]
+
+    def summary(self) -> str:
+        if not self._samples:
+            return "no samples"
+        p50 = self.percentile(50) * 1000
+        p95 = self.percentile(95) * 1000
+        return f"p50 {p50:.1f}ms, p95 {p95:.1f}ms over {len(self)} samples"
+
+
 class AnswerAction(Enum):
     BURY_CARD = 0
     ANSWER_AGAIN = 1
@@ -147,6 +204,9 @@ class QuestionAction(Enum):
 
 
 class Reviewer:
+    # number of cards after the current one whose audio is prepared in advance
+    UPCOMING_CARDS = 2
+
     def __init__(self, mw: AnkiQt) -> None:
         self.mw = mw
         self.web = mw.web
@@ -169,6 +229,11 @@ class Reviewer:
         self._show_question_timer: QTimer | None = None
         self._show_answer_timer: QTimer | None = None
         self.auto_advance_enabled = False
+        # time from an answer button being pressed until the webview has run
+        # the script that shows the next question
+        self.answer_latency = LatencyRecorder()
+        self._answered_at: float | None = None
+        self._answer_pending = False
         gui_hooks.av_player_did_end_playing.append(self._on_av_player_did_end_playing)
 
     def show(self) -> None:
@@ -197,6 +262,9 @@ class Reviewer:
 
     def cleanup(self) -> None:
         gui_hooks.reviewer_will_end()
+        av_player.cancel_preload()
+        if dev_mode and len(self.answer_latency):
+            print(f"answer to next question: {self.answer_latency.summary()}")
         self.card = None
         self.auto_advance_enabled = False
 
@@ -264,12 +332,55 @@ class Reviewer:
 
     def _get_next_v3_card(self) -> None:
         assert isinstance(self.mw.col.sched, V3Scheduler)
-        output = self.mw.col.sched.get_queued_cards()
+        # the cards after the first are only used to prepare their audio
+        output = self.mw.col.sched.get_queued_cards(
+            fetch_limit=1 + self.UPCOMING_CARDS
+        )
         if not output.cards:
+            av_player.cancel_preload()
             return
         self._v3 = V3CardInfo.from_queue(output)
         self.card = Card(self.mw.col, backend_card=self._v3.top_card().card)
         self.card.start_timer()
+        self._preload_next_card_audio()
+
+    def _preload_next_card_audio(self) -> None:
+        """Tell the audio player which question audio is likely to play next,
+        so it can be opened ahead of time, and give players the audio of the
+        upcoming cards, so text to speech can be synthesised in advance. If
+        the queue changes, this is replaced when the next card is fetched.
+
+        Rendering runs add-on hooks, so the cards are rendered on the main
+        thread, after the current card has been shown. The players do the
+        slow part, opening files and synthesising, in the background. Only
+        cards with text to speech in their templates are rendered for the
+        synthesis, so decks without it don't pay for that."""
+        av_player.cancel_preload()
+        v3 = self._v3
+        if not v3 or len(v3.queued_cards.cards) < 2:
+            return
+        backend_cards = [queued.card for queued in v3.queued_cards.cards[1:]]
+
+        def preload() -> None:
+            if self._v3 is not v3 or self.mw.state != "review":
+                return
+            want_upcoming = gui_hooks.av_player_will_need_tags.count() > 0
+            next_question: list[AVTag] = []
+            upcoming: list[AVTag] = []
+            for idx, backend_card in enumerate(backend_cards):
+                card = Card(self.mw.col, backend_card=backend_card)
+                if idx == 0 and card.autoplay():
+                    next_question = card.question_av_tags()
+                if not want_upcoming:
+                    break
+                if template_uses_tts(card):
+                    upcoming.extend(card.question_av_tags())
+                    upcoming.extend(card.answer_av_tags())
+            av_player.preload_tags(next_question)
+            if upcoming:
+                gui_hooks.av_player_will_need_tags(upcoming)
+
+        self.mw.progress.single_shot(0, preload)
 
     def get_scheduling_states(self) -> SchedulingStates:
         return self._v3.states
@@ -406,13 +517,20 @@ class Reviewer:
         # user hook
         gui_hooks.reviewer_did_show_question(c)
         self._auto_advance_to_answer_if_enabled()
+        if self._answered_at is not None:
+            # scripts are run in order, so this returns once the question is up
+            self.web.evalWithCallback(
+                "0", partial(self._on_question_shown, self._answered_at)
+            )
+            self._answered_at = None
+
+    def _on_question_shown(self, answered_at: float, _result: Any) -> None:
+        self.answer_latency.add(time.perf_counter() - answered_at)
 
     def _auto_advance_to_answer_if_enabled(self) -> None:
         self._clear_auto_advance_timers()
         if self.auto_advance_enabled:
-            conf = self.mw.col.decks.config_dict_for_deck_id(
-                self.card.current_deck_id()
-            )
+            conf = self.card.deck_config()
             if conf["secondsToShowQuestion"]:
                 self._show_answer_timer = self.mw.progress.timer(
                     int(conf["secondsToShowQuestion"] * 1000),
@@ -424,7 +542,7 @@ class Reviewer:
     def _on_show_answer_timeout(self) -> None:
         if self.card is None:
             return
-        conf = self.mw.col.decks.config_dict_for_deck_id(self.card.current_deck_id())
+        conf = self.card.deck_config()
         if conf["waitForAudio"] and av_player.current_player:
             return
         if (
@@ -489,9 +607,7 @@ class Reviewer:
     def _auto_advance_to_question_if_enabled(self) -> None:
         self._clear_auto_advance_timers()
         if self.auto_advance_enabled:
-            conf = self.mw.col.decks.config_dict_for_deck_id(
-                self.card.current_deck_id()
-            )
+            conf = self.card.deck_config()
             if conf["secondsToShowAnswer"]:
                 self._show_question_timer = self.mw.progress.timer(
                     int(conf["secondsToShowAnswer"] * 1000),
@@ -503,7 +619,7 @@ class Reviewer:
     def _on_show_question_timeout(self) -> None:
         if self.card is None:
             return
-        conf = self.mw.col.decks.config_dict_for_deck_id(self.card.current_deck_id())
+        conf = self.card.deck_config()
         if conf["waitForAudio"] and av_player.current_player:
             return
         if (
@@ -536,7 +652,7 @@ class Reviewer:
         if self.mw.state != "review":
             # showing resetRequired screen; ignore key
             return
-        if self.state != "answer":
+        if self.state != "answer" or self._answer_pending:
             return
         proceed, ease = gui_hooks.reviewer_will_answer_card(
             (True, ease), self, self.card
@@ -544,35 +660,97 @@ class Reviewer:
         if not proceed:
             return
 
+        self._answered_at = time.perf_counter()
         sched = cast(V3Scheduler, self.mw.col.sched)
+        card = self.card
         answer = sched.build_answer(
-            card=self.card,
+            card=card,
             states=self._v3.states,
             rating=self._v3.rating_from_ease(ease),
         )
+        # unless the timebox needs to interrupt, the next card in the fetched
+        # queue is shown while the answer is saved, and checked afterwards
+        next_v3 = None
+        if not self.mw.col.timeboxReached():
+            next_v3 = self._v3.without_top_card()
 
         def after_answer(changes: OpChanges) -> None:
+            self._answer_pending = False
             if gui_hooks.reviewer_did_answer_card.count() > 0:
-                self.card.load()
+                card.load()
             # v3 scheduler doesn't report this
-            suspended = self.card is not None and self.card.queue < 0
-            self._after_answering(ease)
+            suspended = card.queue < 0
+            self._after_answering(ease, card, next_shown=next_v3 is not None)
             if sched.state_is_leech(answer.new_state):
                 self.onLeech(suspended)
 
+        def on_failure(exception: Exception) -> None:
+            self._answer_pending = False
+            show_exception(parent=self.mw, exception=exception)
+            if next_v3:
+                # show the unanswered card again
+                self._reconcile_queue()
+
         self.state = "transition"
-        answer_card(parent=self.mw, answer=answer).success(
-            after_answer
-        ).run_in_background(initiator=self)
+        self._answer_pending = True
+        op = answer_card(parent=self.mw, answer=answer)
+        op.success(after_answer).failure(on_failure).run_in_background(initiator=self)
+        if next_v3:
+            self._show_next_card(next_v3)
 
-    def _after_answering(self, ease: Literal[1, 2, 3, 4]) -> None:
-        gui_hooks.reviewer_did_answer_card(self, self.card, ease)
-        self._answeredIds.append(self.card.id)
+    def _after_answering(
+        self,
+        ease: Literal[1, 2, 3, 4],
+        card: Card | None = None,
+        next_shown: bool = False,
+    ) -> None:
+        card = card or self.card
+        # the next card may already be showing; add-ons expect reviewer.card
+        # to be the answered card while the hook runs
+        shown_card, self.card = self.card, card
+        try:
+            gui_hooks.reviewer_did_answer_card(self, card, ease)
+        finally:
+            self.card = shown_card
+        self._answeredIds.append(card.id)
         # Record study activity for heatmap
         self._record_study_activity()
-        if not self.check_timebox():
+        if next_shown:
+            self._reconcile_queue()
+        elif not self.check_timebox():
             self.nextCard()
 
+    def _show_next_card(self, v3: V3CardInfo) -> None:
+        "Show the next card of a queue fetched before the last answer."
+        self.previous_card = self.card
+        self._v3 = v3
+        self.card = Card(self.mw.col, backend_card=v3.top_card().card)
+        self.card.start_timer()
+        self._preload_next_card_audio()
+        self._previous_card_info.set_card(self.previous_card)
+        self._card_info.set_card(self.card)
+        self._showQuestion()
+
+    def _reconcile_queue(self) -> None:
+        """Once the answer has been saved, make sure the card being shown is
+        still the first in the queue, as answering can change it, for example
+        when a learning card becomes due again straight away."""
+        if self.mw.state != "review" or not self.card:
+            return
+        sched = cast(V3Scheduler, self.mw.col.sched)
+        output = sched.get_queued_cards(fetch_limit=1 + self.UPCOMING_CARDS)
+        if output.cards and output.cards[0].card.id == self.card.id:
+            # keep the states, which custom scheduling may have changed
+            self._v3.queued_cards = output
+            self._preload_next_card_audio()
+            if self.state == "question":
+                # update the counts
+                self._showAnswerButton()
+            return
+        # the answered card should remain the previous one
+        self.card = self.previous_card
+        self.nextCard()
+
     # Handlers
     ############################################################
 
@@ -867,7 +1045,7 @@ timerStopped = false;
             self.mw.progress.single_shot(50, self._showEaseButtons)
             return
         middle = self._answerButtons()
-        conf = self.mw.col.decks.config_dict_for_deck_id(self.card.current_deck_id())
+        conf = self.card.deck_config()
         self.bottom.web.eval(
             f"showAnswer({json.dumps(middle)}, {json.dumps(conf['stopTimerOnAnswer'])});"
         )
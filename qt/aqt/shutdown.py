@@ -0,0 +1,231 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+The work done when a profile is closed.
+
+Closing used to run each step in turn on the main thread, so the progress
+window stayed up for as long as all of the steps took together. Instead, the
+steps are described as tasks that name the tasks they must follow. A task is
+started as soon as those have finished, on the main thread if it uses Qt, or
+otherwise on a background thread, in parallel with the others.
+
+Each task is timed, and the whole run has a budget. Deferrable tasks that
+are not expected to finish within it, going by how long they took last
+time, are skipped, so that they can be done after the next launch instead.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import partial
+from graphlib import TopologicalSorter
+
+from anki.collection import Collection
+from aqt.taskman import TaskManager
+
+
+@dataclass
+class CloseTask:
+    name: str
+    func: Callable[[], None]
+    # names of the tasks that must finish first
+    after: tuple[str, ...] = ()
+    # run on the main thread, for tasks that use Qt
+    main_thread: bool = False
+    # may be skipped and left for the next launch
+    deferrable: bool = False
+
+
+@dataclass
+class CloseReport:
+    # seconds taken by each task that ran
+    timings: dict[str, float] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    deferred: list[str] = field(default_factory=list)
+    secs: float = 0.0
+
+    def summary(self) -> str:
+        tasks = ", ".join(f"{name} {secs:.2f}s" for name, secs in self.timings.items())
+        text = f"closed in {self.secs:.2f}s ({tasks})"
+        if self.deferred:
+            text += f", deferred: {', '.join(self.deferred)}"
+        return text
+
+
+class CloseTaskRunner:
+    """Runs a set of close tasks, calling on_done with a report once all
+    of them have finished or been deferred.
+
+    `estimates` holds the seconds each task is expected to take, usually
+    the timings of the previous run. Tasks without one are assumed to be
+    quick."""
+
+    def __init__(
+        self,
+        taskman: TaskManager,
+        tasks: list[CloseTask],
+        budget_secs: float,
+        estimates: dict[str, float] | None = None,
+    ) -> None:
+        self.taskman = taskman
+        self.tasks = {task.name: task for task in tasks}
+        for task in tasks:
+            for name in task.after:
+                if name not in self.tasks:
+                    raise ValueError(f"{task.name} follows unknown task {name}")
+        # raises CycleError if the tasks can't be ordered
+        self._order = list(
+            TopologicalSorter({task.name: task.after for task in tasks}).static_order()
+        )
+        self.budget_secs = budget_secs
+        self.estimates = estimates or {}
+        self.report = CloseReport()
+        self._pending = dict(self.tasks)
+        self._running: set[str] = set()
+        self._finished: set[str] = set()
+        self._started_at = 0.0
+        self._on_done: Callable[[CloseReport], None] | None = None
+
+    def run(self, on_done: Callable[[CloseReport], None]) -> None:
+        self._on_done = on_done
+        self._started_at = time.monotonic()
+        self._plan()
+        self._start_ready()
+
+    def _elapsed(self) -> float:
+        return time.monotonic() - self._started_at
+
+    def _plan(self) -> None:
+        "Defer tasks that are not expected to finish within the budget."
+        finish_at: dict[str, float] = {}
+        for name in self._order:
+            task = self.tasks[name]
+            start_at = max((finish_at[dep] for dep in task.after), default=0.0)
+            end_at = start_at + self.estimates.get(name, 0.0)
+            if task.deferrable and (
+                end_at > self.budget_secs or self._follows_deferred(task)
+            ):
+                self._defer(task)
+                end_at = start_at
+            finish_at[name] = end_at
+
+    def _follows_deferred(self, task: CloseTask) -> bool:
+        return any(name in self.report.deferred for name in task.after)
+
+    def _defer(self, task: CloseTask) -> None:
+        del self._pending[task.name]
+        self._finished.add(task.name)
+        self.report.deferred.append(task.name)
+
+    def _start_ready(self) -> None:
+        # main thread tasks finish immediately, and may make others ready
+        started = True
+        while started:
+            started = False
+            for task in list(self._pending.values()):
+                if not all(name in self._finished for name in task.after):
+                    continue
+                started = True
+                if task.deferrable and (
+                    self._elapsed() > self.budget_secs or self._follows_deferred(task)
+                ):
+                    # the tasks before it took longer than expected
+                    self._defer(task)
+                    continue
+                del self._pending[task.name]
+                if task.main_thread:
+                    self._record(task, *self._timed(task))
+                else:
+                    self._running.add(task.name)
+                    self.taskman.run_in_background(
+                        partial(self._timed, task),
+                        partial(self._on_background_done, task),
+                        uses_collection=False,
+                    )
+        if not self._pending and not self._running and self._on_done:
+            self.report.secs = self._elapsed()
+            on_done, self._on_done = self._on_done, None
+            on_done(self.report)
+
+    def _timed(self, task: CloseTask) -> tuple[float, str | None]:
+        start = time.monotonic()
+        error = None
+        try:
+            task.func()
+        except Exception as exc:
+            print(f"close task {task.name} failed: {exc!r}")
+            error = str(exc) or repr(exc)
+        return time.monotonic() - start, error
+
+    def _on_background_done(self, task: CloseTask, future: Future) -> None:
+        self._running.discard(task.name)
+        self._record(task, *future.result())
+        self._start_ready()
+
+    def _record(self, task: CloseTask, secs: float, error: str | None) -> None:
+        self._finished.add(task.name)
+        self.report.timings[task.name] = secs
+        if error is not None:
+            self.report.errors[task.name] = error
+
+
+class CollectionCloser:
+    """The tasks that check the collection, back it up and close it.
+
+    The check and backup are deferrable: when skipped, the maintenance
+    runner does them after the next launch instead."""
+
+    def __init__(self, col: Collection, check: bool, backup_folder: str | None) -> None:
+        self.col = col
+        self.check = check
+        # None if no backup should be made
+        self.backup_folder = backup_folder
+        self.corrupt = False
+
+    def tasks(self) -> list[CloseTask]:
+        return [
+            CloseTask("check", self._check, deferrable=True),
+            CloseTask("backup", self._backup, after=("check",), deferrable=True),
+            CloseTask("close_collection", self._close, after=("backup",)),
+            # the backup is compressed while the collection closes; an
+            # unfinished backup would be unusable, so this is never skipped
+            CloseTask(
+                "await_backup", self.col.await_backup_completion, after=("backup",)
+            ),
+        ]
+
+    def _check(self) -> None:
+        if not self.check:
+            return
+        try:
+            self.corrupt = self.col.db.scalar("pragma quick_check") != "ok"
+        except Exception:
+            self.corrupt = True
+
+    def _backup(self) -> None:
+        if self.corrupt or self.backup_folder is None:
+            return
+        # default 5 minute throttle
+        self.col.create_backup(
+            backup_folder=self.backup_folder,
+            force=False,
+            wait_for_completion=False,
+        )
+
+    def _close(self) -> None:
+        try:
+            self.col.close(downgrade=False)
+        except Exception:
+            self.corrupt = True
+            raise
+
+
+def flush_logs() -> None:
+    for logger in [logging.getLogger(), *logging.Logger.manager.loggerDict.values()]:
+        for handler in getattr(logger, "handlers", []):
+            handler.flush()
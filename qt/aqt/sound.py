@@ -83,6 +83,14 @@ class Player(ABC):
     def shutdown(self) -> None:
         "Do any cleanup required at program termination. Optional."
 
+    def preload(self, tag: AVTag) -> None:
+        """Prepare tag so that a later play() of it starts quickly. Optional.
+
+        Only called while the player is idle."""
+
+    def cancel_preload(self) -> None:
+        "Discard anything prepared by preload(). Optional."
+
 
 AUDIO_EXTENSIONS = {
     "3gp",
@@ -149,13 +157,41 @@ class AVPlayer:
     def __init__(self) -> None:
         self._enqueued: list[AVTag] = []
         self.current_player: Player | None = None
+        # tags expected to be played next, and the player warming them up
+        self._preload: list[AVTag] = []
+        self._preloading_player: Player | None = None
 
     def play_tags(self, tags: list[AVTag]) -> None:
         """Clear the existing queue, then start playing provided tags."""
+        if tags[:1] != self._preload[:1]:
+            self.cancel_preload()
         self.clear_queue_and_maybe_interrupt()
         self._enqueued = tags[:]
         self._play_next_if_idle()
 
+    def preload_tags(self, tags: list[AVTag]) -> None:
+        """Note the tags expected to be passed to play_tags() next, such as the
+        audio of the card the reviewer will show next. The first of them is
+        warmed up once the player is idle, so it starts without delay."""
+        self.cancel_preload()
+        self._preload = tags[:]
+        self._maybe_preload()
+
+    def cancel_preload(self) -> None:
+        self._preload = []
+        if self._preloading_player:
+            self._preloading_player.cancel_preload()
+            self._preloading_player = None
+
+    def _maybe_preload(self) -> None:
+        if self.current_player or self._enqueued or self._preloading_player:
+            return
+        if not self._preload:
+            return
+        if player := self._best_player_for_tag(self._preload[0]):
+            self._preloading_player = player
+            player.preload(self._preload[0])
+
     def append_tags(self, tags: list[AVTag]) -> None:
         """Append provided tags to the queue, then start playing them if the current player is idle."""
         self._enqueued.extend(tags)
@@ -166,6 +202,7 @@ class AVPlayer:
 
     def stop_and_clear_queue(self) -> None:
         self._enqueued = []
+        self.cancel_preload()
         self._stop_if_playing()
 
     def stop_and_clear_queue_if_caller(self, caller: Any) -> None:
@@ -232,6 +269,7 @@ class AVPlayer:
         gui_hooks.av_player_did_end_playing(self.current_player)
         self.current_player = None
         self._play_next_if_idle()
+        self._maybe_preload()
 
     def _play_next_if_idle(self) -> None:
         if self.current_player:
@@ -242,6 +280,10 @@ class AVPlayer:
             self._play(next)
 
     def _play(self, tag: AVTag) -> None:
+        if self._preload[:1] == [tag]:
+            # the player will use what it has prepared
+            self._preload = []
+            self._preloading_player = None
         best_player = self._best_player_for_tag(tag)
         if best_player:
             self.current_player = best_player
@@ -452,6 +494,9 @@ class MpvManager(MPV, SoundOrVideoPlayer):
         mpvPath, self.popenEnv = _packagedCmd(["mpv"])
         self.executable = mpvPath[0]
         self._on_done: OnDoneCallback | None = None
+        self._idle = True
+        # path of a file loaded in a paused state by preload()
+        self._preloaded_path: str | None = None
         self.default_argv += [f"--config-dir={base_path}"]
         super().__init__(window_id=None, debug=False)
 
@@ -468,11 +513,13 @@ class MpvManager(MPV, SoundOrVideoPlayer):
             self.mpv_version = None
 
         try:
-            self.command("keybind", "q", "stop")
-            self.command("keybind", "Q", "stop")
-            self.command("keybind", "CLOSE_WIN", "stop")
-            self.command("keybind", "ctrl+w", "stop")
-            self.command("keybind", "ctrl+c", "stop")
+            self.commands(
+                ["keybind", "q", "stop"],
+                ["keybind", "Q", "stop"],
+                ["keybind", "CLOSE_WIN", "stop"],
+                ["keybind", "ctrl+w", "stop"],
+                ["keybind", "ctrl+c", "stop"],
+            )
         except MPVCommandError:
             print("mpv too old for key rebinding")
 
@@ -481,13 +528,38 @@ class MpvManager(MPV, SoundOrVideoPlayer):
         self._on_done = on_done
         path = tag.path(self.media_folder)
 
-        if self.mpv_version is None or self.mpv_version >= (0, 38, 0):
-            self.command("loadfile", path, "replace", -1, "pause=no")
+        preloaded, self._preloaded_path = self._preloaded_path, None
+        if preloaded == path and not self._idle:
+            # already opened and decoded; just start it
+            self.set_property("pause", False)
         else:
-            self.command("loadfile", path, "replace", "pause=no")
+            self._loadfile(path, "pause=no")
         gui_hooks.av_player_did_begin_playing(self, tag)
 
+    def _loadfile(self, path: str, options: str) -> None:
+        if self.mpv_version is None or self.mpv_version >= (0, 38, 0):
+            self.command("loadfile", path, "replace", -1, options)
+        else:
+            self.command("loadfile", path, "replace", options)
+
+    def preload(self, tag: AVTag) -> None:
+        """Open the file paused, so that mpv has probed it and buffered its
+        first samples by the time it is played. Video is skipped, as loading
+        it would open a window."""
+        if not isinstance(tag, SoundOrVideoTag) or not is_audio_file(tag.filename):
+            return
+        path = tag.path(self.media_folder)
+        self._on_done = None
+        self._preloaded_path = path
+        self._loadfile(path, "pause=yes")
+
+    def cancel_preload(self) -> None:
+        if self._preloaded_path:
+            self._preloaded_path = None
+            self.command("stop")
+
     def stop(self) -> None:
+        self._preloaded_path = None
         self.command("stop")
 
     def toggle_pause(self) -> None:
@@ -497,10 +569,14 @@ class MpvManager(MPV, SoundOrVideoPlayer):
         self.command("seek", secs, "relative")
 
     def on_property_idle_active(self, value: bool) -> None:
+        self._idle = value
         if value and self._on_done:
             from aqt import mw
 
-            mw.taskman.run_on_main(self._on_done)
+            # only report the end of each file once, as loading and then
+            # stopping a preloaded file will go idle again
+            on_done, self._on_done = self._on_done, None
+            mw.taskman.run_on_main(on_done)
 
     def shutdown(self) -> None:
         self.close()
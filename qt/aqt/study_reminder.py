@@ -15,7 +15,7 @@ from typing import Optional, Dict, Any
 from pathlib import Path
 
 from aqt import mw
-from aqt.qt import QTimer, QTime
+from aqt.reminders import reminder_service
 from anki.utils import int_time
 
 
@@ -24,8 +24,6 @@ class StudyReminder:
 
     def __init__(self):
         self.config: Dict[str, Any] = self._load_config()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self._check_and_send_reminder)
         self._setup_timer()
 
     def _load_config(self) -> Dict[str, Any]:
@@ -74,23 +72,10 @@ class StudyReminder:
             return Path.home() / ".anki_study_reminders.json"
 
     def _setup_timer(self) -> None:
-        """Setup timer to check reminders every minute"""
-        # Check every minute
-        self.timer.start(60000)
-
-    def _check_and_send_reminder(self) -> None:
-        """Check if it's time to send a reminder"""
-        if not self.config["enabled"]:
-            return
-
-        if not mw or not mw.col:
-            return
-
-        current_time = QTime.currentTime().toString("HH:mm")
-
-        # Check if current time matches any reminder time
-        if current_time in self.config["reminder_times"]:
-            self._send_reminder()
+        """Schedule the next reminder"""
+        # The shared service sleeps until the next reminder time
+        times = self.config["reminder_times"] if self.config["enabled"] else []
+        reminder_service().set("study_reminder", times, self._send_reminder)
 
     def _send_reminder(self) -> None:
         """Send study reminder notification"""
@@ -122,7 +107,7 @@ class StudyReminder:
         if not mw or not mw.col:
             return 0
 
-        return mw.col.sched.counts()[0] + mw.col.sched.counts()[1] + mw.col.sched.counts()[2]
+        return sum(reminder_service().due_counts())
 
     def _update_streak(self) -> None:
         """Update study streak"""
@@ -200,11 +185,13 @@ class StudyReminder:
         """Set reminder times (format: HH:MM)"""
         self.config["reminder_times"] = times
         self._save_config()
+        self._setup_timer()
 
     def set_enabled(self, enabled: bool) -> None:
         """Enable or disable reminders"""
         self.config["enabled"] = enabled
         self._save_config()
+        self._setup_timer()
 
     def set_daily_goal(self, goal: int) -> None:
         """Set daily review goal"""
@@ -14,6 +14,7 @@ from typing import Optional
 
 from aqt import mw
 from aqt.qt import *
+from aqt.reminders import reminder_service
 from aqt.utils import showInfo, tooltip
 
 
@@ -23,8 +24,7 @@ class StudyReminder:
     def __init__(self):
         self.enabled = True
         self.reminder_times = ["09:00", "14:00", "19:00"]  # Default times
-        self.last_reminder = None
-        self.timer = None
+        self.started = False
         self.notification_sound = True
         
     def start(self):
@@ -32,31 +32,21 @@ class StudyReminder:
         if not self.enabled:
             return
             
-        # Check every minute
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.check_reminder)
-        self.timer.start(60000)  # 60 seconds
+        # The shared service sleeps until the next reminder time
+        self.started = True
+        reminder_service().set(
+            "study_reminder_enhanced", self.reminder_times, self.show_reminder
+        )
         
     def stop(self):
         """Stop the reminder timer"""
-        if self.timer:
-            self.timer.stop()
+        self.started = False
+        reminder_service().remove("study_reminder_enhanced")
             
-    def check_reminder(self):
-        """Check if it's time to remind"""
-        if not self.enabled or not mw:
-            return
-            
-        current_time = datetime.now().strftime("%H:%M")
-        
-        # Check if current time matches any reminder time
-        if current_time in self.reminder_times:
-            # Avoid duplicate reminders in the same minute
-            if self.last_reminder == current_time:
-                return
-                
-            self.last_reminder = current_time
-            self.show_reminder()
+    def _reschedule(self):
+        """Pick up changed reminder times"""
+        if self.started:
+            self.start()
             
     def show_reminder(self):
         """Show study reminder notification"""
@@ -283,6 +273,7 @@ class StudyReminder:
         snooze_time = (datetime.now() + timedelta(minutes=30)).strftime("%H:%M")
         if snooze_time not in self.reminder_times:
             self.reminder_times.append(snooze_time)
+            self._reschedule()
             tooltip("⏰ Reminder snoozed for 30 minutes")
             
     def get_study_stats(self):
@@ -291,8 +282,7 @@ class StudyReminder:
             return {"due": 0, "new": 0}
             
         try:
-            deck = mw.col.decks.current()
-            counts = mw.col.sched.counts()
+            counts = reminder_service().due_counts()
             
             return {
                 "new": counts[0] if counts else 0,
@@ -306,16 +296,19 @@ class StudyReminder:
     def set_reminder_times(self, times: list[str]):
         """Set reminder times (format: HH:MM)"""
         self.reminder_times = times
+        self._reschedule()
         
     def add_reminder_time(self, time: str):
         """Add a reminder time"""
         if time not in self.reminder_times:
             self.reminder_times.append(time)
+            self._reschedule()
             
     def remove_reminder_time(self, time: str):
         """Remove a reminder time"""
         if time in self.reminder_times:
             self.reminder_times.remove(time)
+            self._reschedule()
 
 
 # Global instance
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 from collections.abc import Callable
+from typing import Any
 
 import aqt
 import aqt.forms
@@ -84,6 +85,9 @@ class StudyDeck(QDialog):
         else:
             self.nameFunc = names
             self.origNames = names()
+        self.name_filter = IncrementalNameFilter(self.origNames)
+        self.model = NameListModel(self)
+        self.form.list.setModel(self.model)
         self.name: str | None = None
         self.form.buttonBox.addButton(
             accept or tr.decks_study(), QDialogButtonBox.ButtonRole.AcceptRole
@@ -91,7 +95,7 @@ class StudyDeck(QDialog):
         self.setModal(True)
         qconnect(self.form.buttonBox.helpRequested, lambda: openHelp(help))
         qconnect(self.form.filter.textEdited, self.redraw)
-        qconnect(self.form.list.itemDoubleClicked, self.accept)
+        qconnect(self.form.list.doubleClicked, self.accept)
         qconnect(self.finished, self.on_finished)
         self.form.filter.setFocus()
         self.show()
@@ -105,8 +109,8 @@ class StudyDeck(QDialog):
 
     def eventFilter(self, obj: QObject | None, evt: QEvent | None) -> bool:
         if isinstance(evt, QKeyEvent) and evt.type() == QEvent.Type.KeyPress:
-            new_row = current_row = self.form.list.currentRow()
-            rows_count = self.form.list.count()
+            new_row = current_row = self._current_row()
+            rows_count = self.model.rowCount()
             key = evt.key()
 
             if key == Qt.Key.Key_Up:
@@ -124,46 +128,43 @@ class StudyDeck(QDialog):
             if rows_count:
                 new_row %= rows_count  # don't let row index overflow/underflow
             if new_row != current_row:
-                self.form.list.setCurrentRow(new_row)
+                self._set_current_row(new_row)
                 return True
         return False
 
     def redraw(self, filt: str, focus: str | None = None) -> None:
         self.filt = filt
         self.focus = focus
-        self.names = [n for n in self.origNames if self._matches(n, filt)]
-        l = self.form.list
-        l.clear()
-        l.addItems(self.names)
+        self.names = self.name_filter.filter(filt)
+        self.model.set_names(self.names)
         if focus in self.names:
             idx = self.names.index(focus)
         else:
             idx = 0
-        l.setCurrentRow(idx)
-        l.scrollToItem(l.item(idx), QAbstractItemView.ScrollHint.PositionAtCenter)
-
-    def _matches(self, name: str, filt: str) -> bool:
-        name = name.lower()
-        filt = filt.lower()
-        if not filt:
-            return True
-        for word in filt.split(" "):
-            if word not in name:
-                return False
-        return True
+        self._set_current_row(idx)
+        self.form.list.scrollTo(
+            self.model.index(idx), QAbstractItemView.ScrollHint.PositionAtCenter
+        )
+
+    def _current_row(self) -> int:
+        return self.form.list.currentIndex().row()
+
+    def _set_current_row(self, row: int) -> None:
+        self.form.list.setCurrentIndex(self.model.index(row))
 
     def onReset(self) -> None:
         # model updated?
         if self.nameFunc:
             self.origNames = self.nameFunc()
+            self.name_filter = IncrementalNameFilter(self.origNames)
         self.redraw(self.filt, self.focus)
 
     def accept(self) -> None:
-        row = self.form.list.currentRow()
+        row = self._current_row()
         if row < 0:
             showInfo(tr.decks_please_select_something())
             return
-        self.name = self.names[self.form.list.currentRow()]
+        self.name = self.names[row]
         self.accept_with_callback()
 
     def accept_with_callback(self) -> None:
@@ -172,11 +173,11 @@ class StudyDeck(QDialog):
         super().accept()
 
     def onAddDeck(self) -> None:
-        row = self.form.list.currentRow()
+        row = self._current_row()
         if row < 0:
             default = self.form.filter.text()
         else:
-            default = self.names[self.form.list.currentRow()]
+            default = self.names[row]
 
         def success(out: OpChangesWithId) -> None:
             deck = self.mw.col.decks.get(DeckId(out.id))
@@ -190,3 +191,76 @@ class StudyDeck(QDialog):
     def on_finished(self) -> None:
         saveGeom(self, self.geomKey)
         gui_hooks.state_did_reset.remove(self.onReset)
+
+
+class IncrementalNameFilter:
+    """Filters names by space-separated words, which must all appear in a name.
+
+    Lowercase keys are computed once, and when a query extends the previous
+    one, only the previous matches are searched, as they are a superset of
+    the new matches. Results are ranked so that words matching at the start
+    of a name or of one of its `::` components come first; ties keep the
+    original order.
+    """
+
+    def __init__(self, names: list[str]) -> None:
+        self.names = names
+        self._keys = [name.lower() for name in names]
+        self._last_query = ""
+        self._last_matches: list[int] = list(range(len(names)))
+
+    def filter(self, query: str) -> list[str]:
+        query = query.lower()
+        if query.startswith(self._last_query):
+            candidates = self._last_matches
+        else:
+            candidates = range(len(self.names))
+        words = [word for word in query.split(" ") if word]
+        keys = self._keys
+        matches = [
+            idx for idx in candidates if all(word in keys[idx] for word in words)
+        ]
+        self._last_query = query
+        self._last_matches = matches
+        if words:
+            matches = sorted(matches, key=lambda idx: self._score(keys[idx], words))
+        return [self.names[idx] for idx in matches]
+
+    @staticmethod
+    def _score(key: str, words: list[str]) -> int:
+        "Lower is better."
+        score = 0
+        for word in words:
+            if key.startswith(word):
+                continue
+            elif f"::{word}" in key or f" {word}" in key:
+                score += 1
+            else:
+                score += 2
+        return score
+
+
+class NameListModel(QAbstractListModel):
+    """List model over the filtered names. Unlike QListWidget, no item is
+    created per row; the view only asks for the rows it displays."""
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._names: list[str] = []
+
+    def set_names(self, names: list[str]) -> None:
+        self.beginResetModel()
+        self._names = names
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._names)
+
+    def data(
+        self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole
+    ) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._names[index.row()]
+        return None
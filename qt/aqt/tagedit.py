@@ -4,13 +4,19 @@
 from __future__ import annotations
 
 import re
-from collections.abc import Iterable
+import weakref
+from bisect import bisect_left, insort
+from collections.abc import Iterable, Iterator
 
-from anki.collection import Collection
+from anki.collection import Collection, OpChanges
 from aqt import gui_hooks
 from aqt.qt import *
 from aqt.qt import sip
 
+# TagEdit types
+TAGS = 0
+DECKS = 1
+
 
 class TagEdit(QLineEdit):
     _completer: QCompleter | TagCompleter
@@ -18,29 +24,46 @@ class TagEdit(QLineEdit):
     lostFocus = pyqtSignal()
 
     # 0 = tags, 1 = decks
-    def __init__(self, parent: QWidget, type: int = 0) -> None:
+    def __init__(self, parent: QWidget, type: int = TAGS) -> None:
         QLineEdit.__init__(self, parent)
         self.col: Collection | None = None
+        # holds the matches for the current input; filtering is done by
+        # the shared CompletionIndex rather than by QCompleter
         self.model = QStringListModel()
         self.type = type
-        if type == 0:
+        if type == TAGS:
             self._completer = TagCompleter(self.model, parent, self)
         else:
             self._completer = QCompleter(self.model, parent)
-        self._completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        self._completer.setCompletionMode(
+            QCompleter.CompletionMode.UnfilteredPopupCompletion
+        )
         self._completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self._completer.setFilterMode(Qt.MatchFlag.MatchContains)
         self.setCompleter(self._completer)
+        qconnect(self.textEdited, self._on_text_edited)
 
     def setCol(self, col: Collection) -> None:
         "Set the current col, updating list of available tags."
         self.col = col
-        l: Iterable[str]
-        if self.type == 0:
-            l = self.col.tags.all()
+        self.model.setStringList([])
+        # build the index now, so the first keypress doesn't have to
+        completion_index(col, self.type)
+
+    def _update_matches(self) -> None:
+        if not self.col:
+            return
+        if isinstance(self._completer, TagCompleter):
+            text = self._completer.current_tag(self.text())
         else:
-            l = (d.name for d in self.col.decks.all_names_and_ids())
-        self.model.setStringList(l)
+            text = self.text()
+        self.model.setStringList(completion_matches(self.col, self.type, text))
+
+    def _on_text_edited(self, text: str) -> None:
+        # Qt doesn't filter the model, so the matches must follow edits that
+        # don't show the completer, such as deleting characters
+        popup = self._completer.popup()
+        if popup is not None and popup.isVisible():
+            self.showCompleter()
 
     def focusInEvent(self, evt: QFocusEvent | None) -> None:
         QLineEdit.focusInEvent(self, evt)
@@ -95,6 +118,7 @@ class TagEdit(QLineEdit):
         gui_hooks.tag_editor_did_process_key(self, evt)
 
     def showCompleter(self) -> None:
+        self._update_matches()
         self._completer.setCompletionPrefix(self.text())
         self._completer.complete()
 
@@ -127,6 +151,10 @@ class TagCompleter(QCompleter):
 
     def splitPath(self, tags: str | None) -> list[str]:
         assert tags is not None
+        return [self.current_tag(tags)]
+
+    def current_tag(self, tags: str) -> str:
+        "Return the tag under the cursor."
         assert self.edit.col is not None
         stripped_tags = tags.strip()
         stripped_tags = re.sub("  +", " ", stripped_tags)
@@ -137,7 +165,7 @@ class TagCompleter(QCompleter):
             self.cursor = len(self.tags) - 1
         else:
             self.cursor = stripped_tags.count(" ", 0, p)
-        return [self.tags[self.cursor]]
+        return self.tags[self.cursor]
 
     def pathFromIndex(self, idx: QModelIndex) -> str:
         if self.cursor is None:
@@ -149,3 +177,150 @@ class TagCompleter(QCompleter):
         except ValueError:
             pass
         return f"{' '.join(self.tags)} "
+
+
+class CompletionIndex:
+    """Sorted index of tag or deck names, for fast prefix lookups.
+
+    Each name is indexed under its full form and under each of its `::`
+    segments, so 'aa::bb::cc' is found when typing 'aa', 'bb' or 'cc', or
+    'bb::c'. Lookups are case-insensitive and take logarithmic time plus
+    the number of results.
+    """
+
+    MAX_RESULTS = 200
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self._names: set[str] = set()
+        self._entries: list[tuple[str, str]] = []
+        # set when names may have changed since the index was built
+        self.stale = False
+        self.rebuild(names)
+
+    def rebuild(self, names: Iterable[str]) -> None:
+        self._names = set(names)
+        self._entries = sorted(
+            entry for name in self._names for entry in self._entries_for(name)
+        )
+        self.stale = False
+
+    def update(self, names: Iterable[str]) -> None:
+        "Bring the index in line with `names`, only touching changed entries."
+        names = set(names)
+        added = names - self._names
+        removed = self._names - names
+        if len(added) + len(removed) > len(names) // 10:
+            self.rebuild(names)
+            return
+        for name in removed:
+            for entry in self._entries_for(name):
+                idx = bisect_left(self._entries, entry)
+                if idx < len(self._entries) and self._entries[idx] == entry:
+                    del self._entries[idx]
+        for name in added:
+            for entry in self._entries_for(name):
+                insort(self._entries, entry)
+        self._names = names
+        self.stale = False
+
+    def search(self, text: str) -> list[str]:
+        """Names with a segment starting with `text`. Names that match from
+        their start are listed first."""
+        prefix = text.casefold()
+        whole: list[str] = []
+        partial: list[str] = []
+        seen: set[str] = set()
+        idx = bisect_left(self._entries, (prefix, ""))
+        while idx < len(self._entries) and len(seen) < self.MAX_RESULTS:
+            key, name = self._entries[idx]
+            if not key.startswith(prefix):
+                break
+            idx += 1
+            if name in seen:
+                continue
+            seen.add(name)
+            if name.casefold().startswith(prefix):
+                whole.append(name)
+            else:
+                partial.append(name)
+        whole.sort(key=str.casefold)
+        partial.sort(key=str.casefold)
+        return whole + partial
+
+    def containing(self, text: str, limit: int) -> list[str]:
+        "Up to `limit` names containing `text` anywhere. Takes linear time."
+        text = text.casefold()
+        return sorted(
+            (name for name in self._names if text in name.casefold()),
+            key=str.casefold,
+        )[:limit]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _entries_for(name: str) -> Iterator[tuple[str, str]]:
+        segments = name.casefold().split("::")
+        for idx in range(len(segments)):
+            yield ("::".join(segments[idx:]), name)
+
+
+# Completion indexes are shared by all editors for a given collection, and
+# refreshed lazily after an operation changes tags or decks.
+_indexes: weakref.WeakKeyDictionary[Collection, dict[int, CompletionIndex]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def completion_index(col: Collection, type: int) -> CompletionIndex:
+    indexes = _indexes.setdefault(col, {})
+    index = indexes.get(type)
+    if index is None:
+        index = indexes[type] = CompletionIndex(_completion_names(col, type))
+    elif index.stale:
+        index.update(_completion_names(col, type))
+    return index
+
+
+# when fewer names than this start with the typed text, names containing it
+# elsewhere (e.g. 'microbiology' for 'bio') are offered after them
+SUBSTRING_FALLBACK_BELOW = 20
+
+
+def completion_matches(col: Collection, type: int, text: str) -> list[str]:
+    matches = completion_index(col, type).search(text)
+    if not text or len(matches) >= SUBSTRING_FALLBACK_BELOW:
+        return matches
+    limit = CompletionIndex.MAX_RESULTS
+    if type == TAGS:
+        contained = col.tags.search(text, limit, substring=True)
+    else:
+        contained = completion_index(col, type).containing(text, limit)
+    seen = set(matches)
+    return matches + [name for name in contained if name not in seen]
+
+
+def _completion_names(col: Collection, type: int) -> Iterable[str]:
+    if type == TAGS:
+        return col.tags.all()
+    else:
+        return (d.name for d in col.decks.all_names_and_ids())
+
+
+def _on_operation_did_execute(changes: OpChanges, handler: object | None) -> None:
+    for indexes in _indexes.values():
+        # an empty index is falsy, so compare with None
+        if changes.tag and (index := indexes.get(TAGS)) is not None:
+            index.stale = True
+        if changes.deck and (index := indexes.get(DECKS)) is not None:
+            index.stale = True
+
+
+def _on_collection_did_temporarily_close(col: Collection) -> None:
+    _indexes.pop(col, None)
+
+
+gui_hooks.operation_did_execute.append(_on_operation_did_execute)
+gui_hooks.collection_did_temporarily_close.append(
+    _on_collection_did_temporarily_close
+)
@@ -0,0 +1,224 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+A single owner for the main window's periodic jobs.
+
+Instead of every component starting its own repeating QTimer, jobs are
+registered here. One coarse timer is armed for the earliest deadline, and
+when it fires, every job that is due (or close enough to being due) is run
+in the same wakeup, so the process sleeps for as long as possible between
+jobs.
+
+Timers that only tick while an operation is in progress, such as the
+progress dialog's show/busy-cursor delays and backend polling in progress.py,
+or the sync progress poll in sync.py, keep their own QTimers: they stop when
+the operation ends, so they never wake an idle process.
+"""
+
+from __future__ import annotations
+
+import signal
+import socket
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import aqt
+from aqt.qt import *
+
+# Qt timers take a signed 32 bit millisecond count
+MAX_TIMER_MS = 2**31 - 1
+
+
+@dataclass(eq=False)
+class ScheduledJob:
+    name: str
+    func: Callable[[], None]
+    # seconds between runs, or None for a job that only runs once
+    interval: float | None
+    # monotonic time at which the job is next due
+    deadline: float
+    # a job may be run up to this many seconds early, so that it can
+    # share a wakeup with another job
+    slack: float = 0.0
+    requires_collection: bool = True
+    cancelled: bool = field(default=False, init=False)
+    runs: int = field(default=0, init=False)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerScheduler:
+    """Runs registered jobs from a single timer, coalescing nearby deadlines.
+
+    Like `ProgressManager.timer()`, jobs do not fire while a progress window
+    is shown: repeating jobs skip that run, and one-off jobs are retried
+    shortly afterwards. Jobs that require a collection are skipped while no
+    collection is open.
+    """
+
+    # retry delay for one-off jobs blocked by a progress window
+    RETRY_SECS = 0.1
+
+    def __init__(self, mw: aqt.AnkiQt) -> None:
+        self.mw = mw
+        self._jobs: list[ScheduledJob] = []
+        self._timer = QTimer(mw)
+        self._timer.setSingleShot(True)
+        qconnect(self._timer.timeout, self._on_timeout)
+        self._running = False
+        # called after each wakeup, so that code that needs to notice changes
+        # to the wall clock can do so without a timer of its own
+        self.wakeup_listeners: list[Callable[[], None]] = []
+
+    # Registering jobs
+    ##########################################################################
+
+    def every(
+        self,
+        name: str,
+        interval_ms: int,
+        func: Callable[[], None],
+        *,
+        requires_collection: bool = True,
+        slack_ms: int | None = None,
+    ) -> ScheduledJob:
+        """Run `func` every `interval_ms`. By default a job may run up to a tenth
+        of its interval early, to share a wakeup with other jobs."""
+        interval = interval_ms / 1000
+        slack = interval / 10 if slack_ms is None else slack_ms / 1000
+        job = ScheduledJob(
+            name=name,
+            func=func,
+            interval=interval,
+            deadline=time.monotonic() + interval,
+            slack=slack,
+            requires_collection=requires_collection,
+        )
+        return self._add(job)
+
+    def after(
+        self,
+        name: str,
+        delay_ms: int,
+        func: Callable[[], None],
+        *,
+        requires_collection: bool = True,
+        slack_ms: int = 0,
+    ) -> ScheduledJob:
+        "Run `func` once, after `delay_ms`."
+        job = ScheduledJob(
+            name=name,
+            func=func,
+            interval=None,
+            deadline=time.monotonic() + max(0, delay_ms) / 1000,
+            slack=slack_ms / 1000,
+            requires_collection=requires_collection,
+        )
+        return self._add(job)
+
+    def cancel(self, job: ScheduledJob | None) -> None:
+        if job is None:
+            return
+        job.cancel()
+        if job in self._jobs:
+            self._jobs.remove(job)
+            self._rearm()
+
+    def jobs(self) -> list[ScheduledJob]:
+        return list(self._jobs)
+
+    def _add(self, job: ScheduledJob) -> ScheduledJob:
+        self._jobs.append(job)
+        self._rearm()
+        return job
+
+    # Firing
+    ##########################################################################
+
+    def _rearm(self) -> None:
+        if self._running:
+            # will be rearmed once the current batch completes
+            return
+        if not self._jobs:
+            self._timer.stop()
+            return
+        delay = min(job.deadline for job in self._jobs) - time.monotonic()
+        ms = min(MAX_TIMER_MS, max(0, int(delay * 1000)))
+        # long sleeps don't need millisecond accuracy, and coarse timers
+        # allow the OS to batch our wakeup with others
+        self._timer.setTimerType(
+            Qt.TimerType.VeryCoarseTimer if ms >= 60_000 else Qt.TimerType.CoarseTimer
+        )
+        self._timer.start(ms)
+
+    def _on_timeout(self) -> None:
+        now = time.monotonic()
+        due = [job for job in self._jobs if job.deadline - job.slack <= now]
+        self._running = True
+        try:
+            for job in due:
+                if job.cancelled:
+                    continue
+                self._run_job(job, now)
+            for listener in self.wakeup_listeners:
+                listener()
+        finally:
+            self._running = False
+            self._jobs = [job for job in self._jobs if not job.cancelled]
+            self._rearm()
+
+    def _run_job(self, job: ScheduledJob, now: float) -> None:
+        if job.interval is not None:
+            job.deadline = now + job.interval
+        else:
+            job.cancelled = True
+
+        if job.requires_collection and not self.mw.col:
+            # no current collection; job is no longer valid
+            return
+        if self.mw.progress.busy():
+            if job.interval is None:
+                # retry shortly; repeating jobs wait for their next run
+                job.cancelled = False
+                job.deadline = now + self.RETRY_SECS
+            return
+
+        job.runs += 1
+        job.func()
+
+
+class SignalWakeup(QObject):
+    """Wake the event loop when a Unix signal arrives.
+
+    Python only runs signal handlers when the interpreter gets control, which
+    does not happen while Qt's event loop is idle. Rather than polling, the
+    C-level handler writes to a socket that Qt watches, and reading it from a
+    slot gives Python the chance to run the handler.
+    """
+
+    def __init__(self, parent: QObject) -> None:
+        super().__init__(parent)
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+        signal.set_wakeup_fd(self._writer.fileno(), warn_on_full_buffer=False)
+        self._notifier = QSocketNotifier(
+            self._reader.fileno(), QSocketNotifier.Type.Read, self
+        )
+        qconnect(self._notifier.activated, self._on_activated)
+
+    def _on_activated(self) -> None:
+        try:
+            while self._reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        signal.set_wakeup_fd(-1)
+        self._notifier.setEnabled(False)
+        self._reader.close()
+        self._writer.close()
@@ -31,6 +31,7 @@ from __future__ import annotations
 import os
 import re
 import subprocess
+from abc import abstractmethod
 from concurrent.futures import Future
 from dataclasses import dataclass
 from operator import attrgetter
@@ -44,7 +45,9 @@ from anki.collection import TtsVoice as BackendVoice
 from anki.sound import AVTag, TTSTag
 from anki.utils import checksum, is_win, tmpdir
 from aqt import gui_hooks
+from aqt.filecache import FileCache
 from aqt.sound import OnDoneCallback, SimpleProcessPlayer
+from aqt.taskman import TaskManager
 from aqt.utils import tooltip, tr
 
 
@@ -131,6 +134,117 @@ class TTSProcessPlayer(SimpleProcessPlayer, TTSPlayer):
             return None
 
 
+# Synthesised audio cache
+##########################################################################
+
+
+class TTSCache(FileCache):
+    """Synthesised audio, kept in the profile folder between sessions.
+
+    Files are named after a checksum of the voice, language, speed and text
+    they were generated from.
+    """
+
+    prefix = "tts-"
+
+    @staticmethod
+    def key(tag: TTSTag, voice: TTSVoice) -> str:
+        return checksum(f"{voice.name}-{voice.lang}-{tag.speed}-{tag.field_text}")
+
+
+_cache: TTSCache | None = None
+
+
+def tts_cache() -> TTSCache:
+    "The cache for the current profile. Must be called on the main thread."
+    global _cache
+    assert aqt.mw
+    folder = os.path.join(aqt.mw.pm.profileFolder(), "tts")
+    if _cache is None or _cache.folder != folder:
+        _cache = TTSCache(folder)
+    return _cache
+
+
+class TTSFilePlayer(TTSProcessPlayer):
+    """Synthesises each tag to a file, which is then played using av_player.
+
+    Files are cached, so replaying a tag does not synthesise it again. The
+    tags of upcoming cards are synthesised in the background ahead of time.
+    """
+
+    # the type of file synthesize() writes
+    file_extension = ".wav"
+
+    def __init__(self, taskman: TaskManager, media_folder: str | None = None) -> None:
+        super().__init__(taskman, media_folder)
+        gui_hooks.av_player_will_need_tags.append(self.presynthesize)
+
+    @abstractmethod
+    def synthesize(self, tag: TTSTag, voice: TTSVoice, path: str) -> None:
+        "Write the audio for tag to path. Called on a background thread."
+
+    def file_for_tag(self, tag: TTSTag, cache: TTSCache) -> str:
+        match = self.voice_for_tag(tag)
+        assert match
+        voice = match.voice
+        return cache.get_or_create(
+            TTSCache.key(tag, voice),
+            self.file_extension,
+            lambda path: self.synthesize(tag, voice, path),
+        )
+
+    def play(self, tag: AVTag, on_done: OnDoneCallback) -> None:
+        assert isinstance(tag, TTSTag)
+        self._terminate_flag = False
+        cache = tts_cache()
+        self._taskman.run_in_background(
+            lambda: self.file_for_tag(tag, cache),
+            lambda res: self._on_done(res, on_done, tag),
+            uses_collection=False,
+        )
+
+    def presynthesize(self, tags: list[AVTag]) -> None:
+        from aqt.sound import av_player
+
+        tags = [
+            tag
+            for tag in tags
+            if isinstance(tag, TTSTag) and av_player._best_player_for_tag(tag) is self
+        ]
+        if not tags:
+            return
+        cache = tts_cache()
+
+        def synthesize_all() -> None:
+            for tag in tags:
+                self.file_for_tag(tag, cache)
+
+        def on_done(fut: Future) -> None:
+            if exception := fut.exception():
+                # will be reported if the tag is played
+                print("unable to synthesise ahead of time:", exception)
+
+        self._taskman.run_in_background(synthesize_all, on_done, uses_collection=False)
+
+    def _on_done(self, ret: Future, cb: OnDoneCallback, tag: TTSTag) -> None:
+        path = ret.result()
+        if self._terminate_flag:
+            # stopped while synthesising
+            cb()
+            return
+
+        gui_hooks.av_player_did_begin_playing(self, tag)
+
+        # inject file into the top of the audio queue
+        from aqt.sound import av_player
+
+        av_player.current_player = None
+        av_player.insert_file(path)
+
+    def shutdown(self) -> None:
+        gui_hooks.av_player_will_need_tags.remove(self.presynthesize)
+
+
 # tts-voices filter
 ##########################################################################
 
@@ -222,22 +336,18 @@ class MacTTSPlayer(TTSProcessPlayer):
         return MacVoice(name=tidy_name, original_name=original_name, lang=m.group(2))
 
 
-class MacTTSFilePlayer(MacTTSPlayer):
+class MacTTSFilePlayer(TTSFilePlayer, MacTTSPlayer):
     "Generates an .aiff file, which is played using av_player."
 
-    tmppath = os.path.join(tmpdir(), "tts.aiff")
+    file_extension = ".aiff"
 
-    def _play(self, tag: AVTag) -> None:
-        assert isinstance(tag, TTSTag)
-        match = self.voice_for_tag(tag)
-        assert match
-        voice = match.voice
+    def synthesize(self, tag: TTSTag, voice: TTSVoice, path: str) -> None:
         assert isinstance(voice, MacVoice)
 
         default_wpm = 170
         words_per_min = str(int(default_wpm * tag.speed))
 
-        self._process = subprocess.Popen(
+        subprocess.run(
             [
                 "say",
                 "-v",
@@ -247,26 +357,13 @@ class MacTTSFilePlayer(MacTTSPlayer):
                 "-f",
                 "-",
                 "-o",
-                self.tmppath,
+                path,
             ],
-            stdin=subprocess.PIPE,
+            input=tag.field_text.encode("utf8"),
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
+            check=True,
         )
-        # write the input text to stdin
-        assert self._process.stdin is not None
-        self._process.stdin.write(tag.field_text.encode("utf8"))
-        self._process.stdin.close()
-        self._wait_for_termination(tag)
-
-    def _on_done(self, ret: Future, cb: OnDoneCallback) -> None:
-        ret.result()
-
-        # inject file into the top of the audio queue
-        from aqt.sound import av_player
-
-        av_player.current_player = None
-        av_player.insert_file(self.tmppath)
 
 
 # Windows support
@@ -578,9 +675,7 @@ if is_win:
                 available=voice.available,
             )
 
-    class WindowsRTTTSFilePlayer(TTSProcessPlayer):
-        tmppath = os.path.join(tmpdir(), "tts.wav")
-
+    class WindowsRTTTSFilePlayer(TTSFilePlayer):
         def validated_voices(self) -> list[TTSVoice]:
             self._available_voices = self._get_available_voices(validate=True)
             return self._available_voices
@@ -595,32 +690,20 @@ if is_win:
             voices = aqt.mw.backend.all_tts_voices(validate=validate)
             return list(map(WindowsRTVoice.from_backend_voice, voices))
 
-        def _play(self, tag: AVTag) -> None:
+        def synthesize(self, tag: TTSTag, voice: TTSVoice, path: str) -> None:
             assert aqt.mw
-            assert isinstance(tag, TTSTag)
-            match = self.voice_for_tag(tag)
-            assert match
-            voice = cast(WindowsRTVoice, match.voice)
-
-            self._taskman.run_on_main(
-                lambda: gui_hooks.av_player_did_begin_playing(self, tag)
-            )
             aqt.mw.backend.write_tts_stream(
-                path=self.tmppath,
-                voice_id=voice.id,
+                path=path,
+                voice_id=cast(WindowsRTVoice, voice).id,
                 speed=tag.speed,
                 text=tag.field_text,
             )
 
-        def _on_done(self, ret: Future, cb: OnDoneCallback) -> None:
+        def _on_done(self, ret: Future, cb: OnDoneCallback, tag: TTSTag) -> None:
             if exception := ret.exception():
                 print(str(exception))
                 tooltip(tr.errors_windows_tts_runtime_error())
                 cb()
                 return
 
-            # inject file into the top of the audio queue
-            from aqt.sound import av_player
-
-            av_player.current_player = None
-            av_player.insert_file(self.tmppath)
+            super()._on_done(ret, cb, tag)
@@ -1,13 +1,30 @@
 # Copyright: Ankitects Pty Ltd and contributors
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 
+import json
 import os.path
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from tempfile import TemporaryDirectory
 from zipfile import ZipFile
 
+import pytest
 from mock import MagicMock
 
-from aqt.addons import AddonManager, package_name_valid
+import aqt
+import aqt.addons
+from anki.httpclient import HttpClient
+from aqt.addons import (
+    AddonManager,
+    DownloadError,
+    InstallOk,
+    download_and_install_addons,
+    fetch_update_info,
+    package_name_valid,
+)
 
 
 def test_readMinimalManifest():
@@ -75,3 +92,146 @@ def test_package_name_validation():
     assert not package_name_valid("a/b")
     assert not package_name_valid("..")
     assert package_name_valid("ab")
+
+
+class StandInAddonServer(ThreadingHTTPServer):
+    "Serves add-ons the way AnkiWeb does, recording how many are in flight."
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StandInAddonHandler)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class StandInAddonHandler(BaseHTTPRequestHandler):
+    server: StandInAddonServer
+
+    def do_GET(self) -> None:
+        if m := re.match(r"/download/(\d+)", self.path):
+            id = int(m.group(1))
+            if id == 404:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(302)
+            self.send_header("Location", f"/file/{id}?t=1&minpt=0&maxpt=0&bidx=0")
+            self.end_headers()
+            return
+
+        id = int(re.match(r"/file/(\d+)", self.path).group(1))
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(0.1)
+        with server.lock:
+            server.in_flight -= 1
+        body = str(id).encode()
+        self.send_response(200)
+        self.send_header("Content-Disposition", f"attachment; filename=Addon_{id}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def addon_server(monkeypatch):
+    server = StandInAddonServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(aqt, "appShared", f"http://127.0.0.1:{server.server_port}/")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_parallel_download_and_serial_install(addon_server):
+    installing = threading.Lock()
+
+    def install(file, manifest, force_enable):
+        assert installing.acquire(blocking=False), "installs overlapped"
+        try:
+            assert file.read() == manifest["package"].encode()
+            return InstallOk(name=manifest["name"], conflicts=set(), compatible=True)
+        finally:
+            installing.release()
+
+    mgr = MagicMock()
+    mgr.install.side_effect = install
+    ids = list(range(1, 13)) + [404]
+    downloaded = []
+
+    log = download_and_install_addons(
+        mgr, HttpClient(), ids, on_downloaded=downloaded.append
+    )
+
+    assert [id for id, _ in log] == ids
+    assert all(isinstance(result, InstallOk) for _, result in log[:-1])
+    assert log[-1][1] == DownloadError(status_code=404)
+    assert log[0][1].name == "Addon 1"
+    assert downloaded == list(range(1, len(ids) + 1))
+    # downloads overlap, up to the connection limit
+    assert 1 < addon_server.max_in_flight <= aqt.addons.CONNECTIONS_PER_HOST
+
+
+def test_update_info_is_fetched_in_ordered_chunks(monkeypatch):
+    chunks = []
+
+    def fetch_batch(chunk):
+        chunks.append(chunk)
+        time.sleep(0.05)
+        return [f"info {id}" for id in chunk]
+
+    monkeypatch.setattr(aqt.addons, "_fetch_update_info_batch", fetch_batch)
+    ids = list(range(100))
+    assert fetch_update_info(ids) == [f"info {id}" for id in ids]
+    assert sorted(map(len, chunks)) == [25, 25, 25, 25]
+
+
+def test_load_timings_and_lazy_loading(tmp_path, monkeypatch):
+    from aqt import gui_hooks
+
+    for name, meta in (
+        ("test_eager_addon", {}),
+        ("test_lazy_addon", {"lazy_load": True, "load_on_hooks": ["profile_did_open"]}),
+    ):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "meta.json").write_text(json.dumps(meta))
+        (tmp_path / name / "__init__.py").write_text(
+            "import json.tool\n"
+            "from aqt import gui_hooks\n"
+            "calls = []\n"
+            "gui_hooks.profile_did_open.append(lambda: calls.append(1))\n"
+        )
+
+    mw = MagicMock()
+    mw.pm.addonFolder.return_value = str(tmp_path)
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.setattr(gui_hooks.profile_did_open, "_hooks", [])
+    monkeypatch.setattr(gui_hooks.main_window_did_init, "_hooks", [])
+    mgr = AddonManager(mw)
+    try:
+        mgr.loadAddons()
+        assert "test_eager_addon" in sys.modules
+        assert "test_lazy_addon" not in sys.modules
+        timing = mgr.load_timings["test_eager_addon"]
+        assert timing.secs > 0
+        assert timing.modules >= 1
+        assert not timing.deferred
+
+        # the lazy add-on is imported when its hook first fires, and its
+        # own callback sees that first call
+        gui_hooks.profile_did_open()
+        eager, lazy = sys.modules["test_eager_addon"], sys.modules["test_lazy_addon"]
+        assert eager.calls == [1]
+        assert lazy.calls == [1]
+        assert mgr.load_timings["test_lazy_addon"].deferred
+
+        gui_hooks.profile_did_open()
+        assert lazy.calls == [1, 1]
+    finally:
+        sys.modules.pop("test_eager_addon", None)
+        sys.modules.pop("test_lazy_addon", None)
@@ -0,0 +1,145 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import aqt.ai_generator
+from aqt.ai_generator import AIExampleGenerator
+
+
+class StandInModelServer(ThreadingHTTPServer):
+    """Answers like the inference API, recording how many requests are in
+    flight. Requests are held until `hold_until` of them have been in flight
+    at once, and while `release` is clear."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StandInModelHandler)
+        self.changed = threading.Condition()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.hold_until = 0
+        self.release = threading.Event()
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/models"
+
+    def handle_error(self, request, client_address) -> None:
+        # abandoned requests find the client gone
+        pass
+
+
+class StandInModelHandler(BaseHTTPRequestHandler):
+    server: StandInModelServer
+
+    def do_POST(self) -> None:
+        server = self.server
+        prompt = json.loads(self.rfile.read(int(self.headers["Content-Length"])))[
+            "inputs"
+        ]
+        with server.changed:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.changed.notify_all()
+            server.changed.wait_for(
+                lambda: server.max_in_flight >= server.hold_until, timeout=10
+            )
+        server.release.wait(timeout=10)
+        with server.changed:
+            server.in_flight -= 1
+        body = json.dumps(
+            [{"generated_text": f"{prompt}the cat sat on the mat today."}]
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    server = StandInModelServer()
+    server.release.set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_examples_are_generated_concurrently_and_cached(server, tmp_path):
+    generator = AIExampleGenerator(endpoint=server.endpoint, cache_dir=str(tmp_path))
+
+    # each request is held until all four are in flight
+    server.hold_until = 4
+    examples = generator.generate_examples("cat", count=4)
+    assert examples == ["The cat sat on the mat today."] * 4
+    assert server.requests == 4
+    assert server.max_in_flight == 4
+    server.hold_until = 0
+
+    # a new instance reads the same cache from disk
+    generator = AIExampleGenerator(endpoint=server.endpoint, cache_dir=str(tmp_path))
+    assert generator.generate_examples("cat", count=4) == examples
+    assert server.requests == 4
+
+    # the model, length and number of samples are all part of the key
+    generator.generate_examples("cat", count=5)
+    assert server.requests == 5
+    generator.generate_examples("cat", count=1, max_length=50)
+    assert server.requests == 6
+    generator.set_model("distilgpt2")
+    generator.generate_examples("cat", count=1)
+    assert server.requests == 7
+
+
+def test_slow_requests_are_abandoned(server):
+    server.release.clear()
+    generator = AIExampleGenerator(endpoint=server.endpoint, timeout=0.5)
+    examples = generator.generate_examples("cat", count=3)
+    # returned while the server is still holding every request
+    assert server.in_flight == server.requests
+    assert examples == generator._get_fallback_examples("cat")
+
+
+def test_queued_requests_get_their_own_timeout(server, monkeypatch):
+    timeouts = []
+    real_wait = aqt.ai_generator.wait
+
+    def wait(futures, timeout):
+        timeouts.append(timeout)
+        return real_wait(futures, timeout=timeout)
+
+    monkeypatch.setattr(aqt.ai_generator, "wait", wait)
+    generator = AIExampleGenerator(endpoint=server.endpoint, timeout=5)
+    count = AIExampleGenerator.MAX_WORKERS * 2
+    examples = generator.generate_examples("cat", count=count)
+    assert examples == ["The cat sat on the mat today."] * count
+    # two rounds of requests, each allowed the timeout
+    assert timeouts == [10]
+
+
+@pytest.mark.skipif(
+    not os.getenv("ANKI_AI_TEST_TIMINGS"), reason="set ANKI_AI_TEST_TIMINGS to run"
+)
+def test_cache_timings(server, tmp_path):
+    generator = AIExampleGenerator(endpoint=server.endpoint, cache_dir=str(tmp_path))
+    start = time.perf_counter()
+    generator.generate_examples("cat", count=4)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    generator.generate_examples("cat", count=4)
+    warm = time.perf_counter() - start
+    print(f"4 examples: {cold * 1000:.0f}ms uncached, {warm * 1000:.1f}ms cached")
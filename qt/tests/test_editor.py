@@ -0,0 +1,80 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+from mock import MagicMock
+
+import aqt.editor
+from anki.notes import NoteFieldsCheckResult
+from aqt.editor import Editor, apply_field_delta
+
+
+def test_apply_field_delta():
+    assert apply_field_delta("abc", 3, 2, 0, "x") == "abxc"
+    assert apply_field_delta("abc", 3, 0, 3, "") == ""
+    # offsets count UTF-16 code units, so an emoji is two wide
+    assert apply_field_delta("a😀b", 4, 1, 2, "😁") == "a😁b"
+    assert apply_field_delta("😀", 2, 2, 0, "x") == "😀x"
+    # a delta made against different text is refused
+    assert apply_field_delta("abc", 4, 0, 0, "x") is None
+    assert apply_field_delta("abc", 3, 2, 2, "x") is None
+
+
+def test_backend_calls_per_100_typed_characters(monkeypatch):
+    editor = Editor.__new__(Editor)
+    editor.note = MagicMock(id=1, fields=["", "back"])
+    editor.addMode = False
+    editor.currentField = 0
+    editor.web = MagicMock()
+    editor.widget = editor.parentWindow = MagicMock()
+    editor.mw = MagicMock()
+    editor.mw.col.media.escape_media_filenames.side_effect = lambda txt, **kw: txt
+    editor._field_texts = {}
+    editor._duplicate_check_id = 0
+
+    saves = []
+    checks = []
+    queued = []
+
+    def update_note(parent, note):
+        saves.append(list(note.fields))
+        return MagicMock()
+
+    def query_op(parent, op, success):
+        def run_in_background():
+            # the backend is busy, so checks wait until typing pauses
+            queued.append((op, success))
+
+        return MagicMock(run_in_background=run_in_background)
+
+    def fields_check():
+        checks.append(list(editor.note.fields))
+        return NoteFieldsCheckResult.NORMAL
+
+    editor.note.fields_check.side_effect = fields_check
+    monkeypatch.setattr(aqt.editor, "update_note", update_note)
+    monkeypatch.setattr(aqt.editor, "QueryOp", query_op)
+
+    # a save after every five characters, then a second key save and a blur
+    # that find nothing new
+    typed = ("the quick brown fox jumps over the lazy dog " * 3)[:100]
+    editor.onBridgeCmd(f"key:0:1:{typed[:5]}")
+    for i in range(10, 101, 5):
+        editor.onBridgeCmd(f"keyDelta:0:1:{i - 5}:{i - 5}:0:{typed[i - 5 : i]}")
+    editor.onBridgeCmd("keyDelta:0:1:100:100:0:")
+    editor.onBridgeCmd("blurDelta:0:1:100:100:0:")
+    for op, success in queued:
+        success(op(None))
+
+    assert editor.note.fields[0] == typed
+    assert saves[-1] == [typed, "back"]
+    assert checks == [[typed, "back"]]
+    print(
+        f"backend calls per 100 typed characters: {len(saves)} saves, "
+        f"{len(checks)} duplicate checks ({len(queued) - len(checks)} skipped)"
+    )
+
+    # a delta that can't be applied asks for the whole field again
+    editor._field_texts.clear()
+    editor.onBridgeCmd("keyDelta:0:1:100:100:0:!")
+    editor.web.eval.assert_called_with("resendField(0);")
+    assert editor.note.fields[0] == typed
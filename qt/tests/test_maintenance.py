@@ -0,0 +1,76 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+from mock import MagicMock
+
+import aqt.maintenance
+from aqt import gui_hooks
+from aqt.maintenance import MaintenanceRunner
+
+
+class StandInTimers:
+    "Records the one-off jobs the runner asks for, without a Qt timer."
+
+    def __init__(self) -> None:
+        self.pending: list = []
+
+    def after(self, name, delay_ms, func, **kwargs):
+        job = MagicMock(delay_ms=delay_ms, func=func)
+        self.pending.append(job)
+        return job
+
+    def cancel(self, job) -> None:
+        if job in self.pending:
+            self.pending.remove(job)
+
+
+def test_runner_sleeps_until_a_task_could_start(monkeypatch):
+    clock = {"now": 1000}
+    clock_module = MagicMock(monotonic=lambda: clock["now"])
+    monkeypatch.setattr(aqt.maintenance, "time", clock_module)
+    monkeypatch.setattr(aqt.maintenance, "int_time", lambda: clock["now"])
+    timers = StandInTimers()
+    mw = MagicMock(timers=timers, state="deckBrowser", restoring_backup=False)
+    mw._background_op_count = 0
+    mw.progress.busy.return_value = False
+    mw.app.last_input = clock["now"]
+    mw.pm.profile = {
+        "lastOptimize": clock["now"],
+        "maintenance": {"backup": {"last": clock["now"]}},
+    }
+    runner = MaintenanceRunner(mw)
+    started = []
+    runner._start = lambda task: started.append(task.name)
+
+    def wake() -> None:
+        (job,) = timers.pending
+        clock["now"] += job.delay_ms / 1000
+        timers.pending.remove(job)
+        job.func()
+
+    try:
+        # nothing is due until the next backup
+        runner.schedule()
+        assert [job.delay_ms for job in timers.pending] == [300_000]
+
+        # the user is busy when it is due, so the runner waits until they
+        # have been idle for long enough, rather than checking every minute
+        mw.app.last_input = clock["now"] + 290
+        wake()
+        assert not started
+        assert [job.delay_ms for job in timers.pending] == [110_000]
+        wake()
+        assert started == ["backup"]
+
+        # while a card is shown, the user isn't idle, so the runner only wakes
+        # up when the backup can be put off no longer
+        started.clear()
+        mw.state = "review"
+        runner.schedule()
+        assert [job.delay_ms for job in timers.pending] == [(30 * 60 - 110 + 1) * 1000]
+        wake()
+        assert started == ["backup"]
+    finally:
+        gui_hooks.profile_did_open.remove(runner.schedule)
+        gui_hooks.profile_will_close.remove(runner._on_profile_will_close)
+        gui_hooks.state_did_change.remove(runner._on_state_did_change)
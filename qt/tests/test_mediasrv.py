@@ -0,0 +1,58 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import os
+import time
+
+from aqt.mediasrv import ImageVariants
+from aqt.qt import QColor, QImage, QImageReader
+
+
+def write_photo(path: str, width: int, height: int, color: str = "teal") -> None:
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor(color))
+    assert image.save(path, "JPG", 95)
+
+
+def decode_secs(path: str) -> float:
+    start = time.perf_counter()
+    assert not QImageReader(path).read().isNull()
+    return time.perf_counter() - start
+
+
+def test_image_variants(tmp_path):
+    media = tmp_path / "media"
+    media.mkdir()
+    photo = str(media / "photo.jpg")
+    write_photo(photo, 6000, 4000)
+    with open(photo, "rb") as f:
+        original = f.read()
+    variants = ImageVariants(str(tmp_path / "variants"))
+
+    variant = variants.variant(photo, 1536)
+    assert variant
+    size = QImageReader(variant).size()
+    assert (size.width(), size.height()) == (1536, 1024)
+    # the media file itself is left alone
+    with open(photo, "rb") as f:
+        assert f.read() == original
+    assert os.listdir(media) == ["photo.jpg"]
+    print(
+        f"decode time: original {decode_secs(photo) * 1000:.0f}ms, "
+        f"variant {decode_secs(variant) * 1000:.0f}ms"
+    )
+
+    # generated once, and the same copy is used by later requests
+    mtime = os.stat(variant).st_mtime_ns
+    assert variants.variant(photo, 1536) == variant
+    assert os.stat(variant).st_mtime_ns >= mtime
+    assert len(os.listdir(tmp_path / "variants")) == 1
+
+    # images that already fit are served as is
+    assert variants.variant(photo, 8192) is None
+
+    # replacing the image produces a new copy
+    write_photo(photo, 6000, 4000, color="orange")
+    replaced = variants.variant(photo, 1536)
+    assert replaced and replaced != variant
+    assert QImage(replaced).pixelColor(0, 0).red() > 200
@@ -0,0 +1,106 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from anki.utils import is_win
+from aqt.mpv import MPVBase, MPVCommandError
+
+pytestmark = pytest.mark.skipif(is_win, reason="uses a unix socket pair")
+
+# a burst of property changes, as recorded from mpv while a file loads
+RECORDED_EVENTS = [
+    {"event": "property-change", "id": 1, "name": "time-pos", "data": 0.1 * i}
+    for i in range(20_000)
+] + [{"event": "idle"}]
+
+
+class StandInServer(threading.Thread):
+    """Answers commands like mpv's IPC server would. Responses to commands
+    that arrive together are sent in reverse order, to check they're matched
+    up by request_id. The 'replay' command sends the recorded events first."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        super().__init__(daemon=True)
+        self.sock = sock
+
+    def run(self) -> None:
+        buf = b""
+        while data := self.sock.recv(65536):
+            buf += data
+            *lines, buf = buf.split(b"\n")
+            out = []
+            for line in lines:
+                msg = json.loads(line)
+                command = msg["command"]
+                if command[0] == "replay":
+                    self.sock.sendall(
+                        b"".join(json.dumps(e).encode() + b"\n" for e in RECORDED_EVENTS)
+                    )
+                if command[0] == "fail":
+                    reply = {"error": "invalid parameter"}
+                else:
+                    reply = {"error": "success", "data": command[1:]}
+                reply["request_id"] = msg["request_id"]
+                out.append(json.dumps(reply).encode() + b"\n")
+            self.sock.sendall(b"".join(reversed(out)))
+
+
+class StandInMPV(MPVBase):
+    def __init__(self, sock: socket.socket) -> None:
+        self._stand_in_sock = sock
+        super().__init__()
+
+    def _prepare_socket(self):
+        pass
+
+    def _prepare_process(self):
+        pass
+
+    def _start_process(self):
+        pass
+
+    def _stop_process(self):
+        pass
+
+    def _start_socket(self):
+        self._sock = self._stand_in_sock
+
+    def is_running(self):
+        return True
+
+
+@pytest.fixture
+def mpv():
+    client, server = socket.socketpair()
+    StandInServer(server).start()
+    mpv = StandInMPV(client)
+    yield mpv
+    mpv._stop_thread()
+    mpv._stop_socket()
+    server.close()
+
+
+def test_pipelined_commands(mpv: StandInMPV):
+    assert mpv._send_requests(
+        [{"command": ["echo", 1]}, {"command": ["echo", 2]}, {"command": ["echo", 3]}],
+        timeout=5,
+    ) == [[1], [2], [3]]
+    with pytest.raises(MPVCommandError):
+        mpv._send_requests([{"command": ["echo"]}, {"command": ["fail"]}], timeout=5)
+    # a failure leaves later requests unaffected
+    assert mpv._send_request({"command": ["echo", "ok"]}, timeout=5) == ["ok"]
+
+
+def test_replay_event_stream(mpv: StandInMPV):
+    start = time.perf_counter()
+    mpv._send_request({"command": ["replay"]}, timeout=30)
+    events = [mpv._get_event(timeout=5) for _ in RECORDED_EVENTS]
+    elapsed = time.perf_counter() - start
+    assert events == RECORDED_EVENTS
+    print(f"replayed {len(events)} events in {elapsed * 1000:.0f}ms")
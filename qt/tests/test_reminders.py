@@ -0,0 +1,127 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import datetime
+
+from mock import MagicMock
+
+from aqt.qt import Qt
+from aqt.reminders import ReminderService
+
+
+class StandInTimers:
+    "Records the one-off jobs the service asks for, without a Qt timer."
+
+    def __init__(self) -> None:
+        self.pending: list = []
+        self.wakeups = 0
+        self.wakeup_listeners: list = []
+
+    def after(self, name, delay_ms, func, **kwargs):
+        job = MagicMock(delay_ms=delay_ms, func=func)
+        self.pending.append(job)
+        return job
+
+    def cancel(self, job) -> None:
+        if job in self.pending:
+            self.pending.remove(job)
+
+
+def test_service_sleeps_until_the_next_reminder():
+    timers = StandInTimers()
+    mw = MagicMock(timers=timers)
+    mw.col.sched.counts.return_value = (1, 2, 3)
+    service = ReminderService(mw)
+    now = datetime.datetime(2024, 5, 1, 8, 0)
+    service._now = lambda: now
+
+    fired = []
+    counts = []
+
+    def remind(name: str):
+        def func() -> None:
+            fired.append((name, now.strftime("%H:%M")))
+            counts.append(service.due_counts())
+
+        return func
+
+    service.set("basic", ["09:00", "19:00"], remind("basic"))
+    service.set("enhanced", ["09:00", "14:00", "bad"], remind("enhanced"))
+
+    # run the session for a day, advancing the clock to each deadline
+    end = now + datetime.timedelta(days=1)
+    while timers.pending:
+        (job,) = timers.pending
+        now += datetime.timedelta(milliseconds=job.delay_ms)
+        if now >= end:
+            break
+        timers.pending.remove(job)
+        timers.wakeups += 1
+        job.func()
+
+    assert fired == [
+        ("basic", "09:00"),
+        ("enhanced", "09:00"),
+        ("enhanced", "14:00"),
+        ("basic", "19:00"),
+    ]
+    # one wakeup per distinct time, rather than one per minute
+    assert timers.wakeups == 3
+    # reminders that fire together share the counts
+    assert counts == [(1, 2, 3)] * 4
+    assert mw.col.sched.counts.call_count == 3
+
+    service.remove("basic")
+    service.remove("enhanced")
+    assert not timers.pending
+
+
+def test_reminders_follow_the_wall_clock():
+    timers = StandInTimers()
+    service = ReminderService(MagicMock(timers=timers))
+    now = datetime.datetime(2024, 5, 1, 8, 0)
+    monotonic = 0.0
+    service._now = lambda: now
+    service._monotonic = lambda: monotonic
+    fired = []
+    service.set("basic", ["09:00"], lambda: fired.append(now.strftime("%H:%M")))
+
+    def wake(job) -> None:
+        timers.pending.remove(job)
+        timers.wakeups += 1
+        job.func()
+
+    # a single job for the real deadline
+    (job,) = timers.pending
+    assert job.delay_ms == 60 * 60 * 1000
+
+    # another job wakes the scheduler while the clocks agree, so nothing
+    # changes
+    now += datetime.timedelta(minutes=5)
+    monotonic += 5 * 60
+    for listener in timers.wakeup_listeners:
+        listener()
+    assert timers.pending == [job]
+
+    # the machine sleeps for two hours, during which the monotonic clock
+    # doesn't advance; when the app is reactivated, the missed reminder is
+    # due straight away
+    now += datetime.timedelta(hours=2)
+    service._on_application_state(Qt.ApplicationState.ApplicationActive)
+    (job,) = timers.pending
+    assert job.delay_ms == 0
+    wake(job)
+    assert fired == ["10:05"]
+
+    # the clock goes back an hour, so the next reminder is an hour further
+    # away than the job armed for it
+    (job,) = timers.pending
+    assert job.delay_ms == (22 * 60 + 55) * 60 * 1000
+    now -= datetime.timedelta(hours=1)
+    for listener in timers.wakeup_listeners:
+        listener()
+    (job,) = timers.pending
+    assert job.delay_ms == (23 * 60 + 55) * 60 * 1000
+
+    # the scheduler woke up only for the reminder
+    assert timers.wakeups == 1
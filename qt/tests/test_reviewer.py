@@ -0,0 +1,74 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+from mock import MagicMock
+
+from anki.scheduler.v3 import QueuedCards
+from aqt import gui_hooks
+from aqt.reviewer import LatencyRecorder, Reviewer, V3CardInfo, template_uses_tts
+
+
+def test_latency_percentiles():
+    latency = LatencyRecorder(size=100)
+    assert latency.percentile(50) is None
+    assert latency.summary() == "no samples"
+
+    # older samples are dropped
+    for ms in range(1000, 1100):
+        latency.add(ms / 1000)
+    for ms in range(1, 101):
+        latency.add(ms / 1000)
+    assert len(latency) == 100
+    assert latency.percentile(50) == 0.050
+    assert latency.percentile(95) == 0.095
+    assert latency.percentile(100) == 0.1
+    assert latency.summary() == "p50 50.0ms, p95 95.0ms over 100 samples"
+
+
+def test_queue_without_top_card():
+    queued = QueuedCards(new_count=3, learning_count=1, review_count=5)
+    for cid, queue in ((1, QueuedCards.REVIEW), (2, QueuedCards.NEW)):
+        card = queued.cards.add(queue=queue)
+        card.card.id = cid
+    info = V3CardInfo.from_queue(queued)
+
+    following = info.without_top_card()
+    assert following is not None
+    assert following.top_card().card.id == 2
+    assert following.counts() == (0, [3, 1, 4])
+    # the displayed queue is left alone
+    assert info.top_card().card.id == 1
+    assert following.without_top_card() is None
+
+
+def test_answered_card_is_current_while_the_hook_runs():
+    reviewer = Reviewer.__new__(Reviewer)
+    reviewer.mw = MagicMock(state="review")
+    reviewer.web = MagicMock()
+    reviewer._answeredIds = []
+    reviewer._reconcile_queue = MagicMock()
+    answered, next_card = MagicMock(id=1), MagicMock(id=2)
+    # the next card is shown before the answer has been saved
+    reviewer.card = next_card
+    seen = []
+
+    def on_answer(reviewer, card, ease) -> None:
+        seen.append((reviewer.card, card, ease))
+
+    gui_hooks.reviewer_did_answer_card.append(on_answer)
+    try:
+        reviewer._after_answering(3, answered, next_shown=True)
+    finally:
+        gui_hooks.reviewer_did_answer_card.remove(on_answer)
+
+    assert seen == [(answered, answered, 3)]
+    assert reviewer.card is next_card
+    assert reviewer._answeredIds == [1]
+
+
+def test_template_uses_tts():
+    card = MagicMock()
+    card.template.return_value = {"qfmt": "{{Front}}", "afmt": "{{Back}}"}
+    assert not template_uses_tts(card)
+    card.template.return_value = {"qfmt": "{{Front}}", "afmt": "{{tts en_US:Back}}"}
+    assert template_uses_tts(card)
@@ -0,0 +1,125 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from anki.collection import Collection
+from aqt.shutdown import CloseTask, CloseTaskRunner, CollectionCloser, flush_logs
+
+
+class StandInTaskManager:
+    "Runs tasks on threads, and their callbacks when events are processed."
+
+    def __init__(self) -> None:
+        self.executor = ThreadPoolExecutor()
+        self.callbacks: queue.Queue = queue.Queue()
+
+    def run_in_background(self, task, on_done, uses_collection=True):
+        future = self.executor.submit(task)
+        future.add_done_callback(lambda fut: self.callbacks.put(lambda: on_done(fut)))
+        return future
+
+    def run(self, tasks, budget_secs, estimates=None):
+        reports = []
+        runner = CloseTaskRunner(self, tasks, budget_secs, estimates)
+        runner.run(reports.append)
+        # the event loop
+        while not reports:
+            self.callbacks.get(timeout=60)()
+        return reports[0]
+
+
+def test_independent_tasks_run_in_parallel():
+    order = []
+    started = {name: threading.Event() for name in ("backup", "logs")}
+    overlapped = []
+
+    def task(name, overlaps=None):
+        def func():
+            if name in started:
+                started[name].set()
+            if overlaps:
+                # only returns true if the other task started while this
+                # one was running
+                overlapped.append(started[overlaps].wait(timeout=10))
+            order.append(name)
+
+        return func
+
+    report = StandInTaskManager().run(
+        [
+            CloseTask("close", task("close"), after=("backup",)),
+            CloseTask("backup", task("backup", overlaps="logs")),
+            CloseTask("logs", task("logs", overlaps="backup")),
+            CloseTask("window", task("window"), main_thread=True),
+            CloseTask("broken", lambda: 1 / 0),
+        ],
+        budget_secs=10,
+    )
+
+    assert order.index("backup") < order.index("close")
+    assert set(report.timings) == {"close", "backup", "logs", "window", "broken"}
+    assert list(report.errors) == ["broken"]
+    assert not report.deferred
+    # the logs are flushed while the backup runs
+    assert overlapped == [True, True]
+
+
+def test_slow_tasks_are_deferred():
+    ran = []
+    tasks = [
+        CloseTask("check", lambda: ran.append("check"), deferrable=True),
+        CloseTask(
+            "backup", lambda: ran.append("backup"), after=("check",), deferrable=True
+        ),
+        CloseTask("close", lambda: ran.append("close"), after=("backup",)),
+    ]
+
+    report = StandInTaskManager().run(tasks, budget_secs=3, estimates={"check": 1})
+    assert ran == ["check", "backup", "close"]
+
+    ran.clear()
+    report = StandInTaskManager().run(
+        tasks, budget_secs=3, estimates={"check": 1, "backup": 4}
+    )
+    assert ran == ["check", "close"]
+    assert report.deferred == ["backup"]
+
+    # tasks that follow a deferred task are deferred too
+    ran.clear()
+    report = StandInTaskManager().run(tasks, budget_secs=3, estimates={"check": 5})
+    assert ran == ["close"]
+    assert report.deferred == ["check", "backup"]
+
+
+@pytest.mark.skipif(
+    not os.getenv("ANKI_CLOSE_TEST_MB"), reason="set ANKI_CLOSE_TEST_MB to run"
+)
+def test_close_time_for_a_large_collection(tmp_path):
+    # ANKI_CLOSE_TEST_MB=500 to measure the close of a 500MB collection
+    size_mb = int(os.environ["ANKI_CLOSE_TEST_MB"])
+    col = Collection(str(tmp_path / "collection.anki2"))
+    col.db.execute("create table padding (data blob)")
+    for _ in range(size_mb):
+        col.db.execute("insert into padding values (randomblob(1048576))")
+    backups = tmp_path / "backups"
+    backups.mkdir()
+
+    closer = CollectionCloser(col, check=True, backup_folder=str(backups))
+    tasks = [*closer.tasks(), CloseTask("flush_logs", flush_logs)]
+    start = time.perf_counter()
+    report = StandInTaskManager().run(tasks, budget_secs=60)
+    wall = time.perf_counter() - start
+
+    assert not report.errors and not closer.corrupt
+    assert os.listdir(backups)
+    print(
+        f"closing a {size_mb}MB collection took {wall:.2f}s, with tasks taking "
+        f"{sum(report.timings.values()):.2f}s in total: {report.summary()}"
+    )
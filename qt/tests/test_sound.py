@@ -0,0 +1,82 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import math
+import struct
+import threading
+import time
+import wave
+from shutil import which
+
+import pytest
+from mock import MagicMock
+
+import aqt
+from anki.sound import SoundOrVideoTag
+from aqt.mpv import MPVCommandError
+from aqt.sound import MpvManager
+
+pytestmark = pytest.mark.skipif(which("mpv") is None, reason="mpv not installed")
+
+
+def write_tone(path: str, secs: float = 1.0, rate: int = 44100) -> None:
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(
+            b"".join(
+                struct.pack("<h", int(8000 * math.sin(i / rate * 2 * math.pi * 440)))
+                for i in range(int(secs * rate))
+            )
+        )
+
+
+def wait_for(predicate, timeout: float = 10.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        assert time.perf_counter() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def playback_started(player: MpvManager) -> bool:
+    try:
+        return (player.get_property("playback-time") or 0) > 0
+    except MPVCommandError:
+        # no file loaded yet
+        return False
+
+
+def test_time_to_first_playback(tmp_path, monkeypatch):
+    mw = MagicMock()
+    mw.taskman.run_in_background.side_effect = (
+        lambda task, *args, **kwargs: threading.Thread(target=task, daemon=True).start()
+    )
+    mw.taskman.run_on_main.side_effect = lambda closure: closure()
+    monkeypatch.setattr(aqt, "mw", mw)
+
+    for name in ("cold.wav", "warm.wav"):
+        write_tone(str(tmp_path / name))
+    player = MpvManager(str(tmp_path), str(tmp_path))
+    try:
+        wait_for(lambda: hasattr(player, "mpv_version"))
+
+        def time_to_first_playback(tag: SoundOrVideoTag) -> float:
+            done = threading.Event()
+            start = time.perf_counter()
+            player.play(tag, done.set)
+            wait_for(lambda: playback_started(player))
+            elapsed = time.perf_counter() - start
+            assert done.wait(10)
+            return elapsed
+
+        cold = time_to_first_playback(SoundOrVideoTag("cold.wav"))
+
+        warm_tag = SoundOrVideoTag("warm.wav")
+        player.preload(warm_tag)
+        wait_for(lambda: not player._idle)
+        warm = time_to_first_playback(warm_tag)
+
+        print(f"time to first playback: cold {cold*1000:.1f}ms, warm {warm*1000:.1f}ms")
+    finally:
+        player.close()
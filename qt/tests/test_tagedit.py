@@ -0,0 +1,43 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+from anki.collection import Collection
+from anki.decks import DeckId
+from aqt.tagedit import (
+    DECKS,
+    TAGS,
+    _on_operation_did_execute,
+    completion_index,
+    completion_matches,
+)
+
+
+def test_tags_added_to_an_empty_index_are_offered(tmp_path):
+    col = Collection(str(tmp_path / "collection.anki2"))
+    assert completion_index(col, TAGS).search("ne") == []
+
+    note = col.new_note(col.models.by_name("Basic"))
+    note.tags = ["new::tag"]
+    changes = col.add_note(note, DeckId(1))
+    _on_operation_did_execute(changes, None)
+
+    assert completion_index(col, TAGS).search("ne") == ["new::tag"]
+    assert completion_index(col, TAGS).search("ta") == ["new::tag"]
+    col.close()
+
+
+def test_names_containing_the_text_follow_prefix_matches(tmp_path):
+    col = Collection(str(tmp_path / "collection.anki2"))
+    note = col.new_note(col.models.by_name("Basic"))
+    note.tags = ["biology", "science::microbiology"]
+    col.add_note(note, DeckId(1))
+    col.decks.id("Biology")
+    col.decks.id("Microbiology")
+
+    assert completion_index(col, TAGS).search("bio") == ["biology"]
+    assert completion_matches(col, TAGS, "bio") == [
+        "biology",
+        "science::microbiology",
+    ]
+    assert completion_matches(col, DECKS, "bio") == ["Biology", "Microbiology"]
+    col.close()
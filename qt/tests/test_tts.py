@@ -0,0 +1,155 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+from mock import MagicMock
+
+import aqt
+import aqt.tts
+from anki.sound import TTSTag
+from aqt import gui_hooks
+from aqt.sound import av_player
+from aqt.tts import TTSCache, TTSFilePlayer, TTSVoice
+
+
+class CommandTTSPlayer(TTSFilePlayer):
+    "Synthesises by running a local command that writes the text to the file."
+
+    def __init__(self, taskman) -> None:
+        super().__init__(taskman)
+        self.synthesised: list[str] = []
+
+    def get_available_voices(self) -> list[TTSVoice]:
+        return [TTSVoice(name="Stand_In", lang="en_US")]
+
+    def synthesize(self, tag: TTSTag, voice: TTSVoice, path: str) -> None:
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; open(sys.argv[1], 'w').write(sys.argv[2])",
+                path,
+                tag.field_text,
+            ],
+            check=True,
+        )
+        self.synthesised.append(tag.field_text)
+
+
+def run_now(task, on_done=None, args=None, uses_collection=True):
+    fut: Future = Future()
+    fut.set_result(task())
+    if on_done:
+        on_done(fut)
+    return fut
+
+
+def tag(text: str, speed: float = 1.0) -> TTSTag:
+    return TTSTag(field_text=text, lang="en_US", voices=[], speed=speed, other_args=[])
+
+
+@pytest.fixture
+def player(tmp_path, monkeypatch):
+    mw = MagicMock()
+    mw.pm.profileFolder.return_value = str(tmp_path)
+    monkeypatch.setattr(aqt, "mw", mw)
+    monkeypatch.setattr(aqt.tts, "_cache", None)
+
+    taskman = MagicMock()
+    taskman.run_in_background.side_effect = run_now
+    player = CommandTTSPlayer(taskman)
+    player.played = []
+    monkeypatch.setattr(av_player, "players", [player])
+    monkeypatch.setattr(av_player, "insert_file", player.played.append)
+    yield player
+    player.shutdown()
+
+
+def test_synthesised_audio_is_cached(player: CommandTTSPlayer):
+    player.play(tag("hello"), lambda: None)
+    player.play(tag("hello"), lambda: None)
+    assert player.synthesised == ["hello"]
+    assert player.played[0] == player.played[1]
+    with open(player.played[0]) as f:
+        assert f.read() == "hello"
+
+    # speed is part of the key
+    player.play(tag("hello", speed=1.5), lambda: None)
+    assert player.synthesised == ["hello", "hello"]
+
+    # and the cache persists across sessions
+    aqt.tts._cache = None
+    player.play(tag("hello"), lambda: None)
+    assert player.synthesised == ["hello", "hello"]
+    assert player.played[-1] == player.played[0]
+
+
+def test_upcoming_tags_are_synthesised_ahead(player: CommandTTSPlayer):
+    gui_hooks.av_player_will_need_tags([tag("one"), tag("two")])
+    assert player.synthesised == ["one", "two"]
+    player.play(tag("two"), lambda: None)
+    assert player.synthesised == ["one", "two"]
+
+
+def test_least_recently_used_audio_is_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(TTSCache, "max_bytes", 10)
+    cache = TTSCache(str(tmp_path))
+
+    def write(text: str):
+        def write(path: str) -> None:
+            with open(path, "w") as f:
+                f.write(text)
+
+        return write
+
+    a = cache.get_or_create("a", ".wav", write("aaaa"))
+    b = cache.get_or_create("b", ".wav", write("bbbb"))
+    assert cache.get("a", ".wav") == a
+    cache.get_or_create("c", ".wav", write("cccc"))
+    assert os.path.exists(a)
+    assert not os.path.exists(b)
+    assert cache.get("b", ".wav") is None
+
+    # a fresh instance picks up the same files, without partial writes
+    open(os.path.join(tmp_path, ".partial.wav"), "w").close()
+    cache = TTSCache(str(tmp_path))
+    assert cache.get("a", ".wav") == a
+    assert sorted(os.listdir(tmp_path)) == ["tts-a.wav", "tts-c.wav"]
+
+
+def test_concurrent_requests_create_a_file_once(tmp_path):
+    cache = TTSCache(str(tmp_path))
+    writes = []
+    first_write_failed = threading.Event()
+
+    def write(path: str) -> None:
+        writes.append(path)
+        time.sleep(0.05)
+        if not first_write_failed.is_set():
+            first_write_failed.set()
+            raise Exception("synthesis failed")
+        with open(path, "w") as f:
+            f.write("audio")
+
+    def request() -> str | None:
+        try:
+            return cache.get_or_create("a", ".wav", write)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        paths = list(executor.map(lambda _: request(), range(8)))
+
+    # the failed request is retried by one of the waiting ones, and the
+    # rest use its file
+    assert len(writes) == 2
+    assert paths.count(None) == 1
+    assert len(set(paths) - {None}) == 1
+    assert not cache._creating
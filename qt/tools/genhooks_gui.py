@@ -190,6 +190,10 @@ hooks = [
             "card: Card",
             "ease: Literal[1, 2, 3, 4]",
         ],
+        doc="""Called once the answer has been saved.
+
+        The next card may already be on screen by then. While this hook runs,
+        reviewer.card is the card that was answered.""",
     ),
     Hook(
         name="reviewer_will_show_context_menu",
@@ -1221,6 +1225,13 @@ hooks = [
         args=["player: aqt.sound.Player", "tag: anki.sound.AVTag"],
     ),
     Hook(name="av_player_did_end_playing", args=["player: aqt.sound.Player"]),
+    Hook(
+        name="av_player_will_need_tags",
+        args=["tags: list[anki.sound.AVTag]"],
+        doc="""Called with tags that are likely to be played soon, such as those
+        on the reviewer's upcoming cards, so players can prepare them ahead of
+        time. Slow preparation should be done in the background.""",
+    ),
     Hook(
         name="av_player_will_play_tags",
         args=[
@@ -37,6 +37,8 @@ pub fn write_rust_protos(descriptors_path: PathBuf) -> Result<DescriptorPool> {
             "Preferences.BackupLimits",
             "#[derive(serde::Deserialize, serde::Serialize)]",
         )
+        // absent from limits saved by older versions
+        .field_attribute("Preferences.BackupLimits.incremental", "#[serde(default)]")
         .type_attribute(
             "CsvMetadata.DupeResolution",
             "#[derive(serde::Deserialize, serde::Serialize)]",
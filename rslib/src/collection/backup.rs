@@ -1,8 +1,9 @@
 // Copyright: Ankitects Pty Ltd and contributors
 // License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 
+mod chunks;
+
 use std::ffi::OsStr;
-use std::fs::read_dir;
 use std::fs::remove_file;
 use std::fs::DirEntry;
 use std::path::Path;
@@ -11,16 +12,22 @@ use std::thread;
 use std::thread::JoinHandle;
 use std::time::SystemTime;
 
+use anki_io::read_dir_files;
 use anki_io::read_locked_db_file;
 use anki_proto::config::preferences::BackupLimits;
 use chrono::prelude::*;
 use itertools::Itertools;
 use tracing::error;
 
+pub(crate) use self::chunks::restore_chunked_backup;
+pub(crate) use self::chunks::MANIFEST_EXTENSION as CHUNKED_BACKUP_EXTENSION;
+use self::chunks::remove_unused_chunks;
+use self::chunks::write_chunked_backup;
 use crate::import_export::package::export_colpkg_from_data;
 use crate::prelude::*;
 
 const BACKUP_FORMAT_STRING: &str = "backup-%Y-%m-%d-%H.%M.%S.colpkg";
+const CHUNKED_BACKUP_FORMAT_STRING: &str = "backup-%Y-%m-%d-%H.%M.%S.chunked";
 
 impl Collection {
     /// Create a backup if enough time has elapsed, or if forced.
@@ -63,7 +70,8 @@ fn should_skip_backup(
 fn has_recent_backup(backup_folder: &Path, recent_mins: u32) -> Result<bool> {
     let recent_secs = (recent_mins * 60) as u64;
     let now = SystemTime::now();
-    Ok(read_dir(backup_folder)?
+    // files only, as the chunk folder of incremental backups is not a backup
+    Ok(read_dir_files(backup_folder)?
         .filter_map(|res| res.ok())
         .filter_map(|entry| entry.metadata().ok())
         .filter_map(|meta| {
@@ -87,7 +95,11 @@ fn backup_inner<P: AsRef<Path>>(
     limits: BackupLimits,
     tr: &I18n,
 ) -> Result<()> {
-    write_backup(col_data, backup_folder.as_ref(), tr)?;
+    if limits.incremental {
+        write_incremental_backup(col_data, backup_folder.as_ref())?;
+    } else {
+        write_backup(col_data, backup_folder.as_ref(), tr)?;
+    }
     thin_backups(backup_folder, limits)
 }
 
@@ -97,9 +109,19 @@ fn write_backup<S: AsRef<OsStr>>(col_data: &[u8], backup_folder: S, tr: &I18n) -
     export_colpkg_from_data(out_path, col_data, tr)
 }
 
+/// Like [write_backup], but only writes the parts of the collection that
+/// earlier incremental backups have not already stored.
+fn write_incremental_backup(col_data: &[u8], backup_folder: &Path) -> Result<()> {
+    let out_path = backup_folder.join(format!(
+        "{}",
+        Local::now().format(CHUNKED_BACKUP_FORMAT_STRING)
+    ));
+    write_chunked_backup(col_data, &out_path).map(|_| ())
+}
+
 fn thin_backups<P: AsRef<Path>>(backup_folder: P, limits: BackupLimits) -> Result<()> {
-    let backups =
-        read_dir(backup_folder)?.filter_map(|entry| entry.ok().and_then(Backup::from_entry));
+    let backups = read_dir_files(&backup_folder)?
+        .filter_map(|entry| entry.ok().and_then(Backup::from_entry));
     let obsolete_backups = BackupFilter::new(Local::now(), limits).obsolete_backups(backups);
     for backup in obsolete_backups {
         if let Err(error) = remove_file(&backup.path) {
@@ -107,11 +129,12 @@ fn thin_backups<P: AsRef<Path>>(backup_folder: P, limits: BackupLimits) -> Resul
         };
     }
 
-    Ok(())
+    remove_unused_chunks(backup_folder.as_ref())
 }
 
 fn datetime_from_file_name(file_name: &str) -> Option<DateTime<Local>> {
     NaiveDateTime::parse_from_str(file_name, BACKUP_FORMAT_STRING)
+        .or_else(|_| NaiveDateTime::parse_from_str(file_name, CHUNKED_BACKUP_FORMAT_STRING))
         .ok()
         .and_then(|datetime| Local.from_local_datetime(&datetime).latest())
 }
@@ -0,0 +1,281 @@
+// Copyright: Ankitects Pty Ltd and contributors
+// License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+//! Incremental backups.
+//!
+//! The collection file is split into content-defined chunks, which are stored
+//! once each in a folder shared by all backups, named by their hash. A backup
+//! is a small manifest listing the chunks of the file, so a backup made after
+//! a small edit only needs to write the few chunks that changed.
+
+use std::collections::HashSet;
+use std::io::Write;
+use std::path::Path;
+use std::sync::LazyLock;
+
+use anki_io::atomic_rename;
+use anki_io::create_dir_all;
+use anki_io::filename_is_safe;
+use anki_io::new_tempfile_in;
+use anki_io::open_file;
+use anki_io::read_dir_files;
+use anki_io::read_file;
+use anki_io::remove_file;
+use serde::Deserialize;
+use serde::Serialize;
+
+use crate::import_export::ImportError;
+use crate::prelude::*;
+
+pub(crate) const MANIFEST_EXTENSION: &str = "chunked";
+const CHUNK_FOLDER: &str = "chunks";
+
+const MIN_CHUNK: usize = 16 * 1024;
+const MAX_CHUNK: usize = 256 * 1024;
+/// Past the minimum size, a chunk ends where these bits of the rolling hash
+/// are all zero, which gives chunks of about 80 KiB on average. The high bits
+/// are used, as they depend on the most preceding bytes.
+const BOUNDARY_MASK: u64 = 0xffff << 48;
+
+/// Random values for each byte, for the rolling hash. Derived from a fixed
+/// seed, as changing them would move every chunk boundary.
+static GEAR: LazyLock<[u64; 256]> = LazyLock::new(|| {
+    let mut table = [0; 256];
+    let mut state = 0u64;
+    for entry in &mut table {
+        *entry = splitmix64(&mut state);
+    }
+    table
+});
+
+fn splitmix64(state: &mut u64) -> u64 {
+    *state = state.wrapping_add(0x9e3779b97f4a7c15);
+    let mut z = *state;
+    z = (z ^ (z >> 30)).wrapping_mul(0xbf58476d1ce4e5b9);
+    z = (z ^ (z >> 27)).wrapping_mul(0x94d049bb133111eb);
+    z ^ (z >> 31)
+}
+
+#[derive(Serialize, Deserialize)]
+struct Manifest {
+    size: u64,
+    chunks: Vec<String>,
+}
+
+impl Manifest {
+    fn load(path: &Path) -> Result<Self> {
+        Ok(serde_json::from_slice(&read_file(path)?)?)
+    }
+}
+
+/// Split data into content-defined chunks, so that an edit only changes the
+/// chunks around it, even if it shifts the data that follows.
+fn split_into_chunks(mut data: &[u8]) -> impl Iterator<Item = &[u8]> {
+    std::iter::from_fn(move || {
+        if data.is_empty() {
+            return None;
+        }
+        let (chunk, rest) = data.split_at(chunk_len(data));
+        data = rest;
+        Some(chunk)
+    })
+}
+
+fn chunk_len(data: &[u8]) -> usize {
+    let end = data.len().min(MAX_CHUNK);
+    let mut hash = 0u64;
+    for (idx, byte) in data[..end].iter().enumerate().skip(MIN_CHUNK) {
+        hash = (hash << 1).wrapping_add(GEAR[*byte as usize]);
+        if hash & BOUNDARY_MASK == 0 {
+            return idx + 1;
+        }
+    }
+    end
+}
+
+/// Write a backup of the collection data to `path`, adding any chunks that
+/// are not yet stored in its folder. Returns the number of bytes written.
+pub(super) fn write_chunked_backup(col_data: &[u8], path: &Path) -> Result<u64> {
+    let backup_folder = path.parent().unwrap_or(path);
+    let chunk_folder = backup_folder.join(CHUNK_FOLDER);
+    create_dir_all(&chunk_folder)?;
+
+    let mut written = 0;
+    let mut manifest = Manifest {
+        size: col_data.len() as u64,
+        chunks: vec![],
+    };
+    for chunk in split_into_chunks(col_data) {
+        let hash = blake3::hash(chunk).to_hex().to_string();
+        let chunk_path = chunk_folder.join(&hash);
+        if !chunk_path.exists() {
+            let compressed = zstd::encode_all(chunk, 0)?;
+            write_atomically(&chunk_folder, &chunk_path, &compressed)?;
+            written += compressed.len() as u64;
+        }
+        manifest.chunks.push(hash);
+    }
+
+    let manifest = serde_json::to_vec(&manifest)?;
+    write_atomically(backup_folder, path, &manifest)?;
+    Ok(written + manifest.len() as u64)
+}
+
+fn write_atomically(folder: &Path, path: &Path, data: &[u8]) -> Result<()> {
+    let mut file = new_tempfile_in(folder)?;
+    file.write_all(data)?;
+    atomic_rename(file, path, false)
+}
+
+/// Write the collection stored in the backup at `path` to `writer`.
+pub(crate) fn restore_chunked_backup(path: &Path, writer: &mut impl Write) -> Result<()> {
+    let manifest = Manifest::load(path)?;
+    let chunk_folder = path.parent().unwrap_or(path).join(CHUNK_FOLDER);
+    let corrupt = || AnkiError::ImportError {
+        source: ImportError::Corrupt,
+    };
+
+    let mut size = 0;
+    for hash in &manifest.chunks {
+        if !filename_is_safe(hash) {
+            return Err(corrupt());
+        }
+        let chunk = zstd::decode_all(open_file(chunk_folder.join(hash))?)?;
+        if blake3::hash(&chunk).to_hex().as_str() != hash {
+            return Err(corrupt());
+        }
+        writer.write_all(&chunk)?;
+        size += chunk.len() as u64;
+    }
+    if size != manifest.size {
+        return Err(corrupt());
+    }
+    Ok(())
+}
+
+/// Remove the chunks that no backup in the folder refers to anymore.
+pub(super) fn remove_unused_chunks(backup_folder: &Path) -> Result<()> {
+    let chunk_folder = backup_folder.join(CHUNK_FOLDER);
+    if !chunk_folder.exists() {
+        return Ok(());
+    }
+
+    let mut used = HashSet::new();
+    for entry in read_dir_files(backup_folder)? {
+        let path = entry?.path();
+        if path
+            .extension()
+            .is_some_and(|ext| ext == MANIFEST_EXTENSION)
+        {
+            used.extend(Manifest::load(&path)?.chunks);
+        }
+    }
+    for entry in read_dir_files(&chunk_folder)? {
+        let entry = entry?;
+        let in_use = entry
+            .file_name()
+            .to_str()
+            .is_some_and(|name| used.contains(name));
+        if !in_use {
+            remove_file(entry.path())?;
+        }
+    }
+
+    Ok(())
+}
+
+#[cfg(test)]
+mod test {
+    use anki_io::metadata;
+    use tempfile::tempdir;
+
+    use super::*;
+
+    /// Data that doesn't compress, so sizes reflect the chunks that were
+    /// stored.
+    fn random_data(len: usize) -> Vec<u8> {
+        let mut state = 1;
+        (0..len.div_ceil(8))
+            .flat_map(|_| splitmix64(&mut state).to_le_bytes())
+            .take(len)
+            .collect()
+    }
+
+    fn restore(path: &Path) -> Result<Vec<u8>> {
+        let mut restored = vec![];
+        restore_chunked_backup(path, &mut restored)?;
+        Ok(restored)
+    }
+
+    #[test]
+    fn chunk_boundaries() {
+        let data = random_data(8 * 1024 * 1024);
+        let chunks: Vec<_> = split_into_chunks(&data).collect();
+        assert_eq!(chunks.concat(), data);
+        assert!(chunks.iter().all(|chunk| chunk.len() <= MAX_CHUNK));
+        let average = data.len() / chunks.len();
+        assert!((32 * 1024..128 * 1024).contains(&average), "{average}");
+        assert_eq!(split_into_chunks(&[]).count(), 0);
+    }
+
+    #[test]
+    fn bytes_written_for_a_small_edit() -> Result<()> {
+        let dir = tempdir()?;
+        let folder = dir.path();
+        let mut data = random_data(64 * 1024 * 1024);
+        let first = write_chunked_backup(&data, &folder.join("first.chunked"))?;
+
+        // edit some bytes in place, as sqlite does when a page changes
+        data[20_000_000..20_000_100].fill(0);
+        let edited = write_chunked_backup(&data, &folder.join("edited.chunked"))?;
+        // and insert some, which shifts everything after it
+        let tail = data.split_off(40_000_000);
+        data.extend([1; 100]);
+        data.extend(tail);
+        let inserted = write_chunked_backup(&data, &folder.join("inserted.chunked"))?;
+
+        println!(
+            "bytes written for a {} MiB collection: {first} initially, \
+             {edited} after an edit, {inserted} after an insertion",
+            data.len() / 1024 / 1024
+        );
+        assert!(edited * 100 < first);
+        assert!(inserted * 100 < first);
+        // an unchanged collection only costs the manifest
+        let path = folder.join("unchanged.chunked");
+        assert_eq!(write_chunked_backup(&data, &path)?, metadata(&path)?.len());
+
+        assert_eq!(restore(&folder.join("inserted.chunked"))?, data);
+        Ok(())
+    }
+
+    #[test]
+    fn unused_chunks_are_removed() -> Result<()> {
+        let dir = tempdir()?;
+        let folder = dir.path();
+        let mut data = random_data(4 * 1024 * 1024);
+        let original = data.clone();
+        write_chunked_backup(&data, &folder.join("old.chunked"))?;
+        data[1_000_000..1_000_100].fill(0);
+        write_chunked_backup(&data, &folder.join("new.chunked"))?;
+        let chunk_count = || read_dir_files(folder.join(CHUNK_FOLDER)).unwrap().count();
+        let before = chunk_count();
+
+        // nothing is removed while both backups remain
+        remove_unused_chunks(folder)?;
+        assert_eq!(chunk_count(), before);
+        assert_eq!(restore(&folder.join("old.chunked"))?, original);
+
+        remove_file(folder.join("old.chunked"))?;
+        remove_unused_chunks(folder)?;
+        assert!(chunk_count() < before);
+        assert_eq!(restore(&folder.join("new.chunked"))?, data);
+
+        // a missing or damaged chunk is reported rather than restored
+        for entry in read_dir_files(folder.join(CHUNK_FOLDER))? {
+            std::fs::write(entry?.path(), zstd::encode_all(&b"damaged"[..], 0)?)?;
+        }
+        assert!(restore(&folder.join("new.chunked")).is_err());
+        Ok(())
+    }
+}
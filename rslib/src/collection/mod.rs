@@ -28,6 +28,7 @@ use crate::scheduler::queue::CardQueues;
 use crate::scheduler::SchedulerInfo;
 use crate::storage::SchemaVersion;
 use crate::storage::SqliteStorage;
+use crate::tags::index::TagIndex;
 use crate::timestamp::TimestampMillis;
 use crate::types::Usn;
 use crate::undo::UndoManager;
@@ -128,6 +129,7 @@ pub struct CollectionState {
     pub(crate) undo: UndoManager,
     pub(crate) notetype_cache: HashMap<NotetypeId, Arc<Notetype>>,
     pub(crate) deck_cache: HashMap<DeckId, Arc<Deck>>,
+    pub(crate) tag_index: Option<Arc<TagIndex>>,
     pub(crate) scheduler_info: Option<SchedulerInfo>,
     pub(crate) card_queues: Option<CardQueues>,
     pub(crate) active_browser_columns: Option<Arc<Vec<browser_table::Column>>>,
@@ -210,6 +212,7 @@ impl Collection {
     pub(crate) fn clear_caches(&mut self) {
         self.state.deck_cache.clear();
         self.state.notetype_cache.clear();
+        self.clear_tag_index();
     }
 
     pub fn tr(&self) -> &I18n {
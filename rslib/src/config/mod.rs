@@ -291,6 +291,7 @@ impl Collection {
                 weekly: 10,
                 monthly: 9,
                 minimum_interval_mins: 30,
+                incremental: false,
             },
         )
     }
@@ -243,6 +243,7 @@ impl Collection {
 
         let expanded_tags = self.storage.expanded_tags()?;
         self.storage.clear_all_tags()?;
+        self.clear_tag_index();
 
         let total_notes = self.storage.total_notes()?;
 
@@ -18,6 +18,8 @@ use zip::ZipArchive;
 use zstd::stream::copy_decode;
 
 use super::super::meta::MetaExt;
+use crate::collection::backup::restore_chunked_backup;
+use crate::collection::backup::CHUNKED_BACKUP_EXTENSION;
 use crate::collection::CollectionBuilder;
 use crate::import_export::package::media::extract_media_entries;
 use crate::import_export::package::media::SafeMediaEntry;
@@ -38,6 +40,18 @@ pub fn import_colpkg(
     let col_path = PathBuf::from(target_col_path);
     let mut tempfile = new_tempfile_in_parent_of(&col_path)?;
 
+    if Path::new(colpkg_path)
+        .extension()
+        .is_some_and(|ext| ext == CHUNKED_BACKUP_EXTENSION)
+    {
+        // incremental backups contain the collection only
+        restore_chunked_backup(Path::new(colpkg_path), &mut tempfile)?;
+        progress.set(ImportProgress::File)?;
+        check_collection_and_mod_schema(tempfile.path())?;
+        atomic_rename(tempfile, &col_path, true)?;
+        return Ok(());
+    }
+
     let backup_file = open_file(colpkg_path)?;
     let mut archive = ZipArchive::new(backup_file)?;
     let meta = Meta::from_archive(&mut archive)?;
@@ -1,6 +1,7 @@
 // Copyright: Ankitects Pty Ltd and contributors
 // License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 
+use std::collections::hash_map::Entry;
 use std::collections::HashMap;
 
 use anki_proto::scheduler::ComputeMemoryStateResponse;
@@ -10,6 +11,8 @@ use fsrs::FSRS;
 use fsrs::FSRS5_DEFAULT_DECAY;
 use fsrs::FSRS6_DEFAULT_DECAY;
 use itertools::Itertools;
+use rayon::iter::IntoParallelIterator;
+use rayon::iter::ParallelIterator;
 
 use super::params::ignore_revlogs_before_ms_from_config;
 use super::rescheduler::Rescheduler;
@@ -22,6 +25,7 @@ use crate::scheduler::fsrs::params::Params;
 use crate::scheduler::states::fuzz::with_review_fuzz;
 use crate::search::Negated;
 use crate::search::SearchNode;
+use crate::search::SortMode;
 use crate::search::StateKind;
 
 #[derive(Debug, Clone, Copy, Default)]
@@ -256,6 +260,106 @@ impl Collection {
             })
         }
     }
+
+    /// Like [Collection::compute_memory_state], for all cards matching the
+    /// search, in card id order. The revlog is read in one go, and the states
+    /// of each preset's cards are computed in parallel, a batch at a time, so
+    /// that progress can be reported and the operation aborted in between.
+    pub fn compute_memory_states(
+        &mut self,
+        search: impl TryIntoSearch,
+    ) -> Result<Vec<(CardId, ComputeMemoryStateResponse)>> {
+        let guard = self.search_cards_into_table(search, SortMode::NoOrder)?;
+        let cards = guard.col.storage.all_searched_cards()?;
+        let revlog = guard
+            .col
+            .storage
+            .get_revlog_entries_for_searched_cards_in_card_order()?;
+        drop(guard);
+        let mut revlogs = revlog.into_iter().into_group_map_by(|entry| entry.cid);
+        let total_cards = cards.len() as u32;
+
+        let mut presets: HashMap<DeckConfigId, PresetCards> = HashMap::new();
+        for card in cards {
+            let deck_id = card.original_or_current_deck_id();
+            let deck = self.get_deck(deck_id)?.or_not_found(deck_id)?;
+            let conf_id = DeckConfigId(deck.normal()?.config_id);
+            let preset = match presets.entry(conf_id) {
+                Entry::Occupied(entry) => entry.into_mut(),
+                Entry::Vacant(entry) => entry.insert(PresetCards {
+                    config: self
+                        .storage
+                        .get_deck_config(conf_id)?
+                        .or_not_found(conf_id)?,
+                    cards: vec![],
+                }),
+            };
+            let desired_retention = deck.effective_desired_retention(&preset.config);
+            let revlog = revlogs.remove(&card.id).unwrap_or_default();
+            preset.cards.push((card, revlog, desired_retention));
+        }
+
+        let next_day_at = self.timing_today()?.next_day_at;
+        let mut progress = self.new_progress_handler::<ComputeMemoryProgress>();
+        progress.update(false, |s| s.total_cards = total_cards)?;
+        let mut states = Vec::with_capacity(total_cards as usize);
+        for PresetCards { config, cards } in presets.into_values() {
+            let params = config.fsrs_params();
+            let decay = get_decay_from_params(params);
+            let historical_retention = config.inner.historical_retention;
+            let ignore_before = ignore_revlogs_before_ms_from_config(&config)?;
+            // report invalid params before any threads are started
+            FSRS::new(Some(params))?;
+            for batch in &cards.into_iter().chunks(MEMORY_STATE_BATCH_SIZE) {
+                let batch: Vec<_> = batch
+                    .collect_vec()
+                    .into_par_iter()
+                    // each thread uses its own model
+                    .map_init(
+                        || FSRS::new(Some(params)).ok(),
+                        |fsrs, (mut card, revlog, desired_retention)| {
+                            let fsrs = fsrs.as_ref().ok_or(AnkiError::FsrsParamsInvalid)?;
+                            let item = fsrs_item_for_memory_state(
+                                fsrs,
+                                revlog,
+                                next_day_at,
+                                historical_retention,
+                                ignore_before,
+                            )?;
+                            let state = if item.is_some() {
+                                card.set_memory_state(fsrs, item, historical_retention)?;
+                                card.memory_state.map(Into::into)
+                            } else {
+                                None
+                            };
+                            Ok((
+                                card.id,
+                                ComputeMemoryStateResponse {
+                                    state,
+                                    desired_retention,
+                                    decay,
+                                },
+                            ))
+                        },
+                    )
+                    .collect::<Result<_>>()?;
+                states.extend(batch);
+                progress.update(true, |s| s.current_cards = states.len() as u32)?;
+            }
+        }
+        states.sort_unstable_by_key(|(card_id, _)| *card_id);
+        Ok(states)
+    }
+}
+
+/// The number of cards whose memory states are computed in parallel, between
+/// progress updates.
+const MEMORY_STATE_BATCH_SIZE: usize = 1000;
+
+/// Cards that share a preset, with their revlogs and desired retention.
+struct PresetCards {
+    config: DeckConfig,
+    cards: Vec<(Card, Vec<RevlogEntry>, f32)>,
 }
 
 impl Card {
@@ -432,6 +536,8 @@ mod tests {
     use crate::revlog::RevlogReviewKind;
     use crate::scheduler::fsrs::params::tests::convert;
     use crate::scheduler::fsrs::params::tests::revlog;
+    use crate::tests::DeckAdder;
+    use crate::tests::NoteAdder;
 
     /// Floating point precision can vary between platforms, and each FSRS
     /// update tends to result in small changes to these numbers, so we
@@ -533,4 +639,47 @@ mod tests {
         );
         Ok(())
     }
+
+    #[test]
+    fn batched_states_match_single_card_states() -> Result<()> {
+        let mut col = Collection::new();
+        let deck = DeckAdder::new("other")
+            .with_config(|config| config.inner.desired_retention = 0.8)
+            .add(&mut col);
+        let decks = [DeckId(1), deck.id];
+        for idx in 0..6 {
+            let note = NoteAdder::basic(&mut col)
+                .deck(decks[idx % 2])
+                .add(&mut col);
+            let card_id = col.storage.card_ids_of_notes(&[note.id])?[0];
+            // the first card in each deck is left without reviews
+            for review in 0..idx / 2 {
+                let kind = if review == 0 {
+                    RevlogReviewKind::Learning
+                } else {
+                    RevlogReviewKind::Review
+                };
+                let entry = RevlogEntry {
+                    cid: card_id,
+                    ..revlog(kind, (30 - idx - review * 10) as i64)
+                };
+                col.storage.add_revlog_entry(&entry, false)?;
+            }
+        }
+        let mut card_ids = col.search_cards("", SortMode::NoOrder)?;
+        card_ids.sort_unstable();
+
+        let states = col.compute_memory_states(SearchNode::from_card_ids(card_ids.clone()))?;
+        assert_eq!(states.iter().map(|(id, _)| *id).collect_vec(), card_ids);
+        assert_eq!(states.iter().filter(|(_, s)| s.state.is_some()).count(), 4);
+        for (card_id, state) in states {
+            assert_eq!(state, col.compute_memory_state(card_id)?);
+        }
+        // searches can be used too, and the deck's preset is followed
+        let in_deck = col.compute_memory_states("deck:other")?;
+        assert_eq!(in_deck.len(), 3);
+        assert!(in_deck.iter().all(|(_, s)| s.desired_retention == 0.8));
+
+        Ok(())
+    }
 }
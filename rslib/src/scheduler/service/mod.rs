@@ -7,6 +7,8 @@ mod states;
 use anki_proto::cards;
 use anki_proto::generic;
 use anki_proto::scheduler;
+use anki_proto::scheduler::compute_memory_states_request::Cards;
+use anki_proto::scheduler::compute_memory_states_response::CardMemoryState;
 use anki_proto::scheduler::ComputeFsrsParamsResponse;
 use anki_proto::scheduler::ComputeMemoryStateResponse;
 use anki_proto::scheduler::ComputeOptimalRetentionResponse;
@@ -28,6 +30,7 @@ use crate::scheduler::fsrs::params::ComputeParamsRequest;
 use crate::scheduler::new::NewCardDueOrder;
 use crate::scheduler::states::CardState;
 use crate::scheduler::states::SchedulingStates;
+use crate::search::SearchNode;
 use crate::search::SortMode;
 use crate::stats::studied_today;
 
@@ -377,6 +380,25 @@ impl crate::services::SchedulerService for Collection {
         self.compute_memory_state(input.into())
     }
 
+    fn compute_memory_states(
+        &mut self,
+        input: scheduler::ComputeMemoryStatesRequest,
+    ) -> Result<scheduler::ComputeMemoryStatesResponse> {
+        let search = match input.cards.or_invalid("missing cards")? {
+            Cards::Search(search) => search.as_str().try_into_search()?,
+            Cards::CardIds(ids) => SearchNode::from_card_ids(ids.cids).into(),
+        };
+        let cards = self
+            .compute_memory_states(search)?
+            .into_iter()
+            .map(|(card_id, state)| CardMemoryState {
+                card_id: card_id.0,
+                state: Some(state),
+            })
+            .collect();
+        Ok(scheduler::ComputeMemoryStatesResponse { cards })
+    }
+
     fn fuzz_delta(&mut self, input: FuzzDeltaRequest) -> Result<FuzzDeltaResponse> {
         Ok(FuzzDeltaResponse {
             delta_days: self.get_fuzz_delta(input.card_id.into(), input.interval)?,
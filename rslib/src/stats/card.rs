@@ -3,6 +3,7 @@
 
 use fsrs::FSRS;
 use fsrs::FSRS5_DEFAULT_DECAY;
+use itertools::Itertools;
 
 use crate::card::CardType;
 use crate::card::FsrsMemoryState;
@@ -11,10 +12,49 @@ use crate::revlog::RevlogEntry;
 use crate::scheduler::fsrs::memory_state::fsrs_item_for_memory_state;
 use crate::scheduler::fsrs::params::ignore_revlogs_before_ms_from_config;
 use crate::scheduler::timing::is_unix_epoch_timestamp;
+use crate::search::SearchNode;
+use crate::search::SortMode;
 
 impl Collection {
     pub fn card_stats(&mut self, cid: CardId) -> Result<anki_proto::stats::CardStatsResponse> {
         let card = self.storage.get_card(cid)?.or_not_found(cid)?;
+        let revlog = self.storage.get_revlog_entries_for_card(card.id)?;
+        self.card_stats_inner(card, revlog)
+    }
+
+    /// Like [Collection::card_stats], for several cards at once, with the
+    /// revlog of all of them read in one query. Cards that no longer exist
+    /// are skipped.
+    pub fn card_stats_for_cards(
+        &mut self,
+        cids: &[CardId],
+    ) -> Result<Vec<anki_proto::stats::CardStatsResponse>> {
+        if cids.is_empty() {
+            return Ok(vec![]);
+        }
+        let search = SearchNode::from_card_ids(cids.iter().copied());
+        let mut revlogs = self
+            .search_cards_into_table(search, SortMode::NoOrder)?
+            .col
+            .storage
+            .get_revlog_entries_for_searched_cards_in_card_order()?
+            .into_iter()
+            .into_group_map_by(|entry| entry.cid);
+        let mut stats = Vec::with_capacity(cids.len());
+        for &cid in cids.iter().unique() {
+            if let Some(card) = self.storage.get_card(cid)? {
+                let revlog = revlogs.remove(&cid).unwrap_or_default();
+                stats.push(self.card_stats_inner(card, revlog)?);
+            }
+        }
+        Ok(stats)
+    }
+
+    fn card_stats_inner(
+        &mut self,
+        card: Card,
+        revlog: Vec<RevlogEntry>,
+    ) -> Result<anki_proto::stats::CardStatsResponse> {
         let note = self
             .storage
             .get_note(card.note_id)?
@@ -26,7 +66,6 @@ impl Collection {
             .storage
             .get_deck(card.deck_id)?
             .or_not_found(card.deck_id)?;
-        let revlog = self.storage.get_revlog_entries_for_card(card.id)?;
 
         let (average_secs, total_secs) = average_and_total_secs_strings(&revlog);
         let timing = self.timing_today()?;
@@ -234,7 +273,6 @@ fn stats_revlog_entry(
 #[cfg(test)]
 mod test {
     use super::*;
-    use crate::search::SortMode;
 
     #[test]
     fn stats() -> Result<()> {
@@ -250,4 +288,28 @@ mod test {
 
         Ok(())
     }
+
+    #[test]
+    fn stats_for_several_cards() -> Result<()> {
+        let mut col = Collection::new();
+        let nt = col.get_notetype_by_name("Basic")?.unwrap();
+        for _ in 0..3 {
+            let mut note = nt.new_note();
+            col.add_note(&mut note, DeckId(1))?;
+        }
+        col.answer_good();
+
+        let mut cids = col.search_cards("", SortMode::NoOrder)?;
+        // missing and repeated cards are skipped
+        cids.extend([CardId(1), cids[0]]);
+        let stats = col.card_stats_for_cards(&cids)?;
+        assert_eq!(stats.len(), 3);
+        assert_eq!(stats.iter().map(|s| s.revlog.len()).sum::<usize>(), 1);
+        for card_stats in stats {
+            assert_eq!(card_stats, col.card_stats(card_stats.card_id.into())?);
+        }
+        assert!(col.card_stats_for_cards(&[])?.is_empty());
+
+        Ok(())
+    }
 }
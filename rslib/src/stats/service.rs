@@ -1,5 +1,6 @@
 // Copyright: Ankitects Pty Ltd and contributors
 // License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+use crate::card::CardId;
 use crate::collection::Collection;
 use crate::error;
 use crate::revlog::RevlogReviewKind;
@@ -12,6 +13,16 @@ impl crate::services::StatsService for Collection {
         self.card_stats(input.cid.into())
     }
 
+    fn card_stats_batch(
+        &mut self,
+        input: anki_proto::cards::CardIds,
+    ) -> error::Result<anki_proto::stats::CardStatsBatchResponse> {
+        let cids: Vec<CardId> = input.cids.into_iter().map(Into::into).collect();
+        Ok(anki_proto::stats::CardStatsBatchResponse {
+            cards: self.card_stats_for_cards(&cids)?,
+        })
+    }
+
     fn get_review_logs(
         &mut self,
         input: anki_proto::cards::CardId,
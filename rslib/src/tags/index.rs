@@ -0,0 +1,329 @@
+// Copyright: Ankitects Pty Ltd and contributors
+// License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+//! Parts of the tag tree.
+//!
+//! With many tags, building the entire tree and sending it to the frontend
+//! each time the tags are listed is slow. Instead, the tag names are kept in
+//! memory in tree order, where each tag is directly followed by its
+//! descendants, so the children of any tag can be found with a few binary
+//! searches, and only the children being displayed are returned.
+
+use std::ops::Range;
+use std::sync::Arc;
+
+use anki_proto::tags::tag_tree_children_response::Child;
+use anki_proto::tags::TagTreeChildrenResponse;
+use unicase::UniCase;
+
+use super::tree::tags_in_tree_order;
+use super::Tag;
+use crate::prelude::*;
+
+/// Separates the components of the names in the index.
+const SEPARATOR: char = '\x1f';
+
+/// The names of all tags and their missing parents, in tree order, with "::"
+/// replaced by the separator.
+#[derive(Debug)]
+pub(crate) struct TagIndex {
+    names: Vec<String>,
+}
+
+impl TagIndex {
+    fn new(tags: Vec<Tag>) -> Self {
+        TagIndex {
+            names: tags_in_tree_order(tags)
+                .into_iter()
+                .map(|tag| tag.name)
+                .collect(),
+        }
+    }
+
+    /// The names in tree order that start with `prefix`, ignoring case.
+    fn with_prefix(&self, prefix: &str) -> Range<usize> {
+        let start = self
+            .names
+            .partition_point(|name| UniCase::new(name.as_str()) < UniCase::new(prefix));
+        let rest = &self.names[start..];
+        start..start + rest.partition_point(|name| has_prefix(name, prefix))
+    }
+
+    /// The descendants of the named tag, or all tags if the name is empty.
+    fn descendants(&self, name: &str) -> Range<usize> {
+        if name.is_empty() {
+            0..self.names.len()
+        } else {
+            self.with_prefix(&format!("{name}{SEPARATOR}"))
+        }
+    }
+
+    /// The children among the descendants of a tag. A tag's own descendants
+    /// are skipped over, so this is proportional to the number of children.
+    fn children(&self, descendants: Range<usize>) -> impl Iterator<Item = usize> + '_ {
+        let mut idx = descendants.start;
+        std::iter::from_fn(move || {
+            if idx >= descendants.end {
+                return None;
+            }
+            let child = idx;
+            idx = self.descendants(&self.names[child]).end.max(child + 1);
+            Some(child)
+        })
+    }
+
+    fn child_count(&self, idx: usize) -> usize {
+        self.children(self.descendants(&self.names[idx])).count()
+    }
+
+    /// Up to `limit` names that start with `text`, or contain it if
+    /// `substring` is set, ignoring case.
+    fn search(&self, text: &str, substring: bool, limit: usize) -> Vec<String> {
+        let text = text.replace("::", &SEPARATOR.to_string());
+        let matches: Box<dyn Iterator<Item = &String>> = if substring {
+            let text = text.to_lowercase();
+            Box::new(
+                self.names
+                    .iter()
+                    .filter(move |name| name.to_lowercase().contains(&text)),
+            )
+        } else {
+            Box::new(self.names[self.with_prefix(&text)].iter())
+        };
+        matches.take(limit).map(|name| display_name(name)).collect()
+    }
+}
+
+fn has_prefix(name: &str, prefix: &str) -> bool {
+    name.get(..prefix.len())
+        .is_some_and(|head| UniCase::new(head) == UniCase::new(prefix))
+}
+
+fn display_name(name: &str) -> String {
+    name.replace(SEPARATOR, "::")
+}
+
+fn limit_or_all(limit: u32) -> usize {
+    if limit == 0 {
+        usize::MAX
+    } else {
+        limit as usize
+    }
+}
+
+impl Collection {
+    /// The tags directly below `parent`, or the top-level tags if it is
+    /// empty, skipping `offset` of them and returning up to `limit`.
+    pub fn tag_tree_children(
+        &mut self,
+        parent: &str,
+        offset: u32,
+        limit: u32,
+    ) -> Result<TagTreeChildrenResponse> {
+        let index = self.tag_index()?;
+        let parent = parent.replace("::", &SEPARATOR.to_string());
+        let children: Vec<_> = index.children(index.descendants(&parent)).collect();
+        let page = children
+            .iter()
+            .skip(offset as usize)
+            .take(limit_or_all(limit))
+            .map(|&idx| {
+                let full_name = display_name(&index.names[idx]);
+                // missing parents start out collapsed, as in the full tree
+                let collapsed = !self
+                    .storage
+                    .get_tag(&full_name)?
+                    .is_some_and(|tag| tag.expanded);
+                Ok(Child {
+                    name: index.names[idx]
+                        .rsplit(SEPARATOR)
+                        .next()
+                        .unwrap_or_default()
+                        .into(),
+                    full_name,
+                    child_count: index.child_count(idx) as u32,
+                    collapsed,
+                })
+            })
+            .collect::<Result<_>>()?;
+        Ok(TagTreeChildrenResponse {
+            children: page,
+            total: children.len() as u32,
+        })
+    }
+
+    /// Up to `limit` tags that start with `text`, or contain it if
+    /// `substring` is set, ignoring case. Parents that have not been
+    /// registered are included, as they are in the tag tree.
+    pub fn search_tags(&mut self, text: &str, substring: bool, limit: u32) -> Result<Vec<String>> {
+        let index = self.tag_index()?;
+        Ok(index.search(text, substring, limit_or_all(limit)))
+    }
+
+    fn tag_index(&mut self) -> Result<Arc<TagIndex>> {
+        if let Some(index) = &self.state.tag_index {
+            return Ok(index.clone());
+        }
+        let index = Arc::new(TagIndex::new(self.storage.all_tags()?));
+        self.state.tag_index = Some(index.clone());
+        Ok(index)
+    }
+
+    /// Must be called when tags are added or removed. Changes to whether
+    /// tags are collapsed don't affect the index.
+    pub(crate) fn clear_tag_index(&mut self) {
+        self.state.tag_index = None;
+    }
+}
+
+#[cfg(test)]
+mod test {
+    use std::time::Instant;
+
+    use anki_proto::tags::TagTreeNode;
+    use prost::Message;
+
+    use super::*;
+
+    fn add_note_with_tags(col: &mut Collection, tags: &str) -> Result<()> {
+        let nt = col.get_notetype_by_name("Basic")?.unwrap();
+        let mut note = nt.new_note();
+        note.tags = tags.split(' ').map(Into::into).collect();
+        col.add_note(&mut note, DeckId(1))?;
+        Ok(())
+    }
+
+    fn children(col: &mut Collection, parent: &str) -> Vec<(String, u32, bool)> {
+        col.tag_tree_children(parent, 0, 0)
+            .unwrap()
+            .children
+            .into_iter()
+            .map(|child| (child.full_name, child.child_count, child.collapsed))
+            .collect()
+    }
+
+    fn owned(items: &[(&str, u32, bool)]) -> Vec<(String, u32, bool)> {
+        items
+            .iter()
+            .map(|(name, count, collapsed)| (name.to_string(), *count, *collapsed))
+            .collect()
+    }
+
+    #[test]
+    fn children_of_a_tag() -> Result<()> {
+        let mut col = Collection::new();
+        add_note_with_tags(&mut col, "one one1 one::two::three one::four z")?;
+        col.set_tag_collapsed("one", false)?;
+
+        assert_eq!(
+            children(&mut col, ""),
+            owned(&[("one", 2, false), ("one1", 0, true), ("z", 0, true)])
+        );
+        // the missing parent one::two is included, and matches are case
+        // insensitive
+        assert_eq!(
+            children(&mut col, "ONE"),
+            owned(&[("one::four", 0, true), ("one::two", 1, true)])
+        );
+        assert_eq!(
+            children(&mut col, "one::two"),
+            owned(&[("one::two::three", 0, true)])
+        );
+        assert!(children(&mut col, "one::three").is_empty());
+
+        // paging
+        let page = col.tag_tree_children("", 1, 1)?;
+        assert_eq!(page.total, 3);
+        assert_eq!(page.children.len(), 1);
+        assert_eq!(page.children[0].name, "one1");
+
+        // added tags and changed collapsed states are seen
+        add_note_with_tags(&mut col, "one::five")?;
+        col.set_tag_collapsed("one::four", false)?;
+        assert_eq!(
+            children(&mut col, "one"),
+            owned(&[
+                ("one::five", 0, true),
+                ("one::four", 0, false),
+                ("one::two", 1, true),
+            ])
+        );
+        // as is undoing
+        col.undo()?;
+        assert_eq!(children(&mut col, "one").len(), 2);
+
+        Ok(())
+    }
+
+    #[test]
+    fn searching() -> Result<()> {
+        let mut col = Collection::new();
+        add_note_with_tags(&mut col, "abc::def abc::xyz xabc ab1")?;
+
+        assert_eq!(
+            col.search_tags("AB", false, 0)?,
+            vec!["ab1", "abc", "abc::def", "abc::xyz"]
+        );
+        assert_eq!(
+            col.search_tags("abc::", false, 0)?,
+            vec!["abc::def", "abc::xyz"]
+        );
+        assert_eq!(col.search_tags("ab", false, 2)?, vec!["ab1", "abc"]);
+        assert_eq!(
+            col.search_tags("bc", true, 0)?,
+            vec!["abc", "abc::def", "abc::xyz", "xabc"]
+        );
+        assert_eq!(col.search_tags("c::d", true, 0)?, vec!["abc::def"]);
+        assert_eq!(col.search_tags("q", true, 0)?, Vec::<String>::new());
+
+        Ok(())
+    }
+
+    /// Compares listing the top level of a large, deep hierarchy with
+    /// building the whole tree.
+    #[test]
+    fn deep_hierarchy() -> Result<()> {
+        let mut col = Collection::new();
+        // 150k tags, three levels deep
+        let tags: Vec<String> = (0..10)
+            .flat_map(|a| {
+                (0..15).flat_map(move |b| {
+                    (0..1000).map(move |c| format!("subject{a}::chapter{b}::card{c}"))
+                })
+            })
+            .collect();
+        for tag in &tags {
+            col.storage.register_tag(&Tag::new(tag.clone(), Usn(0)))?;
+        }
+        col.clear_tag_index();
+
+        let start = Instant::now();
+        let tree: TagTreeNode = col.tag_tree()?;
+        let full = (start.elapsed(), tree.encoded_len());
+
+        let start = Instant::now();
+        let top = col.tag_tree_children("", 0, 0)?;
+        let first = (start.elapsed(), top.encoded_len());
+        let start = Instant::now();
+        let leaves = col.tag_tree_children("subject3::chapter7", 0, 100)?;
+        let cached = (start.elapsed(), leaves.encoded_len());
+
+        println!(
+            "{} tags: whole tree {:?}, {} bytes; top level {:?}, {} bytes; \
+             100 leaves with the index built {:?}, {} bytes",
+            tags.len(),
+            full.0,
+            full.1,
+            first.0,
+            first.1,
+            cached.0,
+            cached.1
+        );
+        assert_eq!(top.total, 10);
+        assert_eq!(top.children[0].child_count, 15);
+        assert_eq!(leaves.total, 1000);
+        assert!(first.1 * 1000 < full.1);
+
+        Ok(())
+    }
+}
@@ -4,6 +4,7 @@
 mod bulkadd;
 mod complete;
 mod findreplace;
+pub(crate) mod index;
 mod matcher;
 mod notes;
 mod register;
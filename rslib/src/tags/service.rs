@@ -104,4 +104,20 @@ impl crate::services::TagsService for Collection {
         let tags = Collection::complete_tag(self, &input.input, input.match_limit as usize)?;
         Ok(anki_proto::tags::CompleteTagResponse { tags })
     }
+
+    fn tag_tree_children(
+        &mut self,
+        input: anki_proto::tags::TagTreeChildrenRequest,
+    ) -> error::Result<anki_proto::tags::TagTreeChildrenResponse> {
+        self.tag_tree_children(&input.parent, input.offset, input.limit)
+    }
+
+    fn search_tags(
+        &mut self,
+        input: anki_proto::tags::SearchTagsRequest,
+    ) -> error::Result<generic::StringList> {
+        Ok(generic::StringList {
+            vals: self.search_tags(&input.text, input.substring, input.limit)?,
+        })
+    }
 }
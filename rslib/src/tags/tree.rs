@@ -57,12 +57,20 @@ fn add_missing_parents(tags: &mut Vec<Tag>) {
     tags.append(&mut missing);
 }
 
-fn tags_to_tree(mut tags: Vec<Tag>) -> TagTreeNode {
+/// Add any missing parents, and sort the tags so that each is directly
+/// followed by its descendants. "::" is replaced with \x1f, so that "a::b"
+/// sorts before "a1".
+pub(super) fn tags_in_tree_order(mut tags: Vec<Tag>) -> Vec<Tag> {
     add_missing_parents(&mut tags);
     for tag in &mut tags {
         tag.name = tag.name.replace("::", "\x1f");
     }
     tags.sort_unstable_by(|a, b| UniCase::new(&a.name).cmp(&UniCase::new(&b.name)));
+    tags
+}
+
+fn tags_to_tree(tags: Vec<Tag>) -> TagTreeNode {
+    let tags = tags_in_tree_order(tags);
     let mut top = TagTreeNode::default();
     let mut it = tags.into_iter().peekable();
     add_child_nodes(&mut it, &mut top);
@@ -36,6 +36,7 @@ impl Collection {
     /// Caller is responsible for setting usn.
     pub(super) fn register_tag_undoable(&mut self, tag: &Tag) -> Result<()> {
         self.save_undo(UndoableTagChange::Added(Box::new(tag.clone())));
+        self.clear_tag_index();
         self.storage.register_tag(tag)
     }
 
@@ -44,6 +45,7 @@ impl Collection {
     /// incrementally syncable.
     pub(super) fn remove_single_tag_undoable(&mut self, tag: Tag) -> Result<()> {
         self.storage.remove_single_tag(&tag.name)?;
+        self.clear_tag_index();
         self.save_undo(UndoableTagChange::Removed(Box::new(tag)));
         Ok(())
     }
@@ -237,6 +237,7 @@ impl Collection {
 
     pub(crate) fn update_state_after_dbproxy_modification(&mut self) {
         self.discard_undo_and_study_queues();
+        self.clear_tag_index();
         self.state.modified_by_dbproxy = true;
     }
 
@@ -0,0 +1,79 @@
+// Copyright: Ankitects Pty Ltd and contributors
+// License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import { expect, test } from "vitest";
+
+import { fieldDelta, fieldSaveCommand } from "./field-delta";
+
+function apply(base: string, content: string): string {
+    const { start, deleted, inserted } = fieldDelta(base, content);
+    return base.slice(0, start) + inserted + base.slice(start + deleted);
+}
+
+test("deltas cover the changed region", () => {
+    expect(fieldDelta("abc", "abc")).toEqual({ start: 3, deleted: 0, inserted: "" });
+    expect(fieldDelta("abc", "abxc")).toEqual({ start: 2, deleted: 0, inserted: "x" });
+    expect(fieldDelta("abc", "ac")).toEqual({ start: 1, deleted: 1, inserted: "" });
+    expect(fieldDelta("aaa", "aaaa")).toEqual({ start: 3, deleted: 0, inserted: "a" });
+    expect(fieldDelta("", "<b>x</b>")).toEqual({ start: 0, deleted: 0, inserted: "<b>x</b>" });
+    expect(fieldDelta("one two", "one <b>two</b>")).toEqual({
+        start: 4,
+        deleted: 3,
+        inserted: "<b>two</b>",
+    });
+    for (
+        const [base, content] of [
+            ["abc", "xyz"],
+            ["abcabc", "abc"],
+            ["abc", "abcabc"],
+            ["<div>x</div>", "<div>x</div><div>y</div>"],
+        ]
+    ) {
+        expect(apply(base, content)).toBe(content);
+    }
+});
+
+test("deltas do not split surrogate pairs", () => {
+    // both emoji share the same high surrogate
+    const { start, inserted } = fieldDelta("a😀b", "a😁b");
+    expect(start).toBe(1);
+    expect(inserted).toBe("😁");
+    expect(fieldDelta("😀x", "😁x")).toEqual({ start: 0, deleted: 2, inserted: "😁" });
+    expect(fieldDelta("x😀", "x🈀")).toEqual({
+        start: 1,
+        deleted: 2,
+        inserted: "🈀",
+    });
+});
+
+test("bytes per save while typing into a large field", () => {
+    const encoder = new TextEncoder();
+    const existing = "<div>Lorem ipsum dolor sit amet.</div>".repeat(500);
+    const typed = "The quick brown fox jumps over the lazy dog, again and again!! ".repeat(2)
+        .slice(0, 100);
+
+    // a save roughly every five characters, as the debounce fires between bursts
+    let full = 0;
+    let delta = 0;
+    let saves = 0;
+    let base = existing;
+    for (let i = 5; i <= typed.length; i += 5) {
+        const content = existing.slice(0, 1000) + typed.slice(0, i) + existing.slice(1000);
+        full += encoder.encode(fieldSaveCommand("key", 0, 1, undefined, content)).length;
+        delta += encoder.encode(fieldSaveCommand("key", 0, 1, base, content)).length;
+        base = content;
+        saves++;
+    }
+
+    console.log(
+        `${saves} saves for 100 typed characters: `
+            + `${Math.round(full / saves)} bytes per full save, `
+            + `${Math.round(delta / saves)} bytes per delta save`,
+    );
+    expect(delta * 100).toBeLessThan(full);
+});
+
+test("the first save after a load sends the whole field", () => {
+    expect(fieldSaveCommand("blur", 2, 5, undefined, "a:b")).toBe("blur:2:5:a:b");
+    expect(fieldSaveCommand("key", 2, 5, "a:b", "a:bc")).toBe("keyDelta:2:5:3:3:0:c");
+});
@@ -0,0 +1,73 @@
+// Copyright: Ankitects Pty Ltd and contributors
+// License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+/**
+ * A single splice that turns one version of a field into the next. Offsets
+ * are in UTF-16 code units, and never split a surrogate pair.
+ */
+export interface FieldDelta {
+    start: number;
+    deleted: number;
+    inserted: string;
+}
+
+function isHighSurrogate(code: number): boolean {
+    return code >= 0xd800 && code <= 0xdbff;
+}
+
+function isLowSurrogate(code: number): boolean {
+    return code >= 0xdc00 && code <= 0xdfff;
+}
+
+/**
+ * Typing, pasting and formatting all change one contiguous region of a field,
+ * so the common prefix and suffix are enough to describe an edit.
+ */
+export function fieldDelta(base: string, content: string): FieldDelta {
+    const shortest = Math.min(base.length, content.length);
+
+    let prefix = 0;
+    while (prefix < shortest && base.charCodeAt(prefix) === content.charCodeAt(prefix)) {
+        prefix++;
+    }
+    if (prefix > 0 && isHighSurrogate(base.charCodeAt(prefix - 1))) {
+        prefix--;
+    }
+
+    let suffix = 0;
+    while (
+        suffix < shortest - prefix
+        && base.charCodeAt(base.length - 1 - suffix)
+            === content.charCodeAt(content.length - 1 - suffix)
+    ) {
+        suffix++;
+    }
+    if (suffix > 0 && isLowSurrogate(base.charCodeAt(base.length - suffix))) {
+        suffix--;
+    }
+
+    return {
+        start: prefix,
+        deleted: base.length - prefix - suffix,
+        inserted: content.slice(prefix, content.length - suffix),
+    };
+}
+
+/**
+ * The bridge command that saves a field. Without a base, the whole field is
+ * sent; otherwise only the delta against the base, which the other side
+ * checks by length before applying.
+ */
+export function fieldSaveCommand(
+    type: "key" | "blur",
+    index: number,
+    noteId: number | null,
+    base: string | undefined,
+    content: string,
+): string {
+    if (base === undefined) {
+        return `${type}:${index}:${noteId}:${content}`;
+    }
+    const { start, deleted, inserted } = fieldDelta(base, content);
+    return `${type}Delta:${index}:${noteId}:${base.length}:${start}:${deleted}:${inserted}`;
+}
@@ -33,8 +33,41 @@ function createImage(src: string): HTMLImageElement {
     return img;
 }
 
-export function preloadAnswerImages(html: string): void {
+/** A plain media filename, which the media server can downscale. */
+const scalableImagePattern = /^[^:/?#]+\.(jpe?g|png|webp)$/i;
+
+/**
+ * The larger side of the viewport in device pixels, rounded up so that
+ * resizing the window doesn't request new copies of every image.
+ */
+function maxImagePixels(): number {
+    const pixels = Math.max(window.innerWidth, window.innerHeight) * window.devicePixelRatio;
+    return Math.ceil(pixels / 512) * 512;
+}
+
+/**
+ * Ask the media server for images no larger than the viewport, so that large
+ * photos don't have to be decoded at full resolution.
+ */
+export function requestScaledImages(html: string): string {
+    if (!html.includes("<img")) {
+        return html;
+    }
     template.innerHTML = html;
+    const maxPixels = maxImagePixels();
+    let changed = false;
+    for (const img of template.content.querySelectorAll<HTMLImageElement>("img[src]")) {
+        const src = img.getAttribute("src")!;
+        if (scalableImagePattern.test(src) && !img.hasAttribute("srcset")) {
+            img.setAttribute("src", `${src}?anki-max-px=${maxPixels}`);
+            changed = true;
+        }
+    }
+    return changed ? template.innerHTML : html;
+}
+
+export function preloadAnswerImages(html: string): void {
+    template.innerHTML = requestScaledImages(html);
     extractImageSrcs(template.content).forEach(createImage);
 }
 
@@ -19,7 +19,7 @@ globalThis.anki.setupImageCloze = imageOcclusionAPI.setup; // deprecated
 import { bridgeCommand } from "@tslib/bridgecommand";
 import { registerPackage } from "@tslib/runtime-require";
 
-import { allImagesLoaded, preloadAnswerImages } from "./images";
+import { allImagesLoaded, preloadAnswerImages, requestScaledImages } from "./images";
 import { preloadResources } from "./preload";
 
 // Enhanced modern features
@@ -141,6 +141,7 @@ export async function _updateQA(
 
     const qa = document.getElementById("qa")!;
 
+    html = requestScaledImages(html);
     await preloadResources(html);
 
     qa.style.opacity = "0";
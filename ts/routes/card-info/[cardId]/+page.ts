@@ -1,7 +1,6 @@
 // Copyright: Ankitects Pty Ltd and contributors
 // License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
-import { cardStats } from "@generated/backend";
-
+import { getCardStats } from "../prefetch";
 import type { PageLoad } from "./$types";
 
 function optionalBigInt(x: any): bigint | null {
@@ -14,6 +13,6 @@ function optionalBigInt(x: any): bigint | null {
 
 export const load = (async ({ params }) => {
     const cid = optionalBigInt(params.cardId);
-    const info = cid !== null ? await cardStats({ cid }) : null;
+    const info = cid !== null ? await getCardStats(cid) : null;
     return { info };
 }) satisfies PageLoad;
@@ -0,0 +1,43 @@
+// Copyright: Ankitects Pty Ltd and contributors
+// License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import type { CardStatsResponse } from "@generated/anki/stats_pb";
+import { cardStats, cardStatsBatch } from "@generated/backend";
+
+/** Stats of the rows around the current one in the browser, fetched ahead of
+time so that moving to them doesn't wait for the backend. */
+const prefetched = new Map<bigint, CardStatsResponse>();
+const MAX_PREFETCHED = 200;
+/** Bumped when the collection changes, so that stale responses are dropped. */
+let generation = 0;
+
+export async function getCardStats(cid: bigint): Promise<CardStatsResponse> {
+    return prefetched.get(cid) ?? cardStats({ cid });
+}
+
+export async function prefetchCardStats(cids: bigint[]): Promise<void> {
+    const missing = cids.filter((cid) => !prefetched.has(cid));
+    if (missing.length === 0) {
+        return;
+    }
+    const fetchedIn = generation;
+    const { cards } = await cardStatsBatch({ cids: missing });
+    if (fetchedIn !== generation) {
+        return;
+    }
+    for (const stats of cards) {
+        prefetched.set(stats.cardId, stats);
+    }
+    // maps iterate in insertion order, so the oldest entries are dropped
+    for (const cid of prefetched.keys()) {
+        if (prefetched.size <= MAX_PREFETCHED) {
+            break;
+        }
+        prefetched.delete(cid);
+    }
+}
+
+export function clearPrefetchedCardStats(): void {
+    prefetched.clear();
+    generation += 1;
+}